@@ -0,0 +1,626 @@
+"""AST shared by the parser and every later phase.
+
+Node names and fields follow pycparser's c_ast, so code written against
+either reads the same. Every node records the 1-based line and column of
+its first token; children are listed in ``child_names`` and may be single
+nodes, lists of nodes or None.
+"""
+
+
+class Node:
+    __slots__ = ('line', 'column')
+    attr_names = ()
+    child_names = ()
+
+    def __iter__(self):
+        for name in self.child_names:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                yield from value
+            elif value is not None:
+                yield value
+
+    def children(self):
+        """Return (name, child) pairs; list members are named like 'ext[0]'."""
+        nodes = []
+        for name in self.child_names:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                nodes.extend((f'{name}[{i}]', child) for i, child in enumerate(value))
+            elif value is not None:
+                nodes.append((name, value))
+        return nodes
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+def label(node):
+    """Short one-line description, e.g. 'BinaryOp: +' or 'Decl: x'."""
+    values = []
+    for name in node.attr_names:
+        value = getattr(node, name)
+        if isinstance(value, (tuple, list)):
+            value = ' '.join(value)
+        if value:
+            values.append(str(value))
+    name = type(node).__name__
+    return f"{name}: {', '.join(values)}" if values else name
+
+
+def walk(node):
+    """Yield node and all of its descendants in preorder, without recursion."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(node)))
+
+
+def dump(node, indent=0):
+    """Indented multi-line rendering of a subtree, one node per line."""
+    lines = []
+    stack = [(node, indent)]
+    while stack:
+        node, depth = stack.pop()
+        lines.append(f"{'  ' * depth}{label(node)}  <{node.line}:{node.column}>")
+        stack.extend((child, depth + 1) for child in reversed(list(node)))
+    return '\n'.join(lines)
+
+
+class NodeVisitor:
+    """Dispatch visit(node) to visit_<ClassName>, defaulting to generic_visit."""
+
+    _methods = None
+
+    def visit(self, node):
+        if self._methods is None:
+            self._methods = {}
+        cls = type(node)
+        method = self._methods.get(cls)
+        if method is None:
+            method = self._methods[cls] = getattr(self, 'visit_' + cls.__name__, self.generic_visit)
+        return method(node)
+
+    def generic_visit(self, node):
+        for child in node:
+            self.visit(child)
+
+
+class FileAST(Node):
+    """A whole translation unit."""
+
+    __slots__ = ('ext',)
+    attr_names = ()
+    child_names = ('ext',)
+
+    def __init__(self, ext, line=0, column=0):
+        self.ext = ext
+        self.line = line
+        self.column = column
+
+
+class Decl(Node):
+    """A variable, function or struct declaration."""
+
+    __slots__ = ('name', 'quals', 'storage', 'type', 'init', 'bitsize')
+    attr_names = ('name', 'quals', 'storage')
+    child_names = ('type', 'init', 'bitsize')
+
+    def __init__(self, name, quals, storage, type, init, bitsize, line=0, column=0):
+        self.name = name
+        self.quals = quals
+        self.storage = storage
+        self.type = type
+        self.init = init
+        self.bitsize = bitsize
+        self.line = line
+        self.column = column
+
+
+class Typedef(Node):
+    __slots__ = ('name', 'quals', 'storage', 'type')
+    attr_names = ('name', 'quals', 'storage')
+    child_names = ('type',)
+
+    def __init__(self, name, quals, storage, type, line=0, column=0):
+        self.name = name
+        self.quals = quals
+        self.storage = storage
+        self.type = type
+        self.line = line
+        self.column = column
+
+
+class TypeDecl(Node):
+    """Innermost link of a declarator's type chain."""
+
+    __slots__ = ('declname', 'quals', 'type')
+    attr_names = ('declname', 'quals')
+    child_names = ('type',)
+
+    def __init__(self, declname, quals, type, line=0, column=0):
+        self.declname = declname
+        self.quals = quals
+        self.type = type
+        self.line = line
+        self.column = column
+
+
+class Typename(Node):
+    """Type in a cast or sizeof."""
+
+    __slots__ = ('name', 'quals', 'type')
+    attr_names = ('name', 'quals')
+    child_names = ('type',)
+
+    def __init__(self, name, quals, type, line=0, column=0):
+        self.name = name
+        self.quals = quals
+        self.type = type
+        self.line = line
+        self.column = column
+
+
+class IdentifierType(Node):
+    """Built-in or typedef type specifiers, e.g. ('unsigned', 'int')."""
+
+    __slots__ = ('names',)
+    attr_names = ('names',)
+
+    def __init__(self, names, line=0, column=0):
+        self.names = names
+        self.line = line
+        self.column = column
+
+
+class Struct(Node):
+    __slots__ = ('name', 'decls')
+    attr_names = ('name',)
+    child_names = ('decls',)
+
+    def __init__(self, name, decls, line=0, column=0):
+        self.name = name
+        self.decls = decls
+        self.line = line
+        self.column = column
+
+
+class Union(Node):
+    __slots__ = ('name', 'decls')
+    attr_names = ('name',)
+    child_names = ('decls',)
+
+    def __init__(self, name, decls, line=0, column=0):
+        self.name = name
+        self.decls = decls
+        self.line = line
+        self.column = column
+
+
+class Enum(Node):
+    __slots__ = ('name', 'values')
+    attr_names = ('name',)
+    child_names = ('values',)
+
+    def __init__(self, name, values, line=0, column=0):
+        self.name = name
+        self.values = values
+        self.line = line
+        self.column = column
+
+
+class EnumeratorList(Node):
+    __slots__ = ('enumerators',)
+    attr_names = ()
+    child_names = ('enumerators',)
+
+    def __init__(self, enumerators, line=0, column=0):
+        self.enumerators = enumerators
+        self.line = line
+        self.column = column
+
+
+class Enumerator(Node):
+    __slots__ = ('name', 'value')
+    attr_names = ('name',)
+    child_names = ('value',)
+
+    def __init__(self, name, value, line=0, column=0):
+        self.name = name
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+class PtrDecl(Node):
+    __slots__ = ('quals', 'type')
+    attr_names = ('quals',)
+    child_names = ('type',)
+
+    def __init__(self, quals, type, line=0, column=0):
+        self.quals = quals
+        self.type = type
+        self.line = line
+        self.column = column
+
+
+class ArrayDecl(Node):
+    __slots__ = ('dim_quals', 'type', 'dim')
+    attr_names = ('dim_quals',)
+    child_names = ('type', 'dim')
+
+    def __init__(self, dim_quals, type, dim, line=0, column=0):
+        self.dim_quals = dim_quals
+        self.type = type
+        self.dim = dim
+        self.line = line
+        self.column = column
+
+
+class FuncDecl(Node):
+    __slots__ = ('args', 'type')
+    attr_names = ()
+    child_names = ('args', 'type')
+
+    def __init__(self, args, type, line=0, column=0):
+        self.args = args
+        self.type = type
+        self.line = line
+        self.column = column
+
+
+class ParamList(Node):
+    __slots__ = ('params',)
+    attr_names = ()
+    child_names = ('params',)
+
+    def __init__(self, params, line=0, column=0):
+        self.params = params
+        self.line = line
+        self.column = column
+
+
+class EllipsisParam(Node):
+    __slots__ = ()
+    attr_names = ()
+
+    def __init__(self, line=0, column=0):
+        self.line = line
+        self.column = column
+
+
+class FuncDef(Node):
+    __slots__ = ('decl', 'param_decls', 'body')
+    attr_names = ()
+    child_names = ('decl', 'param_decls', 'body')
+
+    def __init__(self, decl, param_decls, body, line=0, column=0):
+        self.decl = decl
+        self.param_decls = param_decls
+        self.body = body
+        self.line = line
+        self.column = column
+
+
+class Compound(Node):
+    __slots__ = ('block_items',)
+    attr_names = ()
+    child_names = ('block_items',)
+
+    def __init__(self, block_items, line=0, column=0):
+        self.block_items = block_items
+        self.line = line
+        self.column = column
+
+
+class DeclList(Node):
+    """Declarations in a for-loop header."""
+
+    __slots__ = ('decls',)
+    attr_names = ()
+    child_names = ('decls',)
+
+    def __init__(self, decls, line=0, column=0):
+        self.decls = decls
+        self.line = line
+        self.column = column
+
+
+class If(Node):
+    __slots__ = ('cond', 'iftrue', 'iffalse')
+    attr_names = ()
+    child_names = ('cond', 'iftrue', 'iffalse')
+
+    def __init__(self, cond, iftrue, iffalse, line=0, column=0):
+        self.cond = cond
+        self.iftrue = iftrue
+        self.iffalse = iffalse
+        self.line = line
+        self.column = column
+
+
+class While(Node):
+    __slots__ = ('cond', 'stmt')
+    attr_names = ()
+    child_names = ('cond', 'stmt')
+
+    def __init__(self, cond, stmt, line=0, column=0):
+        self.cond = cond
+        self.stmt = stmt
+        self.line = line
+        self.column = column
+
+
+class DoWhile(Node):
+    __slots__ = ('cond', 'stmt')
+    attr_names = ()
+    child_names = ('cond', 'stmt')
+
+    def __init__(self, cond, stmt, line=0, column=0):
+        self.cond = cond
+        self.stmt = stmt
+        self.line = line
+        self.column = column
+
+
+class For(Node):
+    __slots__ = ('init', 'cond', 'next', 'stmt')
+    attr_names = ()
+    child_names = ('init', 'cond', 'next', 'stmt')
+
+    def __init__(self, init, cond, next, stmt, line=0, column=0):
+        self.init = init
+        self.cond = cond
+        self.next = next
+        self.stmt = stmt
+        self.line = line
+        self.column = column
+
+
+class Switch(Node):
+    __slots__ = ('cond', 'stmt')
+    attr_names = ()
+    child_names = ('cond', 'stmt')
+
+    def __init__(self, cond, stmt, line=0, column=0):
+        self.cond = cond
+        self.stmt = stmt
+        self.line = line
+        self.column = column
+
+
+class Case(Node):
+    __slots__ = ('expr', 'stmts')
+    attr_names = ()
+    child_names = ('expr', 'stmts')
+
+    def __init__(self, expr, stmts, line=0, column=0):
+        self.expr = expr
+        self.stmts = stmts
+        self.line = line
+        self.column = column
+
+
+class Default(Node):
+    __slots__ = ('stmts',)
+    attr_names = ()
+    child_names = ('stmts',)
+
+    def __init__(self, stmts, line=0, column=0):
+        self.stmts = stmts
+        self.line = line
+        self.column = column
+
+
+class Label(Node):
+    __slots__ = ('name', 'stmt')
+    attr_names = ('name',)
+    child_names = ('stmt',)
+
+    def __init__(self, name, stmt, line=0, column=0):
+        self.name = name
+        self.stmt = stmt
+        self.line = line
+        self.column = column
+
+
+class Goto(Node):
+    __slots__ = ('name',)
+    attr_names = ('name',)
+
+    def __init__(self, name, line=0, column=0):
+        self.name = name
+        self.line = line
+        self.column = column
+
+
+class Return(Node):
+    __slots__ = ('expr',)
+    attr_names = ()
+    child_names = ('expr',)
+
+    def __init__(self, expr, line=0, column=0):
+        self.expr = expr
+        self.line = line
+        self.column = column
+
+
+class Break(Node):
+    __slots__ = ()
+    attr_names = ()
+
+    def __init__(self, line=0, column=0):
+        self.line = line
+        self.column = column
+
+
+class Continue(Node):
+    __slots__ = ()
+    attr_names = ()
+
+    def __init__(self, line=0, column=0):
+        self.line = line
+        self.column = column
+
+
+class EmptyStatement(Node):
+    __slots__ = ()
+    attr_names = ()
+
+    def __init__(self, line=0, column=0):
+        self.line = line
+        self.column = column
+
+
+class Assignment(Node):
+    __slots__ = ('op', 'lvalue', 'rvalue')
+    attr_names = ('op',)
+    child_names = ('lvalue', 'rvalue')
+
+    def __init__(self, op, lvalue, rvalue, line=0, column=0):
+        self.op = op
+        self.lvalue = lvalue
+        self.rvalue = rvalue
+        self.line = line
+        self.column = column
+
+
+class BinaryOp(Node):
+    __slots__ = ('op', 'left', 'right')
+    attr_names = ('op',)
+    child_names = ('left', 'right')
+
+    def __init__(self, op, left, right, line=0, column=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+        self.column = column
+
+
+class UnaryOp(Node):
+    """Prefix operators; postfix ++/-- are 'p++'/'p--'."""
+
+    __slots__ = ('op', 'expr')
+    attr_names = ('op',)
+    child_names = ('expr',)
+
+    def __init__(self, op, expr, line=0, column=0):
+        self.op = op
+        self.expr = expr
+        self.line = line
+        self.column = column
+
+
+class TernaryOp(Node):
+    __slots__ = ('cond', 'iftrue', 'iffalse')
+    attr_names = ()
+    child_names = ('cond', 'iftrue', 'iffalse')
+
+    def __init__(self, cond, iftrue, iffalse, line=0, column=0):
+        self.cond = cond
+        self.iftrue = iftrue
+        self.iffalse = iffalse
+        self.line = line
+        self.column = column
+
+
+class Cast(Node):
+    __slots__ = ('to_type', 'expr')
+    attr_names = ()
+    child_names = ('to_type', 'expr')
+
+    def __init__(self, to_type, expr, line=0, column=0):
+        self.to_type = to_type
+        self.expr = expr
+        self.line = line
+        self.column = column
+
+
+class FuncCall(Node):
+    __slots__ = ('name', 'args')
+    attr_names = ()
+    child_names = ('name', 'args')
+
+    def __init__(self, name, args, line=0, column=0):
+        self.name = name
+        self.args = args
+        self.line = line
+        self.column = column
+
+
+class ArrayRef(Node):
+    __slots__ = ('name', 'subscript')
+    attr_names = ()
+    child_names = ('name', 'subscript')
+
+    def __init__(self, name, subscript, line=0, column=0):
+        self.name = name
+        self.subscript = subscript
+        self.line = line
+        self.column = column
+
+
+class StructRef(Node):
+    """type is '.' or '->'."""
+
+    __slots__ = ('type', 'name', 'field')
+    attr_names = ('type',)
+    child_names = ('name', 'field')
+
+    def __init__(self, type, name, field, line=0, column=0):
+        self.type = type
+        self.name = name
+        self.field = field
+        self.line = line
+        self.column = column
+
+
+class ID(Node):
+    __slots__ = ('name',)
+    attr_names = ('name',)
+
+    def __init__(self, name, line=0, column=0):
+        self.name = name
+        self.line = line
+        self.column = column
+
+
+class Constant(Node):
+    """type is 'int', 'unsigned int', 'double', 'char', 'string', ..."""
+
+    __slots__ = ('type', 'value')
+    attr_names = ('type', 'value')
+
+    def __init__(self, type, value, line=0, column=0):
+        self.type = type
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+class ExprList(Node):
+    """Comma expression or call arguments."""
+
+    __slots__ = ('exprs',)
+    attr_names = ()
+    child_names = ('exprs',)
+
+    def __init__(self, exprs, line=0, column=0):
+        self.exprs = exprs
+        self.line = line
+        self.column = column
+
+
+class InitList(Node):
+    __slots__ = ('exprs',)
+    attr_names = ()
+    child_names = ('exprs',)
+
+    def __init__(self, exprs, line=0, column=0):
+        self.exprs = exprs
+        self.line = line
+        self.column = column
+
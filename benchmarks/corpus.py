@@ -0,0 +1,239 @@
+"""Synthetic C programs of any size, for benchmarking the compiler phases.
+
+Run from the repository root:
+    python -m benchmarks.corpus 100000 -o big.c
+    python -m benchmarks.corpus 5000 --mix loop=4,array=3 --seed 7
+
+The output is deterministic for a given size, mix and seed. It is valid C
+that gcc compiles and runs to completion: loops have constant bounds,
+array indices are reduced into range, every value is kept small with
+`% 1009`, and functions only call the leaf functions defined first, so
+nothing recurses or overflows. Every local name is unique in the file.
+"""
+import argparse
+import random
+import sys
+
+# Relative weight of each kind of statement in a function body
+DEFAULT_MIX = {
+    'decl': 3,      # int declaration with an initializer
+    'expr': 6,      # assignment of an arithmetic expression
+    'loop': 2,      # for or while loop around more statements
+    'branch': 2,    # if/else
+    'array': 2,     # array element read or write
+    'call': 1,      # call of a leaf function
+}
+
+MODULUS = 1009
+ARRAY_SIZE = 16
+LOOP_BOUND = 8
+MAX_DEPTH = 2           # nesting of loops and branches
+LEAVES = 4              # leading functions that call nothing
+FUNCTION_SIZE = 12      # statements per function body, on average
+
+
+def parse_mix(text):
+    """'loop=4,array=3' -> DEFAULT_MIX with those weights replaced."""
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, text.split(',')):
+        kind, _, weight = item.partition('=')
+        if kind not in mix:
+            raise ValueError(f"unknown statement kind {kind!r}; expected one of {', '.join(mix)}")
+        mix[kind] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("the mix needs at least one non-zero weight")
+    return mix
+
+
+class _Function:
+    """Writes one function body; names are prefixed with the function's number."""
+
+    def __init__(self, gen, number, leaf):
+        self.gen = gen
+        self.rng = gen.rng
+        self.n = number
+        self.leaf = leaf
+        self.scalars = ['a', 'b']       # ints in scope
+        self.writable = []              # locals that may be assigned (not parameters or loop counters)
+        self.arrays = []
+        self.counter = 0
+        self.lines = []
+
+    def name(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.n}_{self.counter}"
+
+    def operand(self):
+        rng = self.rng
+        if rng.random() < 0.3:
+            return str(rng.randrange(1, 100))
+        if self.arrays and rng.random() < 0.15:
+            return f"{rng.choice(self.arrays)}[{rng.randrange(ARRAY_SIZE)}]"
+        return rng.choice(self.scalars)
+
+    def expression(self, depth=0):
+        rng = self.rng
+        if depth >= 2 or rng.random() < 0.3:
+            return self.operand()
+        op = rng.choice('+-*/%')
+        left = self.expression(depth + 1)
+        if op in '*/%':
+            # A small non-zero constant keeps products small and divisions safe
+            return f"{left} {op} {rng.randrange(1, 10)}"
+        return f"({left} {op} {self.expression(depth + 1)})"
+
+    def condition(self):
+        left, right = self.operand(), self.operand()
+        if left == right:
+            right = str(self.rng.randrange(1, 100))
+        return f"{left} {self.rng.choice(['<', '>', '<=', '>=', '==', '!='])} {right}"
+
+    def reduced(self):
+        return f"({self.expression()}) % {MODULUS}"
+
+    def statement(self, indent, depth):
+        rng = self.rng
+        kinds = [k for k in self.gen.kinds if (depth < MAX_DEPTH or k not in ('loop', 'branch'))
+                 and (not self.leaf or k != 'call')]
+        weights = [self.gen.mix[k] for k in kinds]
+        if not any(weights):
+            kinds, weights = ['expr'], [1]
+        kind = rng.choices(kinds, weights)[0]
+        pad = '    ' * indent
+        if kind == 'decl':
+            name = self.name('v')
+            self.lines.append(f"{pad}int {name} = {self.reduced()};")
+            self.scalars.append(name)
+            self.writable.append(name)
+        elif kind == 'expr' or (kind == 'array' and not self.arrays):
+            self.lines.append(f"{pad}{rng.choice(self.writable)} = {self.reduced()};")
+        elif kind == 'array':
+            index = f"(({self.expression()}) % {ARRAY_SIZE} + {ARRAY_SIZE}) % {ARRAY_SIZE}"
+            self.lines.append(f"{pad}{rng.choice(self.arrays)}[{index}] = {self.reduced()};")
+        elif kind == 'call':
+            callee = rng.randrange(LEAVES)
+            result = self.name('r')
+            self.lines.append(f"{pad}int {result} = f{callee}({self.operand()}, {self.operand()}) % {MODULUS};")
+            self.scalars.append(result)
+            self.writable.append(result)
+        elif kind == 'loop':
+            counter = self.name('i')
+            self.lines.append(f"{pad}int {counter} = 0;")
+            if rng.random() < 0.5:
+                self.lines.append(f"{pad}for ({counter} = 0; {counter} < {LOOP_BOUND}; {counter}++) {{")
+                self.block(indent + 1, depth + 1, counter)
+            else:
+                self.lines.append(f"{pad}while ({counter} < {LOOP_BOUND}) {{")
+                self.block(indent + 1, depth + 1, counter)
+                self.lines.append(f"{pad}    {counter} = {counter} + 1;")
+            self.lines.append(f"{pad}}}")
+        else:
+            self.lines.append(f"{pad}if ({self.condition()}) {{")
+            self.block(indent + 1, depth + 1)
+            self.lines.append(f"{pad}}} else {{")
+            self.block(indent + 1, depth + 1)
+            self.lines.append(f"{pad}}}")
+
+    def block(self, indent, depth, counter=None):
+        # Names declared inside a block go out of scope at its end
+        scalars, writable, arrays = len(self.scalars), len(self.writable), len(self.arrays)
+        if counter is not None:
+            self.scalars.append(counter)
+        for _ in range(self.rng.randint(1, 3)):
+            self.statement(indent, depth)
+        del self.scalars[scalars:], self.writable[writable:], self.arrays[arrays:]
+
+    def write(self, statements):
+        self.lines.append(f"int f{self.n}(int a, int b) {{")
+        if self.gen.mix['array']:
+            array = self.name('arr')
+            values = ', '.join(str(self.rng.randrange(MODULUS)) for _ in range(ARRAY_SIZE))
+            self.lines.append(f"    int {array}[{ARRAY_SIZE}] = {{{values}}};")
+            self.arrays.append(array)
+        total = self.name('total')
+        self.lines.append(f"    int {total} = (a + b) % {MODULUS};")
+        self.scalars.append(total)
+        self.writable.append(total)
+        for _ in range(statements):
+            self.statement(1, 0)
+        self.lines.append(f"    return ({' + '.join(self.writable[-4:])}) % {MODULUS};")
+        self.lines.append("}")
+        self.lines.append("")
+        return self.lines
+
+
+class Generator:
+    def __init__(self, mix=None, seed=0):
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.kinds = list(self.mix)
+        self.rng = random.Random(seed)
+
+    def functions(self):
+        """Yield each function's lines, forever."""
+        n = 0
+        while True:
+            statements = max(1, round(self.rng.gauss(FUNCTION_SIZE, FUNCTION_SIZE / 3)))
+            yield _Function(self, n, n < LEAVES).write(statements)
+            n += 1
+
+    def program(self, lines):
+        """C source of about `lines` lines (at least one function and main)."""
+        out = ["#include <stdio.h>", ""]
+        count = 0
+        functions = 0
+        for body in self.functions():
+            out.extend(body)
+            count += len(body)
+            functions += 1
+            if count + 8 >= lines and functions > LEAVES:
+                break
+        out.append("int main(void) {")
+        out.append("    int checksum = 0;")
+        step = max(1, functions // 8)
+        for n in range(0, functions, step):
+            out.append(f"    checksum = (checksum + f{n}({n % 97}, {n % 89})) % {MODULUS};")
+        out.append('    printf("%d\\n", checksum);')
+        out.append("    return 0;")
+        out.append("}")
+        return '\n'.join(out) + '\n'
+
+    def single(self, statements):
+        """C source of one function with `statements` top-level statements, and main to call it."""
+        out = ["#include <stdio.h>", ""]
+        out.extend(_Function(self, 0, True).write(statements))
+        out.append("int main(void) {")
+        out.append('    printf("%d\\n", f0(1, 2));')
+        out.append("    return 0;")
+        out.append("}")
+        return '\n'.join(out) + '\n'
+
+
+def generate(lines, mix=None, seed=0):
+    return Generator(mix, seed).program(lines)
+
+
+def generate_function(statements, mix=None, seed=0):
+    return Generator(mix, seed).single(statements)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='corpus', description="Write a synthetic C program.")
+    parser.add_argument('lines', type=int, help="approximate number of lines")
+    parser.add_argument('-o', '--output', help="file to write (default: stdout)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mix', default='', help="statement weights, e.g. loop=4,array=3,call=0")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    source = generate(args.lines, mix, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == "__main__":
+    main()
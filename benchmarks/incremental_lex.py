@@ -0,0 +1,48 @@
+"""Keystroke-to-update latency of IncrementalLexer against a full re-lex.
+
+Run from the repository root:  python -m benchmarks.incremental_lex [lines]
+"""
+import sys
+import time
+
+from benchmarks.token_memory import make_source
+from token_buffer import IncrementalLexer, TokenBuffer
+from tokenizer import ENGINES
+
+
+def type_text(lexer, source, at, text):
+    """Type text one character at a time at offset `at`; returns per-key latencies."""
+    latencies = []
+    for k in range(len(text)):
+        source = source[:at + k] + text[k] + source[at + k:]
+        start = time.perf_counter()
+        lexer.update(source)
+        latencies.append(time.perf_counter() - start)
+    return source, latencies
+
+
+def main(argv):
+    lines = int(argv[1]) if len(argv) > 1 else 50_000
+    source = make_source(lines)
+    print(f"source: {source.count(chr(10)):,} lines, {len(source):,} chars")
+    for engine in ENGINES:
+        start = time.perf_counter()
+        TokenBuffer.from_source(source, ENGINES[engine])
+        full = time.perf_counter() - start
+
+        lexer = IncrementalLexer(source, engine)
+        edited = source
+        all_latencies = []
+        for where in (0.5, 0.1, 0.9, 0.5):
+            at = edited.index('\n', int(len(edited) * where)) + 1
+            edited, latencies = type_text(lexer, edited, at, "x = y * 2 + 1; // hi\n")
+            all_latencies.extend(latencies)
+        assert list(lexer) == list(TokenBuffer.from_source(edited, ENGINES[engine]))
+        all_latencies.sort()
+        median = all_latencies[len(all_latencies) // 2]
+        print(f"{engine:<8} full re-lex {full * 1e3:8.1f} ms   per keystroke: median {median * 1e3:6.2f} ms, "
+              f"worst {all_latencies[-1] * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
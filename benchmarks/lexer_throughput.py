@@ -0,0 +1,32 @@
+"""Lexing throughput (MB/s) of the regex and hand-written scanner engines.
+
+Run from the repository root:  python -m benchmarks.lexer_throughput [lines] [repeats]
+"""
+import sys
+import time
+
+from benchmarks.token_memory import make_source
+from tokenizer import ENGINES
+
+
+def throughput(spans, source, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        count = sum(1 for _ in spans(source))
+        best = min(best, time.perf_counter() - start)
+    return count, len(source) / best / 1e6
+
+
+def main(argv):
+    lines = int(argv[1]) if len(argv) > 1 else 100_000
+    repeats = int(argv[2]) if len(argv) > 2 else 3
+    source = make_source(lines)
+    print(f"source: {source.count(chr(10)):,} lines, {len(source) / 1e6:.1f} MB, best of {repeats}")
+    for name, spans in ENGINES.items():
+        count, mbps = throughput(spans, source, repeats)
+        print(f"{name:<8} {mbps:7.2f} MB/s  {count:,} tokens")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,95 @@
+"""Cost of the global analyses on one function as it grows.
+
+Run from the repository root:
+    python -m benchmarks.scaling                        # 1K to 64K statements
+    python -m benchmarks.scaling --sizes 2000,200000 --mix branch=6,loop=4
+
+Each size is a single function of that many top-level statements (see
+benchmarks.corpus), lowered to the IR once. For every step the table
+gives the best time over `repeats` and the time per basic block: a step
+whose cost grows linearly keeps the per-block figure flat as the
+function grows. The input is exempted from garbage collection while it
+is timed, so that the figures are those of the analyses alone.
+"""
+import argparse
+import copy
+import gc
+import time
+
+from benchmarks.corpus import generate_function, parse_mix
+from cfg import CFG, DominatorTree
+from cparser import parse_with_errors
+from dataflow import AvailableExpressions, Liveness, ReachingDefinitions
+from ir import lower
+from ssa import to_ssa
+
+SIZES = (1_000, 4_000, 16_000, 64_000)
+
+
+def time_steps(function):
+    """{step: seconds} for one run of each analysis on function, which is left unchanged."""
+    times = {}
+    start = time.perf_counter()
+    graph = CFG(function)
+    times['cfg'] = time.perf_counter() - start
+    start = time.perf_counter()
+    tree = DominatorTree(graph)
+    times['dominators'] = time.perf_counter() - start
+    start = time.perf_counter()
+    tree.frontiers()
+    times['frontiers'] = time.perf_counter() - start
+    for step, analysis in (('liveness', Liveness), ('reaching', ReachingDefinitions),
+                           ('available', AvailableExpressions)):
+        start = time.perf_counter()
+        analysis(graph)
+        times[step] = time.perf_counter() - start
+    function = copy.deepcopy(function)
+    gc.freeze()
+    start = time.perf_counter()
+    to_ssa(function)
+    times['ssa'] = time.perf_counter() - start
+    return times
+
+
+def measure(statements, repeats, mix=None, seed=0):
+    """(blocks, instructions, {step: best seconds}) for a function of `statements` statements."""
+    tree, _ = parse_with_errors(generate_function(statements, mix, seed))
+    function = lower(tree).functions[0]
+    # The collector would otherwise rescan the tree and the IR, costing more the larger they are
+    gc.collect()
+    gc.freeze()
+    best = {}
+    try:
+        for _ in range(repeats):
+            for step, seconds in time_steps(function).items():
+                best[step] = min(best.get(step, float('inf')), seconds)
+    finally:
+        gc.unfreeze()
+    return len(CFG(function).blocks), len(function.body), best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='scaling', description="Time the CFG, data-flow and SSA steps on one large function.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="statements per function, comma separated")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--mix', default='', help="statement weights for the function, e.g. branch=6")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    header = None
+    for size in sizes:
+        blocks, instructions, best = measure(size, args.repeats, mix, args.seed)
+        if header is None:
+            header = f"{'statements':>10} {'blocks':>8} {'instrs':>9}" + ''.join(f" {step + ' ms':>14} {'us/block':>8}" for step in best)
+            print(header)
+        print(f"{size:>10,} {blocks:>8,} {instructions:>9,}"
+              + ''.join(f" {seconds * 1e3:>14.1f} {seconds * 1e6 / blocks:>8.2f}" for seconds in best.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cold-start cost of each phase tool: import time and time to first window.
+
+Run from the repository root:  python -m benchmarks.startup [repeats]
+
+Imports are measured with `python -X importtime`, listing the slowest
+modules each tool pulls in. With a display, each tool is also started in
+a fresh interpreter and timed until its first window has been drawn; the
+exit status is non-zero if any tool misses its target.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# module: (GUI class, target time to first window in seconds)
+TOOLS = {
+    'lexical_gui': ('LexicalAnalyzerGUI', 0.4),
+    'syntax_gui': ('SyntaxAnalyzerGUI', 0.4),
+    'sementic': ('SemanticAnalyzerGUI', 0.4),
+    'optimization': ('CodeOptimizerGUI', 0.4),
+    'code_generation': ('TACCodeGeneratorApp', 0.4),
+    'linking_and_executing': ('TACCodeGeneratorApp', 0.4),
+    'testing_and_debugging': ('ModernCCompilerGUI', 0.4),
+    'error_handling': ('ModernCCompilerGUI', 0.4),
+}
+
+FIRST_WINDOW = """\
+import time, tkinter as tk
+import {module}
+root = tk.Tk()
+{module}.{cls}(root)
+root.update()
+print(time.time())
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """Return (total seconds, [(self seconds, name), ...] slowest first) for importing module."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total, entries = 0.0, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((int(own) / 1e6, name.strip()))
+        if name.strip() == module:
+            total = int(cumulative) / 1e6
+    return total, sorted(entries, reverse=True)
+
+
+def first_window(module, cls):
+    start = time.time()
+    proc = subprocess.run([sys.executable, '-c', FIRST_WINDOW.format(module=module, cls=cls)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return float(proc.stdout.split()[-1]) - start
+
+
+def has_display():
+    return os.name == 'nt' or sys.platform == 'darwin' or bool(os.environ.get('DISPLAY'))
+
+
+def main(argv):
+    repeats = int(argv[1]) if len(argv) > 1 else 5
+    display = has_display()
+    if not display:
+        print("no display: measuring imports only")
+    missed = []
+    for module, (cls, target) in TOOLS.items():
+        try:
+            total, entries = import_times(module)
+            slowest = ', '.join(f"{name} {own * 1e3:.1f}" for own, name in entries[:3])
+            line = f"{module:<22} import {total * 1e3:7.1f} ms  (slowest ms: {slowest})"
+            if display:
+                elapsed = statistics.median(first_window(module, cls) for _ in range(repeats))
+                verdict = "ok" if elapsed <= target else "SLOW"
+                if elapsed > target:
+                    missed.append(module)
+                line += f"\n{'':<22} first window {elapsed * 1e3:7.1f} ms  target {target * 1e3:.0f} ms  {verdict}"
+        except RuntimeError as e:
+            line = f"{module:<22} failed: {e}"
+            missed.append(module)
+        print(line)
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
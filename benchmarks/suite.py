@@ -0,0 +1,139 @@
+"""Throughput of each compiler phase on the synthetic corpus, against a baseline.
+
+Run from the repository root:
+    python -m benchmarks.suite                      # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --save               # ... and record this run in it
+    python -m benchmarks.suite --sizes 1000,1000000 --threshold 0.15
+
+Every phase from lex to codegen runs through the Pipeline on corpora of
+the given sizes (see benchmarks.corpus); the best of `repeats` runs
+counts, as source lines per second. The baseline file keeps every saved
+run, oldest first, and each new run is compared with the latest one: the
+exit status is 1 if any phase lost more than `threshold` of its
+throughput.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmarks.corpus import generate, parse_mix
+from pipeline import Pipeline
+from profiling import Profiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SIZES = (1_000, 10_000, 100_000)
+THRESHOLD = 0.10
+
+
+def measure(source, repeats):
+    """Best wall time per phase over `repeats` runs of the pipeline up to codegen."""
+    best = {}
+    pipeline = Pipeline(stop_after='codegen', keep_going=True)
+    for _ in range(repeats):
+        pipeline.profiler = Profiler(memory=False)
+        pipeline.run(source)
+        for record in pipeline.profiler.records:
+            best[record.name] = min(best.get(record.name, float('inf')), record.wall)
+    return best
+
+
+def run_suite(sizes, repeats, mix=None, seed=0):
+    """{'phase@lines': lines per second}."""
+    results = {}
+    for size in sizes:
+        source = generate(size, mix, seed)
+        lines = source.count('\n')
+        for phase, wall in measure(source, repeats).items():
+            results[f"{phase}@{size}"] = lines / wall if wall else float('inf')
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'runs': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, previous, threshold):
+    """Report lines and the keys that regressed by more than threshold."""
+    lines, regressed = [], []
+    lines.append(f"{'phase@lines':<20} {'lines/s':>12} {'baseline':>12} {'change':>8}")
+    for key, value in results.items():
+        before = previous.get(key)
+        if before is None:
+            lines.append(f"{key:<20} {value:>12,.0f} {'-':>12} {'':>8}")
+            continue
+        change = value / before - 1
+        verdict = ""
+        if change < -threshold:
+            verdict = "  REGRESSION"
+            regressed.append(key)
+        lines.append(f"{key:<20} {value:>12,.0f} {before:>12,.0f} {change:>+8.1%}{verdict}")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='suite', description="Benchmark the compiler phases.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help="corpus sizes in lines, comma separated")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--mix', default='', help="statement weights for the corpus, e.g. loop=4")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE, help="JSON file of saved runs")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="largest tolerated loss of throughput, as a fraction")
+    parser.add_argument('--save', action='store_true', help="append this run to the baseline")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = run_suite(sizes, args.repeats, mix, args.seed)
+    baseline = load_baseline(args.baseline)
+    previous = baseline['runs'][-1] if baseline['runs'] else None
+    report, regressed = compare(results, previous['results'] if previous else {}, args.threshold)
+    if previous:
+        print(f"baseline: {previous['date']} ({previous.get('commit') or 'unknown commit'})")
+    else:
+        print("no baseline yet")
+    print('\n'.join(report))
+
+    if args.save:
+        baseline['runs'].append({
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'settings': {'repeats': args.repeats, 'mix': mix, 'seed': args.seed},
+            'results': {key: round(value, 1) for key, value in results.items()},
+        })
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"saved to {args.baseline}")
+
+    if regressed:
+        print(f"{len(regressed)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
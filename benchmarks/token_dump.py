@@ -0,0 +1,56 @@
+"""Write and reload times of the binary token dump against CSV.
+
+Run from the repository root:  python -m benchmarks.token_dump [lines]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.token_memory import make_source
+from token_buffer import TokenBuffer
+from token_dump import TokenDump, write_dump
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        rows = csv.reader(f)
+        next(rows)
+        return [tuple(row) for row in rows]
+
+
+def main(argv):
+    lines = int(argv[1]) if len(argv) > 1 else 200_000
+    tokens = TokenBuffer.from_source(make_source(lines))
+    print(f"tokens: {len(tokens):,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, bin_path = os.path.join(tmp, 't.csv'), os.path.join(tmp, 't.bin')
+
+        def write_csv():
+            with open(csv_path, 'w', newline='') as f:
+                tokens.write_csv(f)
+
+        _, csv_write = timed(write_csv)
+        _, bin_write = timed(write_dump, bin_path, tokens)
+        rows, csv_read = timed(read_csv, csv_path)
+        dump, bin_open = timed(TokenDump, bin_path)
+        middle, bin_access = timed(dump.__getitem__, len(dump) // 2)
+        assert middle == tokens[len(tokens) // 2] and len(rows) == len(dump)
+        _, bin_scan = timed(lambda: sum(1 for _ in dump))
+        print(f"csv   write {csv_write * 1e3:8.1f} ms  read all {csv_read * 1e3:8.1f} ms  "
+              f"{os.path.getsize(csv_path) / 1e6:6.1f} MB")
+        print(f"bin   write {bin_write * 1e3:8.1f} ms  open {bin_open * 1e3:6.3f} ms  "
+              f"random access {bin_access * 1e6:6.1f} us  iterate all {bin_scan * 1e3:8.1f} ms  "
+              f"{os.path.getsize(bin_path) / 1e6:6.1f} MB")
+        dump.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
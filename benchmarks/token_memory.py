@@ -0,0 +1,55 @@
+"""Compare the memory held by analyze_code's list of tuples with a TokenBuffer.
+
+Run from the repository root:  python -m benchmarks.token_memory [lines]
+"""
+import gc
+import sys
+import tracemalloc
+
+from lexical_gui import analyze_code
+from token_buffer import TokenBuffer
+
+SNIPPET = """\
+int compute_{n}(int a, int b) {{
+    int total_{n} = a * 2 + b;   // running total
+    float ratio = 9.5;
+    if (total_{n} >= 100 && ratio != 0) {{
+        printf("big %d\\n", total_{n});
+    }}
+    return total_{n};
+}}
+"""
+
+
+def make_source(lines):
+    per = SNIPPET.count('\n')
+    return ''.join(SNIPPET.format(n=i) for i in range(lines // per + 1))
+
+
+def measure(build, source):
+    gc.collect()
+    tracemalloc.start()
+    result = build(source)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main(argv):
+    lines = int(argv[1]) if len(argv) > 1 else 200_000
+    source = make_source(lines)
+    print(f"source: {source.count(chr(10)):,} lines, {len(source):,} chars")
+
+    tokens, held, peak = measure(analyze_code, source)
+    n = len(tokens)
+    print(f"{'list of tuples':<16} {held / 1e6:8.1f} MB held  {peak / 1e6:8.1f} MB peak  {held / n:6.1f} B/token")
+    del tokens
+
+    buf, held, peak = measure(TokenBuffer.from_source, source)
+    assert len(buf) == n
+    print(f"{'TokenBuffer':<16} {held / 1e6:8.1f} MB held  {peak / 1e6:8.1f} MB peak  {held / n:6.1f} B/token")
+    print(f"tokens: {n:,}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
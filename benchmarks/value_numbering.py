@@ -0,0 +1,66 @@
+"""What global value numbering saves in the target code.
+
+Run from the repository root:
+    python -m benchmarks.value_numbering                    # 2K to 32K lines
+    python -m benchmarks.value_numbering --sizes 5000 --mix branch=4,loop=4
+
+Each size is a program from benchmarks.corpus, optimized with the default
+passes once without 'gvn' and once with it, then turned into target code
+by generate_code with every variable in memory. The table gives the
+computations and loads GVN removed, and what that does to the LOAD,
+STORE and ADD instructions and to the target code as a whole.
+"""
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.corpus import generate, parse_mix
+from code_generation import generate_code
+from const_fold import fold_constants
+from cparser import parse_with_errors
+from ir import lower
+from optimization import DEFAULT_ORDER, PassManager
+
+SIZES = (2_000, 8_000, 32_000)
+OPCODES = ('LOAD', 'STORE', 'ADD')
+
+
+def compile_counts(tree, order):
+    """(PassManager, Counter of target opcodes, optimizer seconds) for tree optimized with the passes in order."""
+    program = lower(tree, fold_constants(tree).constants)
+    manager = PassManager(order)
+    start = time.perf_counter()
+    manager.run(program)
+    seconds = time.perf_counter() - start
+    target = generate_code(program.tac())
+    return manager, Counter(line.split()[0] for line in target if not line.endswith(':')), seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='value_numbering', description="Measure what GVN saves in the target code.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="lines per program, comma separated")
+    parser.add_argument('--mix', default='', help="statement weights, e.g. branch=4")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    without = tuple(name for name in DEFAULT_ORDER if name != 'gvn')
+    print(f"{'lines':>8} {'removed':>8}" + ''.join(f" {opcode:>17}" for opcode in OPCODES)
+          + f" {'target':>17} {'optimize ms':>17}")
+    for size in sizes:
+        tree, _ = parse_with_errors(generate(size, mix, args.seed))
+        _, before, slow = compile_counts(tree, without)
+        manager, after, fast = compile_counts(tree, DEFAULT_ORDER)
+        columns = [(before[opcode], after[opcode]) for opcode in OPCODES]
+        columns.append((sum(before.values()), sum(after.values())))
+        print(f"{size:>8,} {manager.stats['gvn'].changes:>8,}"
+              + ''.join(f" {old:>8,}{new - old:>+9,}" for old, new in columns)
+              + f" {slow * 1e3:>8.0f}{fast * 1e3:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""C types for the semantic checker, interned so that `a is b` is type equality.
+
+Constructing a type looks it up by its parts and returns the existing
+object if there is one: Pointer(INT) is Pointer(INT). Parts are interned
+types themselves, so the lookup hashes a handful of object ids however
+deep the type is. Sizes follow the LP64 model gcc uses on x86-64.
+Qualifiers are not part of the type. The table only holds types that are
+still in use, so checking one version of a file after another does not
+pile up the types of the old ones.
+"""
+import weakref
+
+_interned = weakref.WeakValueDictionary()
+
+# name -> (integer conversion rank, size in bytes, unsigned); floating types rank above every integer
+BASIC = {
+    'void': (-1, 1, False),
+    '_Bool': (0, 1, True),
+    'char': (1, 1, False),
+    'signed char': (1, 1, False),
+    'unsigned char': (1, 1, True),
+    'short': (2, 2, False),
+    'unsigned short': (2, 2, True),
+    'int': (3, 4, False),
+    'unsigned int': (3, 4, True),
+    'long': (4, 8, False),
+    'unsigned long': (4, 8, True),
+    'long long': (5, 8, False),
+    'unsigned long long': (5, 8, True),
+    'float': (6, 4, False),
+    'double': (7, 8, False),
+    'long double': (8, 16, False),
+}
+POINTER_SIZE = 8
+
+
+class CType:
+    __slots__ = ('__weakref__',)
+    integer = floating = arithmetic = scalar = False
+
+    def __new__(cls, *parts):
+        key = (cls,) + parts
+        t = _interned.get(key)
+        if t is None:
+            t = _interned[key] = object.__new__(cls)
+            t._init(*parts)
+        return t
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __str__(self):
+        return spell(self)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {spell(self)}>"
+
+
+class Basic(CType):
+    """void and the arithmetic types, by their canonical name, e.g. Basic('unsigned long')."""
+
+    __slots__ = ('name', 'rank', 'size', 'unsigned', 'integer', 'floating', 'arithmetic', 'scalar')
+
+    def _init(self, name):
+        self.name = name
+        self.rank, self.size, self.unsigned = BASIC[name]
+        self.floating = self.rank > 5
+        self.integer = 0 <= self.rank <= 5
+        self.arithmetic = self.scalar = self.rank >= 0
+
+
+class Pointer(CType):
+    __slots__ = ('target',)
+    scalar = True
+    size = POINTER_SIZE
+
+    def _init(self, target):
+        self.target = target
+
+
+class Array(CType):
+    """length is None when it is not given or not a constant."""
+
+    __slots__ = ('element', 'length')
+
+    def _init(self, element, length):
+        self.element = element
+        self.length = length
+
+    @property
+    def size(self):
+        return None if self.length is None or self.element.size is None else self.length * self.element.size
+
+
+class Function(CType):
+    """params is a tuple of parameter types, or None for an old-style `f()` declaration."""
+
+    __slots__ = ('result', 'params', 'variadic')
+    size = None
+
+    def _init(self, result, params, variadic=False):
+        self.result = result
+        self.params = params
+        self.variadic = variadic
+
+
+class Tagged(CType):
+    """A struct or union; tag is None for an anonymous one.
+
+    Every struct or union declared is a type of its own, so these are not
+    interned: each Tagged() is a new type. members maps each field name to
+    its type once the definition is seen, and is None while the type is
+    incomplete.
+    """
+
+    __slots__ = ('kind', 'tag', 'members')
+
+    def __new__(cls, kind, tag):
+        t = object.__new__(cls)
+        t.kind = kind
+        t.tag = tag
+        t.members = None
+        return t
+
+    @property
+    def size(self):
+        if self.members is None:
+            return None
+        sizes = [t.size or 0 for t in self.members.values()]
+        return (max(sizes, default=0) if self.kind == 'union' else sum(sizes)) or None
+
+
+VOID = Basic('void')
+BOOL = Basic('_Bool')
+CHAR = Basic('char')
+INT = Basic('int')
+UINT = Basic('unsigned int')
+LONG = Basic('long')
+ULONG = Basic('unsigned long')
+DOUBLE = Basic('double')
+SIZE_T = ULONG
+PTRDIFF_T = LONG
+STRING = Array(CHAR, None)
+
+
+def from_specifiers(names):
+    """The Basic type named by a list of specifiers, e.g. ('unsigned', 'long', 'int')."""
+    names = tuple(names)
+    if 'void' in names:
+        return VOID
+    if '_Bool' in names:
+        return BOOL
+    if 'float' in names:
+        return Basic('float')
+    if 'double' in names:
+        return Basic('long double') if 'long' in names else DOUBLE
+    sign = 'unsigned ' if 'unsigned' in names else ''
+    if 'char' in names:
+        return Basic(sign + 'char' if sign or 'signed' not in names else 'signed char')
+    longs = names.count('long')
+    return Basic(sign + ('short' if 'short' in names else 'long long' if longs > 1 else 'long' if longs else 'int'))
+
+
+def decay(t):
+    """The type of an expression of type t used as a value: arrays and functions become pointers."""
+    if isinstance(t, Array):
+        return Pointer(t.element)
+    if isinstance(t, Function):
+        return Pointer(t)
+    return t
+
+
+def promote(t):
+    """Integer promotion: every integer type narrower than int becomes int."""
+    return INT if t.integer and t.rank < 3 else t
+
+
+def usual_arithmetic(a, b):
+    """The common type of a binary operation on arithmetic types a and b."""
+    if a.floating or b.floating:
+        return a if a.rank >= b.rank else b
+    a, b = promote(a), promote(b)
+    if a is b:
+        return a
+    if a.unsigned == b.unsigned:
+        return a if a.rank >= b.rank else b
+    unsigned, signed = (a, b) if a.unsigned else (b, a)
+    if unsigned.rank >= signed.rank:
+        return unsigned
+    if signed.size > unsigned.size:
+        return signed
+    return Basic('unsigned ' + signed.name)
+
+
+def compatible(a, b):
+    """Whether a and b may denote the same object or function (C11 6.2.7), ignoring qualifiers."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, Pointer):
+        return compatible(a.target, b.target)
+    if isinstance(a, Array):
+        return (a.length is None or b.length is None or a.length == b.length) and compatible(a.element, b.element)
+    if isinstance(a, Function):
+        if not compatible(a.result, b.result):
+            return False
+        if a.params is None or b.params is None:
+            return True
+        return (a.variadic == b.variadic and len(a.params) == len(b.params)
+                and all(compatible(x, y) for x, y in zip(a.params, b.params)))
+    return False
+
+
+def composite(a, b):
+    """Of two compatible types, the one that says more: a known array length, a prototype."""
+    if isinstance(a, Array) and a.length is None:
+        return b
+    if isinstance(a, Function) and a.params is None:
+        return b
+    return a
+
+
+def spell(t, inner=''):
+    """C spelling of t, e.g. 'int *', 'char [4]' or 'int (*)(int, ...)'."""
+    while True:
+        if isinstance(t, Pointer):
+            inner = '*' + inner
+            if isinstance(t.target, (Array, Function)):
+                inner = f"({inner})"
+            t = t.target
+        elif isinstance(t, Array):
+            inner = f"{inner}[{'' if t.length is None else t.length}]"
+            t = t.element
+        elif isinstance(t, Function):
+            params = ['void'] if t.params == () else [spell(p) for p in t.params or ()]
+            if t.variadic:
+                params.append('...')
+            inner = f"{inner}({', '.join(params)})"
+            t = t.result
+        else:
+            base = t.name if isinstance(t, Basic) else f"{t.kind} {t.tag or '<anonymous>'}"
+            if inner and inner[0] not in '*(':
+                inner = ' ' + inner
+            return f"{base} {inner}" if inner.startswith(('*', '(')) else base + inner
@@ -0,0 +1,223 @@
+"""Control-flow graphs and dominator trees for ir.Function.
+
+    graph = CFG(function)
+    tree = DominatorTree(graph)
+    tree.frontiers()                # block -> the blocks on its dominance frontier
+
+A block is a run of instructions that control enters only at the top and
+leaves only at the bottom: it starts at a label or after a jump or
+return, and ends at a jump, a return or the next label. Blocks keep the
+order of the function body, so falling through goes to the next block.
+Blocks that cannot be reached from the entry are left out.
+
+Dominators are computed with the iterative algorithm of Cooper, Harvey
+and Kennedy ("A Simple, Fast Dominance Algorithm"): with the blocks
+numbered in reverse postorder, each block's immediate dominator is the
+nearest common dominator of its predecessors seen so far. On the
+reducible graphs that C's structured statements give, two passes
+suffice, so the cost grows about linearly with the number of blocks.
+"""
+from ir import JUMPS, Instr, fresh_prefix
+
+
+class Block:
+    __slots__ = ('index', 'instrs', 'succs', 'preds')
+
+    def __init__(self, index):
+        self.index = index          # position in CFG.blocks
+        self.instrs = []
+        self.succs = []
+        self.preds = []
+
+    @property
+    def label(self):
+        """The block's first label, or None."""
+        instrs = self.instrs
+        return instrs[0].args[0] if instrs and instrs[0].op == 'label' else None
+
+    def body(self):
+        """Index of the first instruction after the block's labels."""
+        i = 0
+        instrs = self.instrs
+        while i < len(instrs) and instrs[i].op == 'label':
+            i += 1
+        return i
+
+    def __repr__(self):
+        return f"<Block {self.index} {self.label or ''}>"
+
+
+class CFG:
+    def __init__(self, function):
+        self.function = function
+        blocks = []
+        targets = {}                # label -> block
+        current = None
+        for instr in function.body:
+            op = instr.op
+            if current is None or op == 'label' and current.instrs and current.instrs[-1].op != 'label':
+                current = Block(len(blocks))
+                blocks.append(current)
+            current.instrs.append(instr)
+            if op == 'label':
+                targets[instr.args[0]] = current
+            elif op in JUMPS or op == 'return':
+                current = None
+        if not blocks:
+            blocks.append(Block(0))
+
+        for i, block in enumerate(blocks):
+            last = block.instrs[-1] if block.instrs else None
+            op = last.op if last is not None else None
+            if op in JUMPS:
+                target = targets.get(last.args[-1])
+                if target is not None:
+                    self.link(block, target)
+            if op not in ('goto', 'return') and i + 1 < len(blocks):
+                self.link(block, blocks[i + 1])
+
+        if blocks[0].preds:
+            # A loop at the very top: the entry gets a block of its own, for what runs once before it
+            entry = Block(0)
+            blocks.insert(0, entry)
+            for i, block in enumerate(blocks):
+                block.index = i
+            self.link(entry, blocks[1])
+
+        self.blocks = blocks
+        self.entry = blocks[0]
+        reached = set(self.reverse_postorder())
+        if len(reached) < len(blocks):
+            self.blocks = [block for block in blocks if block in reached]
+            for i, block in enumerate(self.blocks):
+                block.index = i
+                block.preds = [pred for pred in block.preds if pred in reached]
+
+    @staticmethod
+    def link(source, target):
+        if target not in source.succs:
+            source.succs.append(target)
+            target.preds.append(source)
+
+    def reverse_postorder(self):
+        """The blocks reachable from the entry, each before its successors except along back edges."""
+        order = []
+        seen = {self.entry}
+        stack = [(self.entry, iter(self.entry.succs))]
+        while stack:
+            block, succs = stack[-1]
+            for succ in succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append((succ, iter(succ.succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def by_label(self):
+        """label -> block, for every label of every block."""
+        return {instr.args[0]: block for block in self.blocks for instr in block.instrs[:block.body()]}
+
+    def label_blocks(self):
+        """Give every block a label of its own, so instructions such as phis can name it."""
+        names = {block.label for block in self.blocks if block.label is not None}
+        prefix = fresh_prefix(names, 'B')
+        for block in self.blocks:
+            if block.label is None:
+                block.instrs.insert(0, Instr('label', None, [f"{prefix}{block.index}"]))
+
+    def instructions(self):
+        """The function body the blocks make, in their order."""
+        return [instr for block in self.blocks for instr in block.instrs]
+
+
+class DominatorTree:
+    """Immediate dominators of a CFG's blocks.
+
+    order is the reverse postorder the tree was computed in; parent maps
+    each block to its immediate dominator (None for the entry) and
+    children maps it to the blocks it immediately dominates.
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        order = self.order = cfg.reverse_postorder()
+        number = {block: i for i, block in enumerate(order)}
+        preds = [[number[pred] for pred in block.preds] for block in order]
+        idom = [-1] * len(order)
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for i in range(1, len(order)):
+                new = -1
+                for p in preds[i]:
+                    if idom[p] < 0:
+                        continue            # not processed yet
+                    if new < 0:
+                        new = p
+                        continue
+                    a = p
+                    while a != new:
+                        while a > new:
+                            a = idom[a]
+                        while new > a:
+                            new = idom[new]
+                if idom[i] != new:
+                    idom[i] = new
+                    changed = True
+
+        self.parent = {order[0]: None}
+        self.children = {block: [] for block in order}
+        for i in range(1, len(order)):
+            parent = order[idom[i]]
+            self.parent[order[i]] = parent
+            self.children[parent].append(order[i])
+        # Preorder and postorder numbers of the tree answer `dominates` in constant time
+        self._enter, self._leave = {}, {}
+        clock = 0
+        stack = [(order[0], False)]
+        while stack:
+            block, leaving = stack.pop()
+            if leaving:
+                self._leave[block] = clock
+            else:
+                self._enter[block] = clock
+                stack.append((block, True))
+                stack.extend((child, False) for child in reversed(self.children[block]))
+            clock += 1
+
+    def dominates(self, a, b):
+        """Whether every path from the entry to b passes through a (a block dominates itself)."""
+        return self._enter[a] <= self._enter[b] and self._leave[b] <= self._leave[a]
+
+    def preorder(self):
+        """The blocks, each after its dominator."""
+        result = []
+        stack = [self.order[0]]
+        while stack:
+            block = stack.pop()
+            result.append(block)
+            stack.extend(reversed(self.children[block]))
+        return result
+
+    def frontiers(self):
+        """block -> the blocks where its dominance ends: joins it reaches but does not dominate."""
+        parent = self.parent
+        frontier = {block: [] for block in self.order}
+        for block in self.order:
+            if len(block.preds) < 2:
+                continue
+            stop = parent[block]
+            for pred in block.preds:
+                runner = pred
+                while runner is not stop:
+                    found = frontier[runner]
+                    if found and found[-1] is block:
+                        break           # this walk has been here already
+                    found.append(block)
+                    runner = parent[runner]
+        return frontier
@@ -1,92 +1,218 @@
+import re
 import tkinter as tk
+from bisect import bisect_left, bisect_right
 from tkinter import filedialog, scrolledtext
-from pycparser import c_parser, c_ast
+from c_types import Array
+from cfg import CFG
+from dataflow import Liveness
+from ir import lower
+from sementic import DEFINE_RE, SemanticChecker
+from session import Session
+from symbol_table import SymbolTable
 
 
 # ====== Symbol Table Extraction ======
-def parse_c_file(file_path):
-    with open(file_path, 'r') as file:
-        c_code = file.read()
-
-    # Remove #include lines (pycparser cannot handle real headers)
-    c_code = '\n'.join(line for line in c_code.splitlines() if not line.strip().startswith('#'))
-
-    parser = c_parser.CParser()
-    try:
-        ast = parser.parse(c_code)
-    except Exception as e:
-        return f"Error parsing C code:\n{e}"
-
-    symbol_table = {}
-
-    class SymbolVisitor(c_ast.NodeVisitor):
-        def __init__(self):
-            self.counter = 1
-
-        def visit_Decl(self, node):
-            var_name = node.name
-            var_type = self._get_type(node.type)
-            var_size = '4 bytes'
-            var_dimension = '1'
-
-            if isinstance(node.type, c_ast.ArrayDecl):
-                if isinstance(node.type.dim, c_ast.Constant):
-                    var_dimension = node.type.dim.value
-                    var_size = f"{int(var_dimension) * 4} bytes"
-
-            var_address = f"memory[{self.counter}]"
-            self.counter += 1
-
-            symbol_table[var_name] = {
-                'type': var_type,
-                'size': var_size,
-                'dimension': var_dimension,
-                'address': var_address
-            }
-
-        def _get_type(self, node):
-            if isinstance(node, c_ast.TypeDecl):
-                return self._get_type(node.type)
-            elif isinstance(node, c_ast.IdentifierType):
-                return ' '.join(node.names)
-            elif isinstance(node, c_ast.PtrDecl):
-                return f"pointer to {self._get_type(node.type)}"
-            elif isinstance(node, c_ast.ArrayDecl):
-                return f"array of {self._get_type(node.type)}"
-            return "unknown"
-
-    visitor = SymbolVisitor()
-    visitor.visit(ast)
-    return symbol_table
+class _RecordingTable(SymbolTable):
+    """A SymbolTable that keeps every variable and function declared, in order."""
+
+    def __init__(self):
+        super().__init__()
+        self.declared = []
+
+    def declare(self, symbol):
+        if symbol.kind in ('variable', 'function'):
+            self.declared.append(symbol)
+        return super().declare(symbol)
+
+
+class _RecordingChecker(SemanticChecker):
+    table = _RecordingTable
+
+
+def symbol_table(tree, source=''):
+    """name -> type, size, dimension and address of what a cparser FileAST declares.
+
+    The types are the semantic checker's, so sizes follow c_types; a name
+    declared in more than one scope shows its last declaration.
+    """
+    checker = _RecordingChecker(DEFINE_RE.findall(source))
+    checker.check(tree)
+    table = {}
+    for address, symbol in enumerate(checker.symbols.declared, 1):
+        t = symbol.type
+        size = t.size if t is not None else None
+        table[symbol.name] = {
+            'type': str(t) if t is not None else 'unknown',
+            'size': f"{size} bytes" if size is not None else '-',
+            'dimension': str(t.length) if isinstance(t, Array) and t.length is not None else '1',
+            'address': f"memory[{address}]",
+        }
+    return table
+
+
+# ====== AST to Three Address Code ======
+def lower_to_tac(tree):
+    """Three address code for a cparser FileAST, as a list of lines."""
+    return lower(tree).tac()
+
+
+# ====== Register Allocation ======
+REGISTERS = 8
+
+
+def live_ranges(function):
+    """name -> (first, last): the span of instruction positions, in block order, where the name is live or used.
+
+    Parameters arrive in memory and are left there. So is a name whose span
+    contains a call: every function is allocated the same registers, and
+    nothing saves them around a CALL.
+    """
+    graph = CFG(function)
+    live = Liveness(graph)
+    is_register = function.is_register
+    params = set(function.params)
+    first, last = {}, {}
+    calls = []
+    position = 0
+    for block in graph.blocks:
+        for name in live.members(live.live_in[block.index]):
+            first.setdefault(name, position)
+        for instr in block.instrs:
+            if instr.op == 'call':
+                calls.append(position)
+            for name in instr.uses():
+                first.setdefault(name, position)
+                last[name] = position
+            name = instr.defines()
+            if name is not None:
+                first.setdefault(name, position)
+                last[name] = position
+            position += 1
+        for name in live.members(live.live_out[block.index]):
+            last[name] = position - 1
+    ranges = {}
+    for name, start in first.items():
+        end = last[name]
+        if is_register(name) and name not in params and bisect_right(calls, start) == bisect_left(calls, end):
+            ranges[name] = (start, end)
+    return ranges
+
+
+def allocate_registers(function, count=REGISTERS):
+    """name -> register ('R0', 'R1', ...) for the register variables of an ir.Function.
+
+    Linear scan (Poletto and Sarkar) over the live ranges: when all count
+    registers are taken, the range that ends last stays in memory and has
+    no entry.
+    """
+    ranges = sorted(live_ranges(function).items(), key=lambda item: item[1][0])
+    free = [f"R{i}" for i in reversed(range(count))]
+    active = []                 # (end, name), by end
+    assigned = {}
+    for name, (start, end) in ranges:
+        while active and active[0][0] < start:
+            free.append(assigned[active.pop(0)[1]])
+        if free:
+            assigned[name] = free.pop()
+        elif active and active[-1][0] > end:
+            spilled = active.pop()[1]
+            assigned[name] = assigned.pop(spilled)
+        else:
+            continue
+        active.append((end, name))
+        active.sort()
+    return assigned
+
+
+def allocate_program(program, count=REGISTERS):
+    """function name -> allocate_registers(function, count), for each function of an ir.Program."""
+    return {function.name: allocate_registers(function, count) for function in program.functions}
 
 
 # ====== TAC to Target Code Generator ======
-def generate_code(tac_code):
+OPCODES = {
+    '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV', '%': 'MOD',
+    '<<': 'SHL', '>>': 'SHR', '&': 'AND', '|': 'OR', '^': 'XOR',
+    '==': 'CMPEQ', '!=': 'CMPNE', '<': 'CMPLT', '<=': 'CMPLE', '>': 'CMPGT', '>=': 'CMPGE',
+}
+UNARY_OPCODES = {'-': 'NEG', '!': 'NOT', '~': 'COMPL', '&': 'ADDR', '*': 'DEREF', 'sizeof': 'SIZEOF'}
+_UNSPACED = re.compile(r'(\w+)(<<|>>|==|!=|<=|>=|[-+*/%&|^<>])(\w+)')
+
+
+# A name, except a field after . or ->; quoted literals match whole so their text is left alone
+_NAME = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|(?<![.\w])(?<!->)([A-Za-z_]\w*)')
+
+
+def _in_registers(line, words, allocation):
+    """line with the names in allocation replaced by their registers."""
+    def rename(text):
+        return _NAME.sub(lambda m: allocation.get(m.group(1), m.group()) if m.group(1) else m.group(), text)
+
+    head = words[0]
+    if head in ('if', 'ifFalse') and len(words) > 3 and words[-2] == 'goto':
+        return f"{head} {rename(' '.join(words[1:-2]))} goto {words[-1]}"
+    if head in ('param', 'return'):
+        return f"{head} {rename(line.split(None, 1)[1])}" if len(words) > 1 else line
+    if head in ('goto', 'endfunc') or '=' not in line:
+        return line
+    dest, _, expr = line.partition('=')
+    if expr.split()[:1] == ['call']:
+        return f"{rename(dest)}={expr}"
+    return rename(line)
+
+
+def generate_code(tac_code, registers=None):
+    """Target code lines for TAC lines; registers, as from allocate_program, puts names in registers."""
+    registers = registers or {}
+    allocation = {}
     target_code = []
     for line in tac_code:
+        words = line.split()
+        if not words:
+            continue
+        if line.endswith(':'):
+            target_code.append(line)
+            continue
+        if words[0] == 'func':
+            target_code.append(f"{words[1]}:")
+            allocation = registers.get(words[1], {})
+            continue
+        if allocation:
+            line = _in_registers(line, words, allocation)
+            words = line.split()
+        if words[0] == 'endfunc':
+            continue
+        if words[0] == 'goto':
+            target_code.append(f"JMP {words[1]}")
+            continue
+        if words[0] in ('if', 'ifFalse') and len(words) > 3 and words[-2] == 'goto':
+            target_code.append(f"LOAD {' '.join(words[1:-2])}")
+            target_code.append(f"{'JNZ' if words[0] == 'if' else 'JZ'} {words[-1]}")
+            continue
+        if words[0] == 'param':
+            target_code.append(f"PUSH {line.split(None, 1)[1]}")
+            continue
+        if words[0] == 'return':
+            if len(words) > 1:
+                target_code.append(f"LOAD {line.split(None, 1)[1]}")
+            target_code.append("RET")
+            continue
         if '=' not in line:
             continue
 
-        parts = line.split('=')
-        dest = parts[0].strip()
-        expr = parts[1].strip()
-
-        if '+' in expr:
-            op1, op2 = map(str.strip, expr.split('+'))
-            target_code.append(f"LOAD {op1}")
-            target_code.append(f"ADD {op2}")
-        elif '-' in expr:
-            op1, op2 = map(str.strip, expr.split('-'))
-            target_code.append(f"LOAD {op1}")
-            target_code.append(f"SUB {op2}")
-        elif '*' in expr:
-            op1, op2 = map(str.strip, expr.split('*'))
-            target_code.append(f"LOAD {op1}")
-            target_code.append(f"MUL {op2}")
-        elif '/' in expr:
-            op1, op2 = map(str.strip, expr.split('/'))
-            target_code.append(f"LOAD {op1}")
-            target_code.append(f"DIV {op2}")
+        dest, expr = (part.strip() for part in line.split('=', 1))
+        # TAC from lower_to_tac spaces its operands; hand-written "a+b" may not
+        unspaced = _UNSPACED.fullmatch(expr)
+        operands = list(unspaced.groups()) if unspaced else expr.split()
+
+        if len(operands) == 3 and operands[1] in OPCODES:
+            target_code.append(f"LOAD {operands[0]}")
+            target_code.append(f"{OPCODES[operands[1]]} {operands[2]}")
+        elif len(operands) == 2 and operands[0] in UNARY_OPCODES:
+            target_code.append(f"LOAD {operands[1]}")
+            target_code.append(UNARY_OPCODES[operands[0]])
+        elif operands[0] == 'call':
+            target_code.append(f"CALL {operands[1].rstrip(',')}")
         else:
             target_code.append(f"MOVE {expr}")
 
@@ -96,14 +222,18 @@ def generate_code(tac_code):
 
 # ====== GUI Class ======
 class TACCodeGeneratorApp:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("C Symbol Table and TAC Generator")
         self.dark_mode = False
         self.tac_code = []
 
         self.create_widgets()
         self.set_light_mode()
+        if self.session.source:
+            # Show the window first, then parse
+            self.root.after_idle(self.analyze_source)
 
     def create_widgets(self):
         self.frame = tk.Frame(self.root)
@@ -137,26 +267,21 @@ class TACCodeGeneratorApp:
     def load_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("C Files", "*.c")])
         if file_path:
-            result = parse_c_file(file_path)
-            if isinstance(result, str):  # Error string
-                self.output_text.delete(1.0, tk.END)
-                self.output_text.insert(tk.END, result)
-                return
-            symbol_table = result
-            self.update_symbol_table(symbol_table)
-
-            self.tac_code = self.generate_sample_tac_code()
+            self.session.load(file_path)
+            self.analyze_source()
+
+    def analyze_source(self):
+        tree, diagnostics = self.session.parsed()
+        self.update_symbol_table(symbol_table(tree, self.session.source))
+        if diagnostics:
             self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(tk.END, "TAC Code:\n")
-            for line in self.tac_code:
-                self.output_text.insert(tk.END, line + "\n")
-
-    def generate_sample_tac_code(self):
-        return [
-            "t1 = a + b",
-            "t2 = t1 * c",
-            "t3 = t2 - d"
-        ]
+            self.output_text.insert(tk.END, "Error parsing C code:\n" + "\n".join(map(str, diagnostics)))
+            return
+        self.tac_code = lower_to_tac(tree)
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, "TAC Code:\n")
+        for line in self.tac_code:
+            self.output_text.insert(tk.END, line + "\n")
 
     def update_symbol_table(self, symbol_table):
         header = "Name\tType\tSize\tDimension\tAddress\n"
@@ -0,0 +1,678 @@
+"""Constant folding and propagation on the AST, with C's arithmetic.
+
+ConstantFolder walks each function once, in statement order, and keeps
+the values its local variables are known to hold. A variable is only
+followed while nothing but plain assignments to it can change it: its
+address is never taken, it is not static or volatile, and it has an
+arithmetic type. Where control flow joins, a value survives only if every
+path agrees on it; a loop forgets the variables it assigns, a label
+forgets everything.
+
+Values are computed as gcc computes them on x86-64 (the LP64 sizes of
+c_types): integer results wrap to the width of their type, division
+truncates toward zero, and the usual arithmetic conversions decide the
+type of each operation. What C leaves undefined and gcc does not fold,
+such as division by zero or shifting by the width or more, is left to
+run time.
+
+fold_constants(tree) returns the folder; its `constants` maps every
+expression node without side effects whose value is known to that
+(value, type) pair, and lowering emits the constant instead of the code.
+"""
+import math
+import operator
+import struct
+from functools import lru_cache
+
+import ast_nodes as c_ast
+from c_types import (BOOL, DOUBLE, INT, SIZE_T, Array, Basic, Pointer, Tagged, from_specifiers,
+                     promote, usual_arithmetic)
+from symbol_table import Symbol, SymbolTable
+
+TYPE_KEYWORDS = frozenset(('void', 'char', 'short', 'int', 'long', 'float', 'double', 'signed', 'unsigned', '_Bool'))
+COMPARISONS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+ESCAPES = {'n': 10, 't': 9, 'r': 13, '0': 0, 'a': 7, 'b': 8, 'f': 12, 'v': 11, '\\': 92, "'": 39, '"': 34, '?': 63}
+
+
+def wrap(value, t):
+    """value reduced to what an object of integer type t can hold, two's complement."""
+    if t is BOOL:
+        return int(value != 0)
+    bits = t.size * 8
+    value &= (1 << bits) - 1
+    if not t.unsigned and value >> (bits - 1):
+        value -= 1 << bits
+    return value
+
+
+def _rounded(value, t):
+    """A double result as type t holds it, or None when it does not fit or is not finite."""
+    if t.name == 'float':
+        try:
+            value = struct.unpack('f', struct.pack('f', value))[0]
+        except OverflowError:
+            return None
+    elif t.name == 'long double':
+        return None     # wider than a Python float; gcc's value would differ
+    return value if math.isfinite(value) else None
+
+
+def convert(value, source, target):
+    """value of arithmetic type source converted to target, or None if C leaves that undefined."""
+    if target.floating:
+        return _rounded(float(value), target)
+    if source.floating:
+        if target is BOOL:
+            return int(value != 0)
+        value = int(value)
+        return value if wrap(value, target) == value else None
+    return wrap(value, target)
+
+
+@lru_cache(maxsize=4096)
+def _integer(op, a, b, t):
+    if op == '+':
+        return wrap(a + b, t)
+    if op == '-':
+        return wrap(a - b, t)
+    if op == '*':
+        return wrap(a * b, t)
+    if op in ('/', '%'):
+        if b == 0:
+            return None
+        q = abs(a) // abs(b)
+        if (a < 0) != (b < 0):
+            q = -q
+        return wrap(q if op == '/' else a - b * q, t)
+    if op == '&':
+        return wrap(a & b, t)
+    if op == '|':
+        return wrap(a | b, t)
+    if op == '^':
+        return wrap(a ^ b, t)
+    return None
+
+
+def binary(op, a, ta, b, tb):
+    """(value, type) of `a op b` for arithmetic operands, or None when it is not a constant."""
+    if not (ta.arithmetic and tb.arithmetic):
+        return None
+    if op in ('<<', '>>'):
+        if not (ta.integer and tb.integer):
+            return None
+        t = promote(ta)
+        a = wrap(a, t)
+        if b < 0 or b >= t.size * 8 or (op == '<<' and a < 0):
+            return None
+        return wrap(a << b if op == '<<' else a >> b, t), t
+    t = usual_arithmetic(ta, tb)
+    a, b = convert(a, ta, t), convert(b, tb, t)
+    if a is None or b is None:
+        return None
+    if op in COMPARISONS:
+        return int(COMPARISONS[op](a, b)), INT
+    if t.integer:
+        value = _integer(op, a, b, t)
+    elif op == '+':
+        value = _rounded(a + b, t)
+    elif op == '-':
+        value = _rounded(a - b, t)
+    elif op == '*':
+        value = _rounded(a * b, t)
+    elif op == '/' and b != 0:
+        value = _rounded(a / b, t)
+    else:
+        value = None
+    return None if value is None else (value, t)
+
+
+def unary(op, a, ta):
+    """(value, type) of `op a` for '+', '-', '~' and '!', or None."""
+    if not ta.arithmetic:
+        return None
+    if op == '!':
+        return int(not a), INT
+    t = promote(ta)
+    a = convert(a, ta, t)
+    if op == '+':
+        return a, t
+    if op == '-':
+        return (wrap(-a, t) if t.integer else -a), t
+    if op == '~' and t.integer:
+        return wrap(~a, t), t
+    return None
+
+
+@lru_cache(maxsize=4096)
+def literal(text):
+    """(value, type) of a C number or character constant, e.g. '0x1Fu', '2.5f' or "'\\n'", or None."""
+    negative = text.startswith('-')
+    if negative:
+        text = text[1:]
+    lower = text.lower()
+    if lower.startswith("'"):
+        value = _character(text[1:-1])
+        return None if value is None else (value, INT)
+    try:
+        if lower.startswith('0x') and 'p' in lower or not lower.startswith('0x') and ('.' in lower or 'e' in lower):
+            digits = lower.rstrip('fl')
+            value = float.fromhex(digits) if digits.startswith('0x') else float(digits)
+            t = Basic('float') if lower.endswith('f') else Basic('long double') if lower.endswith('l') else DOUBLE
+            value = _rounded(-value if negative else value, t)
+            return None if value is None else (value, t)
+        digits = lower.rstrip('ul')
+        suffix = lower[len(digits):]
+        decimal = not digits.startswith('0') or digits == '0'
+        value = int(digits, 10 if decimal else 16 if digits.startswith('0x') else 8)
+    except ValueError:
+        return None
+    # The first type that can represent it, among those its suffix allows (C11 6.4.4.1)
+    longs = 'long long ' if 'll' in suffix else 'long ' if 'l' in suffix else ''
+    names = ['int', 'long', 'long long'] if not longs else ['long', 'long long'] if longs == 'long ' else ['long long']
+    for name in names:
+        for unsigned in ((True,) if 'u' in suffix else (False,) if decimal else (False, True)):
+            t = Basic(('unsigned ' if unsigned else '') + name)
+            if value < 1 << (t.size * 8 - (0 if unsigned else 1)):
+                return (wrap(-value, t) if negative else value), t
+    return None
+
+
+def _character(body):
+    """Value of the text between the quotes of a plain character constant; char is signed."""
+    if body.startswith('\\'):
+        rest = body[1:]
+        try:
+            if rest[:1] == 'x':
+                value = int(rest[1:], 16)
+            elif rest[:1].isdigit():
+                value = int(rest, 8) if len(rest) <= 3 else None
+            else:
+                value = ESCAPES.get(rest) if len(rest) == 1 else None
+        except ValueError:
+            return None
+    else:
+        value = ord(body) if len(body) == 1 and ord(body) < 128 else None
+    if value is None or value > 255:
+        return None
+    return value - 256 if value > 127 else value
+
+
+def spell(value, t):
+    """A C constant with the given value and type, e.g. '42', '4294967295u' or '2.5f'."""
+    if t.floating:
+        return repr(value) + ('f' if t.name == 'float' else '')
+    if not t.integer or t.rank < 3:
+        return str(value)       # promoted to int wherever it is used
+    return str(value) + ('u' if t.unsigned else '') + ('l' * (t.rank - 3))
+
+
+def _same(a, b):
+    return a is b or (a is not None and b is not None and a[1] is b[1] and a[0] == b[0]
+                      and (type(a[0]) is int or math.copysign(1, a[0]) == math.copysign(1, b[0])))
+
+
+def _merge(a, b):
+    """What is known after either of two paths; None stands for a path that cannot be taken."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return {symbol: value for symbol, value in a.items() if _same(value, b.get(symbol))}
+
+
+def _scan(body):
+    """(names whose address is taken, {loop or switch node: names assigned in it}) for a function body.
+
+    One walk does it: each loop's names are added to its enclosing loop's
+    when the walk leaves it. A for loop's initializer counts as outside it.
+    """
+    escaped, assigned = set(), {}
+    sets = [set()]
+    stack = [body]
+    while stack:
+        node = stack.pop()
+        if type(node) is tuple:             # (loop,): the walk is leaving it
+            names = assigned[node[0]] = sets.pop()
+            sets[-1] |= names
+            continue
+        if isinstance(node, c_ast.Assignment):
+            if isinstance(node.lvalue, c_ast.ID):
+                sets[-1].add(node.lvalue.name)
+        elif isinstance(node, c_ast.UnaryOp):
+            if isinstance(node.expr, c_ast.ID):
+                if node.op in ('++', '--', 'p++', 'p--'):
+                    sets[-1].add(node.expr.name)
+                elif node.op == '&':
+                    escaped.add(node.expr.name)
+        elif isinstance(node, (c_ast.While, c_ast.DoWhile, c_ast.For, c_ast.Switch)):
+            if isinstance(node, c_ast.For) and node.init is not None:
+                stack.append(node.init)
+            stack.append((node,))
+            sets.append(set())
+            stack.extend(child for child in node if not (isinstance(node, c_ast.For) and child is node.init))
+            continue
+        stack.extend(node)
+    return escaped, assigned
+
+
+class ConstantFolder(c_ast.NodeVisitor):
+    """One forward walk over a FileAST; see the module docstring.
+
+    Expression visitors return (value, type) when the value is known and
+    None otherwise. `known` maps the Symbol of each followed variable to
+    its (value, type), or is None where the code cannot be reached.
+    """
+
+    def __init__(self):
+        self.names = SymbolTable()
+        self.constants = {}     # expression node -> (value, type)
+        self.followed = set()   # Symbols of the variables whose values are followed
+        self.fixed = {}         # Symbol -> (value, type) for enumerators and const objects at file scope
+        self.known = self.fixed
+        self.escaped = set()    # names whose address the current function takes
+        self.assigned = {}      # loop or switch node of the current function -> names it assigns
+        self.effects = 0        # side effects seen so far
+        self.switches = []      # what was known at the head of each enclosing switch
+        self.folded = self.propagated = 0
+
+    # --- values ---
+    def value(self, node):
+        """Visit an expression whose value is used, and remember it if it is a constant."""
+        effects = self.effects
+        result = self.visit(node)
+        if result is not None and self.effects == effects and not isinstance(node, c_ast.Constant):
+            self.constants[node] = result
+            if isinstance(node, c_ast.ID):
+                self.propagated += 1
+            else:
+                self.folded += 1
+        return result
+
+    def unevaluated(self, node):
+        """Visit code that does not run here, such as the other arm of `0 ? a : b`."""
+        known, effects = self.known, self.effects
+        self.known = dict(known) if known is not None else None
+        result = self.value(node)
+        self.known, self.effects = known, effects
+        return result
+
+    def set(self, symbol, result):
+        if self.known is None:
+            return
+        if result is None:
+            self.known.pop(symbol, None)
+        else:
+            self.known[symbol] = result
+
+    def kill(self, names):
+        if self.known is not None and names:
+            for symbol in [s for s in self.known if s.name in names]:
+                del self.known[symbol]
+
+    def copy(self):
+        return dict(self.known) if self.known is not None else None
+
+    # --- types ---
+    def resolve(self, node):
+        """The c_types type of a declarator or type name, or None if it is not one this folder needs."""
+        if isinstance(node, (c_ast.Typename, c_ast.TypeDecl)):
+            inner = node.type
+            if isinstance(inner, c_ast.IdentifierType):
+                if all(name in TYPE_KEYWORDS for name in inner.names):
+                    return from_specifiers(inner.names)
+                symbol = self.names.lookup(inner.names[0]) if len(inner.names) == 1 else None
+                return symbol.type if symbol is not None and symbol.kind == 'typedef' else None
+            return self.resolve(inner)
+        if isinstance(node, c_ast.Enum):
+            self.enum(node)
+            return INT
+        if isinstance(node, (c_ast.Struct, c_ast.Union)):
+            return Tagged(type(node).__name__.lower(), node.name)
+        if isinstance(node, c_ast.PtrDecl):
+            return Pointer(self.resolve(node.type) or INT)
+        if isinstance(node, c_ast.ArrayDecl):
+            element = self.resolve(node.type)
+            length = self.value(node.dim) if node.dim is not None else None
+            if element is None:
+                return None
+            return Array(element, length[0] if length is not None and type(length[0]) is int else None)
+        return None
+
+    def enum(self, node):
+        if node.values is None:
+            return
+        value = 0
+        for enumerator in node.values.enumerators:
+            if enumerator.value is not None:
+                result = self.value(enumerator.value)
+                value = result[0] if result is not None and type(result[0]) is int else None
+            symbol = Symbol(enumerator.name, 'enumerator', enumerator, type=INT)
+            self.names.declare(symbol)
+            if value is not None:
+                self.set(symbol, (value, INT))
+                value += 1
+
+    def size(self, t):
+        size = t.size if t is not None else None
+        return (size, SIZE_T) if size else None
+
+    # --- declarations ---
+    def visit_FileAST(self, node):
+        for ext in node.ext:
+            self.visit(ext)
+
+    def visit_FuncDef(self, node):
+        decl = node.decl
+        self.names.declare(Symbol(decl.name, 'function', decl))
+        self.escaped, self.assigned = _scan(node.body)
+        self.known = dict(self.fixed)
+        self.names.push()
+        args = decl.type.args if isinstance(decl.type, c_ast.FuncDecl) else None
+        for param in (args.params if args is not None else ()):
+            if isinstance(param, c_ast.Decl) and param.name is not None:
+                self.declare(param, self.resolve(param.type))
+        for item in node.body.block_items:
+            self.visit(item)
+        self.names.pop()
+        self.known = self.fixed
+
+    def declare(self, node, t):
+        symbol = Symbol(node.name, 'variable', node, type=t)
+        self.names.declare(symbol)
+        if t is not None and t.arithmetic and 'volatile' not in node.quals and self.names.depth \
+                and not {'static', 'extern'} & set(node.storage) and node.name not in self.escaped:
+            self.followed.add(symbol)
+        return symbol
+
+    def visit_Decl(self, node):
+        t = self.resolve(node.type)
+        if node.name is None:
+            return
+        if isinstance(node.type, c_ast.FuncDecl):
+            self.names.declare(Symbol(node.name, 'function', node))
+            return
+        symbol = self.declare(node, t)
+        if node.init is None:
+            return
+        if isinstance(node.init, c_ast.InitList):
+            self.visit(node.init)
+            return
+        result = self.value(node.init)
+        if result is not None and t is not None and t.arithmetic:
+            value = convert(result[0], result[1], t)
+            result = None if value is None else (value, t)
+        else:
+            result = None
+        # A const object never changes; at file scope, `known` is `fixed` and every function sees it
+        if symbol in self.followed or 'const' in node.quals and 'volatile' not in node.quals:
+            self.set(symbol, result)
+
+    def visit_Typedef(self, node):
+        self.names.declare(Symbol(node.name, 'typedef', node, type=self.resolve(node.type)))
+
+    def visit_InitList(self, node):
+        for expr in node.exprs:
+            if isinstance(expr, c_ast.InitList):
+                self.visit(expr)
+            else:
+                self.value(expr)
+
+    # --- statements ---
+    def visit_Compound(self, node):
+        self.names.push()
+        for item in node.block_items:
+            self.visit(item)
+        self.names.pop()
+
+    def visit_If(self, node):
+        cond = self.value(node.cond)
+        if cond is not None:
+            taken, skipped = (node.iftrue, node.iffalse) if cond[0] else (node.iffalse, node.iftrue)
+            if skipped is not None:
+                known = self.known
+                self.known = self.copy()
+                self.visit(skipped)
+                self.known = known
+            if taken is not None:
+                self.visit(taken)
+            return
+        before = self.copy()
+        self.visit(node.iftrue)
+        after = self.known
+        self.known = before
+        if node.iffalse is not None:
+            self.visit(node.iffalse)
+        self.known = _merge(after, self.known)
+
+    def loop(self, node, cond, body, step=None, test_first=True):
+        self.kill(self.assigned.get(node))
+        head = self.copy()
+        if test_first and cond is not None:
+            result = self.value(cond)
+            if result is not None and not result[0]:
+                known = self.known
+                self.known = self.copy()
+                self.visit(body)
+                self.known = known
+                return
+        self.visit(body)
+        if step is not None:
+            self.known = dict(head) if head is not None else None
+            self.value(step)
+        if not test_first:
+            self.known = dict(head) if head is not None else None
+            self.value(cond)
+        # Every exit leaves through the test or a break, where only what the loop keeps is known
+        self.known = head
+
+    def visit_While(self, node):
+        self.loop(node, node.cond, node.stmt)
+
+    def visit_DoWhile(self, node):
+        self.loop(node, node.cond, node.stmt, test_first=False)
+
+    def visit_For(self, node):
+        self.names.push()
+        if node.init is not None:
+            self.visit(node.init)
+        self.loop(node, node.cond, node.stmt, node.next)
+        self.names.pop()
+
+    def visit_Switch(self, node):
+        self.value(node.cond)
+        self.kill(self.assigned.get(node))
+        head = self.copy()
+        self.switches.append(head)
+        self.known = None
+        self.visit(node.stmt)
+        self.switches.pop()
+        self.known = head
+
+    def visit_Case(self, node):
+        self.value(node.expr)
+        self.visit_Default(node)
+
+    def visit_Default(self, node):
+        # Reached from the switch, or by falling through from the statements before
+        head = self.switches[-1] if self.switches else None
+        self.known = _merge(self.known, dict(head) if head is not None else None)
+        for stmt in node.stmts:
+            self.visit(stmt)
+
+    def visit_Label(self, node):
+        # A goto may arrive from anywhere
+        self.known = dict(self.fixed)
+        self.visit(node.stmt)
+
+    def visit_Return(self, node):
+        if node.expr is not None:
+            self.value(node.expr)
+        self.known = None
+
+    def visit_Goto(self, node):
+        self.known = None
+
+    visit_Break = visit_Continue = visit_Goto
+
+    # --- expressions ---
+    def visit_Constant(self, node):
+        if node.type == 'string':
+            return None
+        return literal(node.value)
+
+    def visit_ID(self, node):
+        symbol = self.names.lookup(node.name)
+        if symbol is None or self.known is None:
+            return None
+        return self.known.get(symbol)
+
+    def visit_Typename(self, node):
+        return None
+
+    def lvalue(self, node):
+        """Visit the subexpressions an lvalue reads; returns the Symbol it names if that is followed."""
+        if isinstance(node, c_ast.ID):
+            symbol = self.names.lookup(node.name)
+            return symbol if symbol in self.followed else None
+        if isinstance(node, c_ast.ArrayRef):
+            self.lvalue(node.name)
+            self.value(node.subscript)
+        elif isinstance(node, c_ast.StructRef):
+            self.lvalue(node.name) if node.type == '.' else self.value(node.name)
+        elif isinstance(node, c_ast.UnaryOp) and node.op == '*':
+            self.value(node.expr)
+        else:
+            self.value(node)
+        return None
+
+    def update(self, symbol, op, operand):
+        """Value of `symbol op= operand` as stored, after conversion to the symbol's type."""
+        current = self.known.get(symbol) if self.known is not None else None
+        if current is None or operand is None:
+            return None
+        result = binary(op, current[0], current[1], operand[0], operand[1])
+        if result is None:
+            return None
+        value = convert(result[0], result[1], symbol.type)
+        return None if value is None else (value, symbol.type)
+
+    def visit_Assignment(self, node):
+        result = self.value(node.rvalue)
+        symbol = self.lvalue(node.lvalue)
+        self.effects += 1
+        if symbol is None:
+            return None
+        if node.op == '=':
+            if result is not None:
+                value = convert(result[0], result[1], symbol.type)
+                result = None if value is None else (value, symbol.type)
+        else:
+            result = self.update(symbol, node.op[:-1], result)
+        self.set(symbol, result)
+        return result
+
+    def visit_UnaryOp(self, node):
+        op = node.op
+        if op in ('++', '--', 'p++', 'p--'):
+            symbol = self.lvalue(node.expr)
+            self.effects += 1
+            if symbol is None:
+                return None
+            before = self.known.get(symbol) if self.known is not None else None
+            after = self.update(symbol, op[-1], (1, INT))
+            self.set(symbol, after)
+            return before if op[0] == 'p' else after
+        if op == 'sizeof':
+            # The operand is not evaluated
+            if isinstance(node.expr, c_ast.Typename):
+                return self.size(self.resolve(node.expr))
+            if isinstance(node.expr, c_ast.ID):
+                symbol = self.names.lookup(node.expr.name)
+                return self.size(symbol.type) if symbol is not None and symbol.kind == 'variable' else None
+            return None
+        if op == '&':
+            self.lvalue(node.expr)
+            return None
+        operand = self.value(node.expr)
+        if operand is None or op == '*':
+            return None
+        return unary(op, operand[0], operand[1])
+
+    def visit_BinaryOp(self, node):
+        op = node.op
+        left = self.value(node.left)
+        if op in ('&&', '||'):
+            if left is not None and bool(left[0]) == (op == '||'):
+                self.unevaluated(node.right)
+                return int(op == '||'), INT
+            before = self.copy()
+            right = self.value(node.right)
+            self.known = _merge(before, self.known) if left is None else self.known
+            if right is not None and bool(right[0]) == (op == '||') and left is None:
+                # The left side still runs, but cannot change the outcome
+                return int(op == '||'), INT
+            if left is None or right is None:
+                return None
+            return int(bool(right[0])), INT
+        right = self.value(node.right)
+        if left is None or right is None:
+            return None
+        return binary(op, left[0], left[1], right[0], right[1])
+
+    def visit_TernaryOp(self, node):
+        cond = self.value(node.cond)
+        if cond is not None:
+            taken, skipped = (node.iftrue, node.iffalse) if cond[0] else (node.iffalse, node.iftrue)
+            other = self.unevaluated(skipped)
+            result = self.value(taken)
+        else:
+            before = self.copy()
+            result = self.value(node.iftrue)
+            after = self.known
+            self.known = before
+            other = self.value(node.iffalse)
+            self.known = _merge(after, self.known)
+            if not _same(result, other):
+                return None
+        if result is None or other is None:
+            return None
+        t = usual_arithmetic(result[1], other[1]) if result[1].arithmetic and other[1].arithmetic else None
+        value = convert(result[0], result[1], t) if t is not None else None
+        return None if value is None else (value, t)
+
+    def visit_Cast(self, node):
+        result = self.value(node.expr)
+        t = self.resolve(node.to_type)
+        if result is None or t is None or not t.arithmetic:
+            return None
+        value = convert(result[0], result[1], t)
+        return None if value is None else (value, t)
+
+    def visit_FuncCall(self, node):
+        self.value(node.name)
+        if node.args is not None:
+            for arg in node.args.exprs:
+                self.value(arg)
+        self.effects += 1
+        return None
+
+    def visit_ExprList(self, node):
+        result = None
+        for expr in node.exprs:
+            result = self.value(expr)
+        return result
+
+    def visit_ArrayRef(self, node):
+        self.lvalue(node)
+        return None
+
+    def visit_StructRef(self, node):
+        self.lvalue(node)
+        return None
+
+
+def fold_constants(tree):
+    """Run a ConstantFolder over a FileAST and return it; see its `constants`."""
+    folder = ConstantFolder()
+    folder.visit(tree)
+    return folder
@@ -0,0 +1,741 @@
+"""Recursive-descent parser for C over the scanner engine's token stream.
+
+Declarations and statements are parsed by recursive descent, expressions by
+precedence climbing. The result is an ast_nodes.FileAST.
+
+Errors do not stop the parse: each one is recorded as a Diagnostic and the
+parser skips ahead to the next ';', closing '}' or statement keyword
+(panic mode) and carries on, so a single pass reports every problem up to
+max_errors.
+"""
+import re
+import sys
+from collections import namedtuple
+
+import ast_nodes as c_ast
+from token_buffer import TokenBuffer
+from tokenizer import KIND_NAMES, scanner_spans
+
+TYPE_SPECIFIERS = frozenset(('void', 'char', 'short', 'int', 'long', 'float', 'double',
+                             'signed', 'unsigned', '_Bool'))
+STORAGE_CLASSES = frozenset(('typedef', 'extern', 'static', 'auto', 'register', 'inline'))
+QUALIFIERS = frozenset(('const', 'volatile', 'restrict'))
+TAG_KEYWORDS = frozenset(('struct', 'union', 'enum'))
+DECLARATION_START = TYPE_SPECIFIERS | STORAGE_CLASSES | QUALIFIERS | TAG_KEYWORDS
+
+BINARY_PRECEDENCE = {
+    '||': 1, '&&': 2, '|': 3, '^': 4, '&': 5,
+    '==': 6, '!=': 6, '<': 7, '>': 7, '<=': 7, '>=': 7,
+    '<<': 8, '>>': 8, '+': 9, '-': 9, '*': 10, '/': 10, '%': 10,
+}
+ASSIGNMENT_OPERATORS = frozenset(('=', '*=', '/=', '%=', '+=', '-=', '<<=', '>>=', '&=', '^=', '|='))
+UNARY_OPERATORS = frozenset(('&', '*', '+', '-', '~', '!'))
+
+# Tokens that start a fresh statement; panic mode resumes parsing at them.
+STATEMENT_KEYWORDS = frozenset(('if', 'while', 'do', 'for', 'switch', 'case', 'default',
+                                'return', 'break', 'continue', 'goto'))
+
+MAX_ERRORS = 100
+
+_TERMINATED = {
+    'STRING': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.DOTALL),
+    'CHAR': re.compile(r"'(?:[^'\\\n]|\\.)+'", re.DOTALL),
+}
+
+
+class Diagnostic(namedtuple('Diagnostic', ['line', 'column', 'message'])):
+    __slots__ = ()
+
+    def __str__(self):
+        return f"Line {self.line}, column {self.column}: {self.message}"
+
+
+class ParseError(Exception):
+    def __init__(self, message, line=0, column=0, diagnostics=()):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+        self.diagnostics = list(diagnostics)
+
+    def __str__(self):
+        return f"Line {self.line}, column {self.column}: {self.message}"
+
+
+class _TooManyErrors(Exception):
+    pass
+
+
+def constant_type(text):
+    """C type of a numeric literal, e.g. 'int', 'unsigned long int' or 'double'."""
+    lower = text.lower()
+    if lower.startswith('0x'):
+        is_float = 'p' in lower
+    else:
+        is_float = '.' in lower or 'e' in lower
+    if is_float:
+        return 'float' if lower.endswith('f') else 'long double' if lower.endswith('l') else 'double'
+    suffix = lower[len(lower.rstrip('ul')):]
+    return ('unsigned ' if 'u' in suffix else '') + 'long ' * suffix.count('l') + 'int'
+
+
+class Parser:
+    """Parses one token stream; use parse() unless you need the parser state."""
+
+    def __init__(self, tokens, max_errors=MAX_ERRORS):
+        tokens.flush()
+        source = tokens.source
+        self.kinds, self.values, self.lines, self.columns = [], [], [], []
+        self.errors = {}          # token index -> message for malformed tokens
+        self.typedefs = set()
+        self.pos = 0
+        self.diagnostics = []
+        self.max_errors = max_errors
+        self._reported = -1       # token index of the last diagnostic
+        self._resumed = -1        # token index panic mode last resumed at
+        add_kind, add_value = self.kinds.append, self.values.append
+        add_line, add_column = self.lines.append, self.columns.append
+        intern = sys.intern
+        line, line_start, counted = 1, 0, 0
+        for code, start, end in zip(tokens.kinds, tokens.starts, tokens.ends):
+            kind = KIND_NAMES[code]
+            n = source.count('\n', counted, start)
+            if n:
+                line += n
+                line_start = source.rfind('\n', counted, start) + 1
+            counted = start
+            value = source[start:end]
+            if kind == 'COMMENT' and value.startswith('/*') and (len(value) < 4 or not value.endswith('*/')):
+                self.errors[len(self.kinds)] = "unterminated comment"
+            elif kind in ('COMMENT', 'DIRECTIVE'):
+                continue
+            elif kind in _TERMINATED and not _TERMINATED[kind].fullmatch(value):
+                self.errors[len(self.kinds)] = f"missing terminating {value[0]} character"
+            elif kind == 'UNKNOWN':
+                self.errors[len(self.kinds)] = f"stray '{value}' in program"
+            elif kind in ('IDENTIFIER', 'KEYWORD'):
+                value = intern(value)
+            add_kind('ERROR' if len(self.kinds) in self.errors else kind)
+            add_value(value)
+            add_line(line)
+            add_column(start - line_start + 1)
+        line += source.count('\n', counted)
+        column = len(source) - source.rfind('\n')
+        for _ in range(2):
+            add_kind('EOF')
+            add_value('')
+            add_line(line)
+            add_column(column)
+
+    # Token helpers
+
+    def where(self):
+        return self.lines[self.pos], self.columns[self.pos]
+
+    def at(self, value):
+        return self.values[self.pos] == value and self.kinds[self.pos] != 'ERROR'
+
+    def accept(self, value):
+        if self.at(value):
+            self.pos += 1
+            return True
+        return False
+
+    def found(self):
+        return "end of input" if self.kinds[self.pos] == 'EOF' else f"'{self.values[self.pos]}'"
+
+    def report(self, message, line=None, column=None):
+        """Record a diagnostic at the current token; at most one per token."""
+        if self.kinds[self.pos] == 'ERROR':
+            message = self.errors[self.pos]
+            line = column = None
+        if line is None:
+            line, column = self.where()
+        if self.pos != self._reported:
+            self._reported = self.pos
+            self.diagnostics.append(Diagnostic(line, column, message))
+            if len(self.diagnostics) >= self.max_errors:
+                raise _TooManyErrors
+        return Diagnostic(line, column, message)
+
+    def error(self, message, line=None, column=None):
+        line, column, message = self.report(message, line, column)
+        raise ParseError(message, line, column)
+
+    def expect(self, value):
+        if self.accept(value):
+            return
+        line = column = None
+        prev = self.pos - 1
+        if prev >= 0 and self.lines[prev] < self.lines[self.pos]:
+            # Point just past the previous token, where the missing ';' belongs.
+            line, column = self.lines[prev], self.columns[prev] + len(self.values[prev])
+            if value == ';' and self.kinds[self.pos] != 'ERROR':
+                # A ';' missing at the end of a line: report it and carry on as if it were there.
+                self.report(f"expected ';' before {self.found()}", line, column)
+                return
+        self.error(f"expected '{value}' before {self.found()}", line, column)
+
+    def synchronize(self, top=False):
+        """Panic mode: skip to a token where parsing can sensibly resume.
+
+        Stops after a ';' or a balanced '{...}' block, before a '}' closing
+        the enclosing block, or before a statement keyword or declaration
+        that starts a line. The token an earlier recovery resumed at is
+        never resumed at twice, so the parser always makes progress.
+        """
+        depth = 0
+        if self.pos == self._resumed and self.kinds[self.pos] != 'EOF':
+            self.pos += 1
+        while self.kinds[self.pos] != 'EOF':
+            kind, value = self.kinds[self.pos], self.values[self.pos]
+            if kind == 'DELIMITER':
+                if value == ';' and depth == 0:
+                    self.pos += 1
+                    break
+                if value == '{':
+                    depth += 1
+                elif value == '}':
+                    if depth == 0:
+                        if top:
+                            self.pos += 1
+                        break
+                    depth -= 1
+                    if depth == 0:
+                        self.pos += 1
+                        break
+            elif (depth == 0 and kind == 'KEYWORD'
+                  and ((value in STATEMENT_KEYWORDS and not top)
+                       or (value in DECLARATION_START and self.lines[self.pos] > self.lines[self.pos - 1]))):
+                break
+            self.pos += 1
+        self._resumed = self.pos
+
+    def identifier(self):
+        if self.kinds[self.pos] != 'IDENTIFIER':
+            self.error(f"expected an identifier before {self.found()}")
+        self.pos += 1
+        return self.values[self.pos - 1]
+
+    def starts_type_name(self, k=0):
+        value = self.values[self.pos + k]
+        kind = self.kinds[self.pos + k]
+        if kind == 'IDENTIFIER':
+            return value in self.typedefs or value in QUALIFIERS or value == '_Bool'
+        return kind == 'KEYWORD' and value in DECLARATION_START and value not in STORAGE_CLASSES
+
+    def starts_declaration(self):
+        value = self.values[self.pos]
+        if self.kinds[self.pos] == 'IDENTIFIER':
+            if value in self.typedefs:
+                return self.kinds[self.pos + 1] == 'IDENTIFIER' or self.values[self.pos + 1] == '*'
+            return value in QUALIFIERS or value in ('inline', '_Bool')
+        return self.kinds[self.pos] == 'KEYWORD' and value in DECLARATION_START
+
+    # Declarations
+
+    def parse(self):
+        """Parse the whole stream; problems are collected in self.diagnostics."""
+        ext = []
+        try:
+            while self.kinds[self.pos] != 'EOF':
+                if self.accept(';'):
+                    continue
+                try:
+                    ext.extend(self.external_declaration())
+                except ParseError:
+                    self.synchronize(top=True)
+        except RecursionError:
+            try:
+                self.report("code is nested too deeply")
+            except _TooManyErrors:
+                pass
+        except _TooManyErrors:
+            pass
+        return c_ast.FileAST(ext, 1, 1)
+
+    def block_item(self, items):
+        try:
+            if self.starts_declaration():
+                items.extend(self.declaration())
+            else:
+                items.append(self.statement())
+        except ParseError:
+            self.synchronize()
+
+    def external_declaration(self):
+        line, column = self.where()
+        storage, quals, base = self.declaration_specifiers()
+        if self.accept(';'):
+            return [c_ast.Decl(None, quals, storage, base, None, None, line, column)]
+        first = self.declarator()
+        name, dline, dcolumn, ops = first
+        if ops and ops[-1][0] == 'func' and self.at('{') and 'typedef' not in storage:
+            decl = c_ast.Decl(name, quals, storage, self.build_type(name, quals, base, ops, dline, dcolumn),
+                              None, None, dline, dcolumn)
+            return [c_ast.FuncDef(decl, None, self.compound_statement(), line, column)]
+        return self.init_declarators(storage, quals, base, first)
+
+    def declaration(self):
+        line, column = self.where()
+        storage, quals, base = self.declaration_specifiers()
+        if self.accept(';'):
+            return [c_ast.Decl(None, quals, storage, base, None, None, line, column)]
+        return self.init_declarators(storage, quals, base)
+
+    def declaration_specifiers(self):
+        """Return (storage classes, qualifiers, base type node)."""
+        line, column = self.where()
+        storage, quals, names = [], [], []
+        base = None
+        while True:
+            value = self.values[self.pos]
+            kind = self.kinds[self.pos]
+            if kind not in ('KEYWORD', 'IDENTIFIER'):
+                break
+            if value in STORAGE_CLASSES:
+                storage.append(value)
+            elif value in QUALIFIERS:
+                quals.append(value)
+            elif value in TYPE_SPECIFIERS and base is None:
+                names.append(value)
+            elif value in TAG_KEYWORDS and base is None and not names:
+                base = self.enum_specifier() if value == 'enum' else self.struct_specifier()
+                continue
+            elif kind == 'IDENTIFIER' and value in self.typedefs and base is None and not names:
+                names.append(value)
+            else:
+                break
+            self.pos += 1
+        if base is None:
+            if not names:
+                self.error(f"expected a type before {self.found()}")
+            base = c_ast.IdentifierType(tuple(names), line, column)
+        return storage, quals, base
+
+    def struct_specifier(self):
+        line, column = self.where()
+        cls = c_ast.Struct if self.values[self.pos] == 'struct' else c_ast.Union
+        self.pos += 1
+        name = self.identifier() if self.kinds[self.pos] == 'IDENTIFIER' else None
+        decls = None
+        if self.accept('{'):
+            decls = []
+            while not self.accept('}'):
+                mline, mcolumn = self.where()
+                storage, quals, base = self.declaration_specifiers()
+                if self.accept(';'):
+                    decls.append(c_ast.Decl(None, quals, storage, base, None, None, mline, mcolumn))
+                    continue
+                while True:
+                    if self.at(':'):
+                        member, dline, dcolumn, ops = None, mline, mcolumn, []
+                    else:
+                        member, dline, dcolumn, ops = self.declarator()
+                    bits = self.conditional_expression() if self.accept(':') else None
+                    decls.append(c_ast.Decl(member, quals, storage,
+                                            self.build_type(member, quals, base, ops, dline, dcolumn),
+                                            None, bits, dline, dcolumn))
+                    if not self.accept(','):
+                        break
+                self.expect(';')
+        elif name is None:
+            self.error(f"expected a name or '{{' before {self.found()}")
+        return cls(name, decls, line, column)
+
+    def enum_specifier(self):
+        line, column = self.where()
+        self.pos += 1
+        name = self.identifier() if self.kinds[self.pos] == 'IDENTIFIER' else None
+        values = None
+        if self.at('{'):
+            vline, vcolumn = self.where()
+            self.pos += 1
+            enumerators = []
+            while not self.at('}'):
+                eline, ecolumn = self.where()
+                ename = self.identifier()
+                value = self.conditional_expression() if self.accept('=') else None
+                enumerators.append(c_ast.Enumerator(ename, value, eline, ecolumn))
+                if not self.accept(','):
+                    break
+            self.expect('}')
+            values = c_ast.EnumeratorList(enumerators, vline, vcolumn)
+        elif name is None:
+            self.error(f"expected a name or '{{' before {self.found()}")
+        return c_ast.Enum(name, values, line, column)
+
+    def declarator(self, abstract=False):
+        """Parse a (possibly abstract) declarator.
+
+        Returns (name, line, column, ops) where ops lists the type
+        constructors ('ptr', quals), ('array', dim) and ('func', params)
+        in the order they wrap the base type, innermost first.
+        """
+        ptrs = []
+        while self.at('*'):
+            self.pos += 1
+            quals = []
+            while self.values[self.pos] in QUALIFIERS:
+                quals.append(self.values[self.pos])
+                self.pos += 1
+            ptrs.append(('ptr', tuple(quals)))
+        line, column = self.where()
+        name, inner = None, []
+        if self.kinds[self.pos] == 'IDENTIFIER' and not (abstract and self.values[self.pos] in self.typedefs):
+            name = self.values[self.pos]
+            self.pos += 1
+        elif self.at('(') and (not abstract or self.values[self.pos + 1] in ('*', '(', '[')):
+            self.pos += 1
+            name, line, column, inner = self.declarator(abstract)
+            self.expect(')')
+        elif not abstract:
+            self.error(f"expected an identifier before {self.found()}")
+        suffixes = []
+        while True:
+            if self.accept('['):
+                dim = None if self.at(']') else self.assignment_expression()
+                self.expect(']')
+                suffixes.append(('array', dim))
+            elif self.at('('):
+                suffixes.append(('func', self.parameter_list()))
+            else:
+                break
+        return name, line, column, ptrs + suffixes[::-1] + inner
+
+    def parameter_list(self):
+        line, column = self.where()
+        self.pos += 1
+        if self.accept(')'):
+            return None
+        if self.at('void') and self.values[self.pos + 1] == ')':
+            self.pos += 2
+            return c_ast.ParamList([], line, column)
+        params = []
+        while True:
+            if self.at('...'):
+                params.append(c_ast.EllipsisParam(*self.where()))
+                self.pos += 1
+                break
+            pline, pcolumn = self.where()
+            storage, quals, base = self.declaration_specifiers()
+            name, dline, dcolumn, ops = self.declarator(abstract=True)
+            if name is None:
+                dline, dcolumn = pline, pcolumn
+            params.append(c_ast.Decl(name, quals, storage, self.build_type(name, quals, base, ops, dline, dcolumn),
+                                     None, None, dline, dcolumn))
+            if not self.accept(','):
+                break
+        self.expect(')')
+        return c_ast.ParamList(params, line, column)
+
+    def build_type(self, name, quals, base, ops, line, column):
+        node = c_ast.TypeDecl(name, tuple(quals), base, line, column)
+        for op, arg in ops:
+            if op == 'ptr':
+                node = c_ast.PtrDecl(arg, node, line, column)
+            elif op == 'array':
+                node = c_ast.ArrayDecl((), node, arg, line, column)
+            else:
+                node = c_ast.FuncDecl(arg, node, line, column)
+        return node
+
+    def init_declarators(self, storage, quals, base, first=None):
+        decls = []
+        while True:
+            name, line, column, ops = first or self.declarator()
+            first = None
+            node = self.build_type(name, quals, base, ops, line, column)
+            if 'typedef' in storage:
+                self.typedefs.add(name)
+                decls.append(c_ast.Typedef(name, quals, storage, node, line, column))
+            else:
+                init = self.initializer() if self.accept('=') else None
+                decls.append(c_ast.Decl(name, quals, storage, node, init, None, line, column))
+            if not self.accept(','):
+                break
+        self.expect(';')
+        return decls
+
+    def initializer(self):
+        if not self.at('{'):
+            return self.assignment_expression()
+        line, column = self.where()
+        self.pos += 1
+        exprs = []
+        while not self.at('}'):
+            exprs.append(self.initializer())
+            if not self.accept(','):
+                break
+        self.expect('}')
+        return c_ast.InitList(exprs, line, column)
+
+    def type_name(self):
+        line, column = self.where()
+        _, quals, base = self.declaration_specifiers()
+        ops = self.declarator(abstract=True)[3]
+        return c_ast.Typename(None, tuple(quals), self.build_type(None, quals, base, ops, line, column),
+                              line, column)
+
+    # Statements
+
+    def compound_statement(self):
+        line, column = self.where()
+        self.expect('{')
+        items = []
+        while not self.accept('}'):
+            if self.kinds[self.pos] == 'EOF':
+                self.error(f"expected '}}' at end of input to close the '{{' at line {line}, column {column}")
+            self.block_item(items)
+        return c_ast.Compound(items, line, column)
+
+    def statement(self):
+        value = self.values[self.pos]
+        kind = self.kinds[self.pos]
+        line, column = self.where()
+        if kind == 'IDENTIFIER' and self.values[self.pos + 1] == ':':
+            self.pos += 2
+            return c_ast.Label(value, self.statement(), line, column)
+        if kind == 'DELIMITER':
+            if value == '{':
+                return self.compound_statement()
+            if value == ';':
+                self.pos += 1
+                return c_ast.EmptyStatement(line, column)
+        elif kind == 'KEYWORD':
+            if value == 'if':
+                return self.if_statement()
+            if value in ('while', 'switch'):
+                self.pos += 1
+                cond = self.condition()
+                cls = c_ast.While if value == 'while' else c_ast.Switch
+                return cls(cond, self.statement(), line, column)
+            if value == 'do':
+                self.pos += 1
+                body = self.statement()
+                self.expect('while')
+                cond = self.condition()
+                self.expect(';')
+                return c_ast.DoWhile(cond, body, line, column)
+            if value == 'for':
+                return self.for_statement()
+            if value == 'case':
+                self.pos += 1
+                expr = self.conditional_expression()
+                self.expect(':')
+                return c_ast.Case(expr, self.case_body(), line, column)
+            if value == 'default':
+                self.pos += 1
+                self.expect(':')
+                return c_ast.Default(self.case_body(), line, column)
+            if value == 'return':
+                self.pos += 1
+                expr = None if self.at(';') else self.expression()
+                self.expect(';')
+                return c_ast.Return(expr, line, column)
+            if value in ('break', 'continue'):
+                self.pos += 1
+                self.expect(';')
+                return c_ast.Break(line, column) if value == 'break' else c_ast.Continue(line, column)
+            if value == 'goto':
+                self.pos += 1
+                name = self.identifier()
+                self.expect(';')
+                return c_ast.Goto(name, line, column)
+        expr = self.expression()
+        self.expect(';')
+        return expr
+
+    def condition(self):
+        self.expect('(')
+        cond = self.expression()
+        self.expect(')')
+        return cond
+
+    def if_statement(self):
+        # else-if chains are linked up afterwards so they do not nest the recursion.
+        chain = []
+        while True:
+            line, column = self.where()
+            self.pos += 1
+            cond = self.condition()
+            node = c_ast.If(cond, self.statement(), None, line, column)
+            chain.append(node)
+            if self.accept('else'):
+                if self.at('if'):
+                    continue
+                node.iffalse = self.statement()
+            break
+        for outer, inner in zip(chain, chain[1:]):
+            outer.iffalse = inner
+        return chain[0]
+
+    def for_statement(self):
+        line, column = self.where()
+        self.pos += 1
+        self.expect('(')
+        if self.starts_declaration():
+            dline, dcolumn = self.where()
+            init = c_ast.DeclList(self.declaration(), dline, dcolumn)
+        else:
+            init = None if self.at(';') else self.expression()
+            self.expect(';')
+        cond = None if self.at(';') else self.expression()
+        self.expect(';')
+        step = None if self.at(')') else self.expression()
+        self.expect(')')
+        return c_ast.For(init, cond, step, self.statement(), line, column)
+
+    def case_body(self):
+        stmts = []
+        while not (self.at('case') or self.at('default') or self.at('}') or self.kinds[self.pos] == 'EOF'):
+            self.block_item(stmts)
+        return stmts
+
+    # Expressions
+
+    def expression(self):
+        line, column = self.where()
+        expr = self.assignment_expression()
+        if self.at(','):
+            exprs = [expr]
+            while self.accept(','):
+                exprs.append(self.assignment_expression())
+            expr = c_ast.ExprList(exprs, line, column)
+        return expr
+
+    def assignment_expression(self):
+        lvalue = self.conditional_expression()
+        op = self.values[self.pos]
+        if op in ASSIGNMENT_OPERATORS and self.kinds[self.pos] == 'OPERATOR':
+            self.pos += 1
+            return c_ast.Assignment(op, lvalue, self.assignment_expression(), lvalue.line, lvalue.column)
+        return lvalue
+
+    def conditional_expression(self):
+        cond = self.binary_expression(1)
+        if self.accept('?'):
+            iftrue = self.expression()
+            self.expect(':')
+            return c_ast.TernaryOp(cond, iftrue, self.conditional_expression(), cond.line, cond.column)
+        return cond
+
+    def binary_expression(self, min_precedence):
+        left = self.cast_expression()
+        while True:
+            op = self.values[self.pos]
+            precedence = BINARY_PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence or self.kinds[self.pos] != 'OPERATOR':
+                return left
+            self.pos += 1
+            right = self.binary_expression(precedence + 1)
+            left = c_ast.BinaryOp(op, left, right, left.line, left.column)
+
+    def cast_expression(self):
+        if self.at('(') and self.starts_type_name(1):
+            line, column = self.where()
+            self.pos += 1
+            to_type = self.type_name()
+            self.expect(')')
+            return c_ast.Cast(to_type, self.cast_expression(), line, column)
+        return self.unary_expression()
+
+    def unary_expression(self):
+        value = self.values[self.pos]
+        kind = self.kinds[self.pos]
+        line, column = self.where()
+        if kind == 'OPERATOR':
+            if value in ('++', '--'):
+                self.pos += 1
+                return c_ast.UnaryOp(value, self.unary_expression(), line, column)
+            if value in UNARY_OPERATORS:
+                self.pos += 1
+                return c_ast.UnaryOp(value, self.cast_expression(), line, column)
+        elif value == 'sizeof' and kind == 'KEYWORD':
+            self.pos += 1
+            if self.at('(') and self.starts_type_name(1):
+                self.pos += 1
+                operand = self.type_name()
+                self.expect(')')
+            else:
+                operand = self.unary_expression()
+            return c_ast.UnaryOp('sizeof', operand, line, column)
+        return self.postfix_expression()
+
+    def postfix_expression(self):
+        expr = self.primary_expression()
+        while True:
+            value = self.values[self.pos]
+            if self.kinds[self.pos] not in ('OPERATOR', 'DELIMITER'):
+                return expr
+            if value == '[':
+                self.pos += 1
+                subscript = self.expression()
+                self.expect(']')
+                expr = c_ast.ArrayRef(expr, subscript, expr.line, expr.column)
+            elif value == '(':
+                line, column = self.where()
+                self.pos += 1
+                args = None
+                if not self.at(')'):
+                    exprs = [self.assignment_expression()]
+                    while self.accept(','):
+                        exprs.append(self.assignment_expression())
+                    args = c_ast.ExprList(exprs, line, column)
+                self.expect(')')
+                expr = c_ast.FuncCall(expr, args, expr.line, expr.column)
+            elif value in ('.', '->'):
+                self.pos += 1
+                line, column = self.where()
+                field = c_ast.ID(self.identifier(), line, column)
+                expr = c_ast.StructRef(value, expr, field, expr.line, expr.column)
+            elif value in ('++', '--'):
+                self.pos += 1
+                expr = c_ast.UnaryOp('p' + value, expr, expr.line, expr.column)
+            else:
+                return expr
+
+    def primary_expression(self):
+        kind = self.kinds[self.pos]
+        value = self.values[self.pos]
+        line, column = self.where()
+        if kind == 'IDENTIFIER':
+            self.pos += 1
+            return c_ast.ID(value, line, column)
+        if kind == 'NUMBER':
+            self.pos += 1
+            return c_ast.Constant(constant_type(value), value, line, column)
+        if kind == 'CHAR':
+            self.pos += 1
+            return c_ast.Constant('char', value, line, column)
+        if kind == 'STRING':
+            parts = []
+            while self.kinds[self.pos] == 'STRING':
+                parts.append(self.values[self.pos][1:-1])
+                self.pos += 1
+            return c_ast.Constant('string', '"' + ''.join(parts) + '"', line, column)
+        if self.accept('('):
+            expr = self.expression()
+            self.expect(')')
+            return expr
+        self.error(f"expected an expression before {self.found()}")
+
+
+def parse_with_errors(code, max_errors=MAX_ERRORS):
+    """Parse C source text, or a scanner-engine TokenBuffer of it.
+
+    Returns (FileAST, diagnostics); the tree leaves out whatever could not
+    be parsed. At most max_errors diagnostics are collected.
+    """
+    tokens = code if isinstance(code, TokenBuffer) else TokenBuffer.from_source(code, scanner_spans)
+    parser = Parser(tokens, max_errors)
+    return parser.parse(), parser.diagnostics
+
+
+def parse(code):
+    """Parse into a FileAST, raising ParseError for the first error."""
+    tree, diagnostics = parse_with_errors(code, max_errors=1)
+    if diagnostics:
+        line, column, message = diagnostics[0]
+        raise ParseError(message, line, column, diagnostics)
+    return tree
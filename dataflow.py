@@ -0,0 +1,295 @@
+"""Iterative data-flow analysis over a cfg.CFG, with sets as bitvectors.
+
+    graph = CFG(function)
+    live = Liveness(graph)
+    live.members(live.live_out[block.index])    # names live leaving block
+
+A set is a Python int whose bit i stands for the i-th item of the
+problem's universe, so the transfer function out = gen | (in & ~kill)
+and the meet over a block's neighbours are a few operations on whole
+sets. solve() finds the fixed point with a worklist ordered by reverse
+postorder (postorder for backward problems) that revisits a block only
+when a neighbour's value has changed.
+
+Liveness, ReachingDefinitions and AvailableExpressions are its first
+clients. To keep the sets small, each tracks only what can cross a
+block boundary: a name read in a block that has not assigned it first
+(a "global name", as in Briggs et al.). Temporaries used only in the
+block that computes them, which are most of them, take no bits.
+"""
+from heapq import heappop, heappush
+
+from ir import BINARY, UNARY, Const
+
+
+def members(bits):
+    """The positions of the set bits, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def solve(graph, gen, kill, forward=True, intersect=False, boundary=0, universe=0):
+    """(ins, outs) at the fixed point, lists indexed by Block.index.
+
+    gen and kill are lists of bitvectors indexed the same way. A block's
+    incoming value is the union of its predecessors' outgoing values, or
+    their intersection if intersect; backward problems swap the roles of
+    predecessors and successors, and of ins and outs. boundary is the
+    value flowing into the entry (for backward problems, into the blocks
+    without successors). universe, the set of all items, starts an
+    intersection off.
+    """
+    order = graph.reverse_postorder()
+    if not forward:
+        order.reverse()
+    count = len(order)
+    start = universe if intersect else 0
+    before = [start] * count        # by rank: value at the block's start in the direction of flow
+    after = [start] * count
+    rank = {block: i for i, block in enumerate(order)}
+    sources = [[rank[b] for b in (block.preds if forward else block.succs)] for block in order]
+    sinks = [[rank[b] for b in (block.succs if forward else block.preds)] for block in order]
+    gen = [gen[block.index] for block in order]
+    kill = [kill[block.index] for block in order]
+
+    # Taking the lowest rank first settles an inner loop before the code after it is revisited
+    work = list(range(count))
+    queued = [True] * count
+    while work:
+        i = heappop(work)
+        queued[i] = False
+        neighbours = sources[i]
+        if not neighbours or forward and i == 0:
+            value = boundary
+        elif intersect:
+            value = universe
+            for j in neighbours:
+                value &= after[j]
+        else:
+            value = 0
+            for j in neighbours:
+                value |= after[j]
+        before[i] = value
+        value = gen[i] | (value & ~kill[i])
+        if value != after[i]:
+            after[i] = value
+            for j in sinks[i]:
+                if not queued[j]:
+                    queued[j] = True
+                    heappush(work, j)
+    # Back to Block.index order
+    ins, outs = [0] * count, [0] * count
+    for i, block in enumerate(order):
+        ins[block.index], outs[block.index] = (before[i], after[i]) if forward else (after[i], before[i])
+    return ins, outs
+
+
+def global_names(graph):
+    """Register names read in some block before that block assigns them, or by a phi, in order of first appearance."""
+    is_register = graph.function.is_register
+    found = {}
+    for block in graph.blocks:
+        assigned = set()
+        for instr in block.instrs:
+            for name in instr.uses():
+                if (name not in assigned or instr.op == 'phi') and is_register(name):
+                    found[name] = None
+            name = instr.defines()
+            if name is not None:
+                assigned.add(name)
+    return list(found)
+
+
+class Liveness:
+    """Which global names (see global_names) are live on entry to and exit from each block.
+
+    live_in and live_out are bitvectors indexed by Block.index; bit i is
+    names[i], and bit[name] is the one-bit mask for name. In SSA form a
+    phi's argument is read at the end of the predecessor it comes from,
+    so it is live out of that block alone.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.names = global_names(graph)
+        bit = self.bit = {name: 1 << i for i, name in enumerate(self.names)}
+        by_label = None
+        edges = [0] * len(graph.blocks)     # phi arguments read leaving each block
+        gen, kill = [], []
+        for block in graph.blocks:
+            used = assigned = 0
+            for instr in block.instrs:
+                if instr.op == 'phi':
+                    if by_label is None:
+                        by_label = graph.by_label()
+                    for name, label in zip(instr.args, instr.labels):
+                        edges[by_label[label].index] |= bit.get(name, 0)
+                else:
+                    for name in instr.uses():
+                        mask = bit.get(name, 0)
+                        if not assigned & mask:
+                            used |= mask
+                assigned |= bit.get(instr.defines(), 0)
+            gen.append(used)
+            kill.append(assigned)
+        if by_label is not None:
+            gen = [used | (edge & ~assigned) for used, edge, assigned in zip(gen, edges, kill)]
+        self.live_in, self.live_out = solve(graph, gen, kill, forward=False)
+        if by_label is not None:
+            self.live_out = [out | edge for out, edge in zip(self.live_out, edges)]
+
+    def members(self, bits):
+        names = self.names
+        return [names[i] for i in members(bits)]
+
+    def dead_definitions(self, block):
+        """The instructions of block, last first, that assign a register name nothing reads afterwards.
+
+        Calls are left out, as they stay for their effects. What a dead
+        instruction reads does not count as read, so a chain of them
+        within the block is found at once.
+        """
+        is_register = self.graph.function.is_register
+        bit = self.bit
+        live = self.live_out[block.index]
+        local = set()               # names without a bit read later in the block
+        for instr in reversed(block.instrs):
+            name = instr.defines()
+            if name is not None and is_register(name):
+                mask = bit.get(name)
+                if mask is None:
+                    dead = name not in local
+                    local.discard(name)
+                else:
+                    dead = not live & mask
+                    live &= ~mask
+                if dead and instr.op != 'call':
+                    yield instr
+                    continue
+            if instr.op == 'phi':
+                continue                # its arguments are live out of the predecessors
+            for name in instr.uses():
+                mask = bit.get(name)
+                if mask is not None:
+                    live |= mask
+                else:
+                    local.add(name)
+
+
+class ReachingDefinitions:
+    """Which assignments to global names reach the entry to and exit from each block.
+
+    definitions lists the tracked instructions, bit i standing for
+    definitions[i]; of[name] is the set of those that assign name. A
+    name none of whose definitions reaches a point holds the value it
+    had on entry to the function there.
+    """
+
+    def __init__(self, graph, names=None):
+        self.graph = graph
+        tracked = set(global_names(graph) if names is None else names)
+        self.definitions = []
+        self.of = {}
+        for block in graph.blocks:
+            for instr in block.instrs:
+                name = instr.defines()
+                if name in tracked:
+                    self.of[name] = self.of.get(name, 0) | 1 << len(self.definitions)
+                    self.definitions.append(instr)
+        of = self.of
+        gen, kill = [], []
+        position = 0
+        for block in graph.blocks:
+            generated = killed = 0
+            for instr in block.instrs:
+                name = instr.defines()
+                if name in of:
+                    mask = 1 << position
+                    position += 1
+                    generated = (generated & ~of[name]) | mask
+                    killed |= of[name]
+            gen.append(generated)
+            kill.append(killed)
+        self.reach_in, self.reach_out = solve(graph, gen, kill)
+
+    def members(self, bits):
+        definitions = self.definitions
+        return [definitions[i] for i in members(bits)]
+
+
+class AvailableExpressions:
+    """Which computations are sure to have been made, with the same operands, on every path to each block.
+
+    An expression is the (op, operands) of an instruction with a BINARY
+    or UNARY operator whose operands are constants and names other than
+    the temporaries local to one block; expressions[i] is the one bit i
+    stands for, and bit[expression] is its mask. Assigning a name kills
+    the expressions that read it, and a call or a store to memory kills
+    those that read a name which may live in memory.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        is_register = graph.function.is_register
+        self.shared = set(global_names(graph))
+        bit = self.bit = {}
+        reading = {}                # name -> mask of the expressions that read it
+        in_memory = 0               # expressions reading a name that may live in memory
+        for block in graph.blocks:
+            for instr in block.instrs:
+                key = self.key(instr)
+                if key is None or key in bit:
+                    continue
+                mask = bit[key] = 1 << len(bit)
+                for operand in key[1]:
+                    if isinstance(operand, str):
+                        reading[operand] = reading.get(operand, 0) | mask
+                        if not is_register(operand):
+                            in_memory |= mask
+        self.expressions = list(bit)
+        self.reading = reading
+        self.in_memory = in_memory
+
+        gen, kill = [], []
+        for block in graph.blocks:
+            generated = killed = 0
+            for instr in block.instrs:
+                generated |= bit.get(self.key(instr), 0)
+                lost = self.kills(instr)
+                if lost:
+                    generated &= ~lost
+                    killed |= lost
+            gen.append(generated)
+            kill.append(killed)
+        universe = (1 << len(bit)) - 1
+        self.avail_in, self.avail_out = solve(graph, gen, kill, intersect=True, universe=universe)
+
+    def key(self, instr):
+        """The expression instr computes, or None if it is not one that is tracked."""
+        op = instr.op
+        if op not in BINARY and op not in UNARY:
+            return None
+        args = tuple(instr.args)
+        for arg in args:
+            if isinstance(arg, str):
+                if arg not in self.shared and self.graph.function.is_register(arg):
+                    return None         # a temporary of one block
+            elif not isinstance(arg, Const):
+                return None
+        return op, args
+
+    def kills(self, instr):
+        """The expressions instr may change the value of."""
+        dest = instr.dest
+        # The callee may store to any variable in memory, whatever the call's result goes to
+        lost = self.in_memory if instr.op == 'call' else 0
+        if isinstance(dest, str):
+            lost |= self.reading.get(dest, 0)
+            return lost if self.graph.function.is_register(dest) else lost | self.in_memory
+        return lost | self.in_memory if dest is not None else lost
+
+    def members(self, bits):
+        expressions = self.expressions
+        return [expressions[i] for i in members(bits)]
@@ -3,18 +3,21 @@ from tkinter import filedialog, scrolledtext, messagebox
 import subprocess
 import os
 import time
+from session import Session
 
 class ModernCCompilerGUI:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("🛠️ Mini C Compiler & Runner")
         self.root.geometry("950x720")
         self.root.resizable(False, False)
         self.dark_mode = False
 
-        self.file_path = ""
+        self.file_path = self.session.path or ""
         self.setup_ui()
         self.set_light_mode()
+        self.code_editor.insert(tk.END, self.session.source)
 
     def setup_ui(self):
         # --- Header Frame ---
@@ -60,8 +63,7 @@ class ModernCCompilerGUI:
         file = filedialog.askopenfilename(filetypes=[("C Files", "*.c")])
         if file:
             try:
-                with open(file, 'r') as f:
-                    code = f.read()
+                code = self.session.load(file)
                 self.code_editor.delete(1.0, tk.END)
                 self.code_editor.insert(tk.END, code)
                 self.file_path = file
@@ -97,6 +99,7 @@ class ModernCCompilerGUI:
         try:
             with open(self.file_path, 'w') as f:
                 f.write(self.code_editor.get(1.0, tk.END))
+            self.session.set_source(self.code_editor.get(1.0, "end-1c"), self.file_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save file before compiling:\n{str(e)}")
             return
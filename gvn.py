@@ -0,0 +1,169 @@
+"""Global value numbering on SSA form.
+
+    counts = value_numbering(function)      # function.body is rewritten
+    counts.computations, counts.loads
+
+Dominator-based value numbering (Briggs, Cooper and Simpson, "Value
+Numbering"): the function goes into SSA form and is walked down its
+dominator tree with a hash table of the computations made so far, keyed
+by operator and the value numbers of the operands. An entry lives only
+while the walk is inside the subtree of the block that made it, so a
+computation is replaced only by one that runs before it on every path.
+A value number is simply the name or constant that first held the value;
+copies and phis whose arguments all agree (leaving aside the phi itself)
+take the number of what they copy.
+
+A load from memory, which is a read of a variable that may live in
+memory or through a Mem operand, is keyed by the memory state as well.
+Each store and call starts a new state. A block starts in the state its
+immediate dominator ended in when nothing on the way from one to the
+other can write memory, and in a state of its own otherwise, so that
+repeated loads of an unchanged variable are found across blocks as well.
+"""
+from itertools import count
+
+from ir import BINARY, UNARY, Const, Mem
+from ssa import from_ssa, to_ssa
+
+COMMUTATIVE = frozenset(('+', '*', '&', '|', '^', '==', '!='))
+
+
+class Eliminated:
+    """How many instructions value_numbering removed, by kind."""
+
+    __slots__ = ('computations', 'loads', 'copies', 'phis')
+
+    def __init__(self):
+        self.computations = self.loads = self.copies = self.phis = 0
+
+    def __repr__(self):
+        return (f"Eliminated(computations={self.computations}, loads={self.loads}, "
+                f"copies={self.copies}, phis={self.phis})")
+
+
+def _writes_memory(instr, is_register):
+    dest = instr.dest
+    return instr.op == 'call' or isinstance(dest, Mem) or isinstance(dest, str) and not is_register(dest)
+
+
+def _sort_key(operand):
+    return isinstance(operand, Const), str(operand)
+
+
+def _clean(parent, block, clobbers):
+    """Whether no path from parent, which dominates block, to block passes a block that writes memory."""
+    seen = set()
+    work = list(block.preds)
+    while work:
+        pred = work.pop()
+        if pred is parent or pred in seen:
+            continue
+        if clobbers[pred]:
+            return False
+        seen.add(pred)
+        work.extend(pred.preds)
+    return True
+
+
+def value_numbering(function):
+    """Remove the computations, loads and copies of an ir.Function that repeat an earlier one; returns an Eliminated."""
+    removed = Eliminated()
+    tree = to_ssa(function)
+    is_register = function.is_register
+    floating = function.floating
+    clobbers = {block: any(_writes_memory(instr, is_register) for instr in block.instrs) for block in tree.order}
+    states = count(1)
+    state = {}                      # block -> memory state at its end
+    value = {}                      # SSA name -> the name or Const holding its value
+    table = {}                      # expression -> the name holding its value
+    dead = set()                    # id of each instruction removed
+
+    def is_floating(operand):
+        return isinstance(operand.value, float) if isinstance(operand, Const) else operand in floating
+
+    stack = [(tree.order[0], None)]
+    while stack:
+        block, added = stack.pop()
+        if added is not None:
+            # Leaving block's subtree: what it computed is no longer available
+            for key in added:
+                del table[key]
+            continue
+        added = []
+        parent = tree.parent[block]
+        memory = state[parent] if parent is not None and _clean(parent, block, clobbers) else next(states)
+
+        for instr in block.instrs:
+            op = instr.op
+            if op == 'label':
+                continue
+            dest = instr.dest
+            if op == 'phi':
+                args = instr.args = [value.get(arg, arg) if isinstance(arg, str) else arg for arg in instr.args]
+                distinct = {arg for arg in args if arg != dest}
+                if len(distinct) == 1:
+                    value[dest] = distinct.pop()
+                    dead.add(id(instr))
+                    removed.phis += 1
+                    continue
+                key = (block, tuple(args))
+            else:
+                instr.replace_uses(value)
+                if _writes_memory(instr, is_register):
+                    memory = next(states)
+                    continue
+                if dest is None:
+                    continue
+                args = instr.args
+                if op == 'copy':
+                    source = args[0]
+                    if isinstance(source, Const) or isinstance(source, str) and is_register(source):
+                        if is_floating(source) == (dest in floating):
+                            value[dest] = source
+                            dead.add(id(instr))
+                            removed.copies += 1
+                        continue
+                    key = ('load', source, memory)          # a variable in memory, or a Mem
+                elif op in BINARY or op in UNARY:
+                    if any(isinstance(arg, Mem) for arg in args):
+                        continue
+                    if op in COMMUTATIVE:
+                        args = sorted(args, key=_sort_key)
+                    key = (op, tuple(args))
+                    if op != 'addr' and any(isinstance(arg, str) and not is_register(arg) for arg in args):
+                        key += (memory,)
+                else:
+                    continue
+            leader = table.get(key)
+            if leader is None:
+                table[key] = dest
+                added.append(key)
+                continue
+            value[dest] = leader
+            dead.add(id(instr))
+            if op == 'phi':
+                removed.phis += 1
+            elif op == 'copy':
+                removed.loads += 1
+            else:
+                removed.computations += 1
+        state[block] = memory
+
+        # The phis of the successors read their arguments at the end of this block
+        label = block.label
+        for succ in block.succs:
+            for instr in succ.instrs[succ.body():]:
+                if instr.op != 'phi':
+                    break
+                if id(instr) not in dead:
+                    i = instr.labels.index(label)
+                    arg = instr.args[i]
+                    if isinstance(arg, str):
+                        instr.args[i] = value.get(arg, arg)
+        stack.append((block, added))
+        stack.extend((child, None) for child in reversed(tree.children[block]))
+
+    for block in tree.order:
+        block.instrs = [instr for instr in block.instrs if id(instr) not in dead]
+    from_ssa(function, tree.cfg)
+    return removed
@@ -0,0 +1,142 @@
+"""Keyword highlighting for Tk Text widgets, driven by the lexer.
+
+The text is lexed once with an IncrementalLexer, which may be one the
+caller already keeps for the same text, and only the lines on screen (plus a margin) are ever tagged. Scrolling tags the newly exposed
+lines; an edit re-lexes around the change and re-tags just the lines it
+touched.
+"""
+from token_buffer import IncrementalLexer
+from tokenizer import KIND_CODES
+
+MARGIN = 50       # lines tagged above and below the viewport
+
+_NAME_KINDS = frozenset((KIND_CODES['IDENTIFIER'], KIND_CODES['KEYWORD']))
+
+
+class Highlighter:
+    """Keeps `tag` on every token of a Text widget whose text is in `keywords`.
+
+    lexer, when given, is the IncrementalLexer to keep up to date with the
+    widget instead of a new one, such as a Session's token stream.
+    """
+
+    def __init__(self, text, keywords, tag="keyword", margin=MARGIN, engine='scanner', lexer=None):
+        self.text = text
+        self.keywords = frozenset(keywords)
+        self.tag = tag
+        self.margin = margin
+        source = text.get("1.0", "end-1c")
+        if lexer is None:
+            lexer = IncrementalLexer(source, engine)
+        elif lexer.source != source:
+            lexer.update(source)
+        self.lexer = lexer
+        self._tagged = None        # (first, last) lines known to be tagged
+        self._edit_pending = False
+        self._refresh_pending = False
+
+        self._yscroll = text.cget("yscrollcommand")
+        text.configure(yscrollcommand=self.on_scroll)
+        text.bind("<<Modified>>", self.on_modified, add="+")
+        text.bind("<Configure>", self.on_scroll, add="+")
+        text.edit_modified(False)
+        self.schedule_refresh()
+
+    def tokens(self):
+        """The token stream, brought up to date with the widget."""
+        if self._edit_pending:
+            self.relex()
+        return self.lexer
+
+    def on_scroll(self, *args):
+        if self._yscroll and len(args) == 2:
+            self.text.tk.eval(f"{self._yscroll} {args[0]} {args[1]}")
+        self.schedule_refresh()
+
+    def on_modified(self, event=None):
+        if self.text.edit_modified():
+            self.text.edit_modified(False)
+            if not self._edit_pending:
+                self._edit_pending = True
+                self.text.after_idle(self.relex)
+
+    def schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.text.after_idle(self.refresh)
+
+    def window(self):
+        """First and last line to keep tagged: the viewport plus the margin."""
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return max(first - self.margin, 1), last + self.margin
+
+    def refresh(self):
+        """Tag whatever part of the window is not tagged yet."""
+        self._refresh_pending = False
+        if self._edit_pending:
+            self.relex()
+        first, last = self.window()
+        if self._tagged is None or last < self._tagged[0] - 1 or first > self._tagged[1] + 1:
+            self.tag_lines(first, last)
+            self._tagged = (first, last)
+            return
+        tagged_first, tagged_last = self._tagged
+        if first < tagged_first:
+            self.tag_lines(first, tagged_first - 1)
+        if last > tagged_last:
+            self.tag_lines(tagged_last + 1, last)
+        self._tagged = (min(first, tagged_first), max(last, tagged_last))
+
+    def relex(self):
+        """Re-lex after an edit and re-tag only the lines it changed."""
+        self._edit_pending = False
+        lexer = self.lexer
+        old = lexer.source
+        source = self.text.get("1.0", "end-1c")
+        i, _, count = lexer.update(source)
+        # Everything between the unchanged tokens on either side may differ.
+        lo = lexer.span(i - 1)[1] if i else 0
+        hi = lexer.span(i + count)[0] if i + count < len(lexer) else len(source)
+        old_lines = old.count("\n", lo, hi - (len(source) - len(old)))
+        new_lines = source.count("\n", lo, hi)
+        first = lexer.line_at(lo)
+        last = first + new_lines
+
+        window_first, window_last = self.window()
+        if self._tagged is None or last - first > window_last - window_first:
+            # Large edits (loading a file, say): start over from the viewport.
+            self._tagged = None
+            self.schedule_refresh()
+            return
+        self.tag_lines(first, last)
+        tagged_first, tagged_last = self._tagged
+        shift = new_lines - old_lines
+        if first + old_lines < tagged_first:
+            self._tagged = (tagged_first + shift, tagged_last + shift)
+        elif first <= tagged_last:
+            self._tagged = (min(first, tagged_first), max(tagged_last + shift, last))
+        # Lines may have moved into view from outside the tagged range.
+        self.schedule_refresh()
+
+    def tag_lines(self, first, last):
+        """Re-tag lines first..last (1-based, inclusive) in a single Tk call."""
+        lexer = self.lexer
+        lo = lexer.line_start(first)
+        hi = lexer.line_start(last + 1)
+        source, kinds, keywords = lexer.source, lexer.kinds, self.keywords
+        ranges = []
+        k = lexer.index_at(lo)
+        n = len(lexer)
+        while k < n:
+            start, end = lexer.span(k)
+            if start >= hi:
+                break
+            if kinds[k] in _NAME_KINDS and source[start:end] in keywords:
+                line, column = lexer.position(k)
+                ranges += (f"{line}.{column - 1}", f"{line}.{column - 1 + end - start}")
+            k += 1
+        self.text.tag_remove(self.tag, f"{first}.0", f"{last + 1}.0")
+        if ranges:
+            self.text.tag_add(self.tag, *ranges)
+
@@ -0,0 +1,723 @@
+"""Three-address IR: what the optimizer works on and code generation reads.
+
+    program = lower(tree)           # a cparser FileAST
+    print('\n'.join(program.tac()))
+    program = lower(tree, fold_constants(tree).constants)
+
+A Program holds the file-scope initializers and one Function per
+definition. A Function's body is a flat list of Instr, with labels and
+jumps for control flow. Operands are variable and temporary names (str),
+Const and Mem. Printing an instruction gives the TAC line that
+generate_code() understands. Given the constants const_fold found,
+lowering emits each known value in place of the expression, and only the
+branch of an `if` that can run.
+"""
+import re
+
+import ast_nodes as c_ast
+from const_fold import spell
+
+BINARY = frozenset(('+', '-', '*', '/', '%', '<<', '>>', '&', '|', '^', '==', '!=', '<', '<=', '>', '>='))
+UNARY = {'neg': '-', 'not': '!', 'compl': '~', 'addr': '&', 'sizeof': 'sizeof'}
+UNARY_OPS = {symbol: op for op, symbol in UNARY.items()}
+JUMPS = frozenset(('goto', 'if', 'ifFalse'))
+
+
+class Const:
+    """A literal; value is the Python int or float it denotes, or None when not known."""
+
+    __slots__ = ('value', 'text')
+
+    def __init__(self, value, text=None):
+        self.value = value
+        self.text = str(value) if text is None else text
+
+    def __eq__(self, other):
+        return isinstance(other, Const) and self.text == other.text
+
+    def __hash__(self):
+        return hash(self.text)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Const({self.text})"
+
+
+def literal(text):
+    """Const for the spelling of a C number, e.g. '0x1F', '10u' or '2.5f'."""
+    lower = text.lower()
+    try:
+        if lower.startswith('0x') and 'p' not in lower:
+            return Const(int(lower.rstrip('ul'), 16), text)
+        if '.' in lower or 'e' in lower or 'p' in lower:
+            return Const(float(lower.rstrip('fl')) if not lower.startswith('0x') else float.fromhex(lower.rstrip('fl')), text)
+        digits = lower.rstrip('ul')
+        return Const(int(digits, 8) if len(digits) > 1 and digits[0] == '0' else int(digits), text)
+    except ValueError:
+        return Const(None, text)
+
+
+class Mem:
+    """A memory operand: base[index], *base, base.index or base->index (index is then the field name)."""
+
+    __slots__ = ('kind', 'base', 'index')
+
+    def __init__(self, kind, base, index=None):
+        self.kind = kind
+        self.base = base
+        self.index = index
+
+    def __eq__(self, other):
+        return (isinstance(other, Mem) and self.kind == other.kind
+                and self.base == other.base and self.index == other.index)
+
+    def __hash__(self):
+        return hash((self.kind, self.base, self.index))
+
+    def names(self):
+        """Names whose values the address depends on."""
+        names = list(operand_names(self.base))
+        if self.kind == '[]':
+            names.extend(operand_names(self.index))
+        return names
+
+    def root(self):
+        """The variable whose storage this refers into, or None through a pointer."""
+        if self.kind in ('*', '->'):
+            return None
+        return self.base.root() if isinstance(self.base, Mem) else self.base
+
+    def replace(self, mapping):
+        base = replace_operand(self.base, mapping)
+        index = replace_operand(self.index, mapping) if self.kind == '[]' else self.index
+        return self if base is self.base and index is self.index else Mem(self.kind, base, index)
+
+    def __str__(self):
+        if self.kind == '[]':
+            return f"{self.base}[{self.index}]"
+        if self.kind == '*':
+            return f"*{self.base}"
+        return f"{self.base}{self.kind}{self.index}"
+
+    __repr__ = __str__
+
+
+def operand_names(operand):
+    if isinstance(operand, str):
+        yield operand
+    elif isinstance(operand, Mem):
+        yield from operand.names()
+
+
+def replace_operand(operand, mapping):
+    if isinstance(operand, str):
+        return mapping.get(operand, operand)
+    if isinstance(operand, Mem):
+        return operand.replace(mapping)
+    return operand
+
+
+class Instr:
+    """One IR instruction.
+
+    op is 'copy', a BINARY operator, a UNARY name, 'call', 'return',
+    'goto', 'if', 'ifFalse', 'label', or 'phi' in SSA form (see Phi). dest is the name or Mem written,
+    or None. args are the operands; a call's are the callee and then its
+    arguments, and jumps and labels keep the label name last.
+    """
+
+    __slots__ = ('op', 'dest', 'args')
+
+    def __init__(self, op, dest=None, args=()):
+        self.op = op
+        self.dest = dest
+        self.args = list(args)
+
+    def defines(self):
+        """The name this instruction assigns, or None (stores through a Mem assign no name)."""
+        return self.dest if isinstance(self.dest, str) else None
+
+    def operands(self):
+        """The operands it reads, without jump targets and label names."""
+        if self.op in JUMPS or self.op == 'label':
+            return self.args[:-1]
+        return self.args
+
+    def uses(self):
+        """Names it reads, including those in the address of a Mem it writes."""
+        names = []
+        for operand in self.operands():
+            if type(operand) is str:
+                names.append(operand)
+            elif type(operand) is Mem:
+                names.extend(operand.names())
+        if type(self.dest) is Mem:
+            names.extend(self.dest.names())
+        return names
+
+    def replace_uses(self, mapping):
+        """Rename the names it reads through mapping; returns whether anything changed."""
+        changed = False
+        operands = len(self.operands())
+        for i in range(operands):
+            new = replace_operand(self.args[i], mapping)
+            if new is not self.args[i]:
+                self.args[i] = new
+                changed = True
+        if isinstance(self.dest, Mem):
+            new = self.dest.replace(mapping)
+            if new is not self.dest:
+                self.dest = new
+                changed = True
+        return changed
+
+    def tac(self):
+        """The TAC lines for this instruction; a call also has its `param` lines."""
+        op, args = self.op, self.args
+        if op == 'label':
+            return [f"{args[0]}:"]
+        if op == 'goto':
+            return [f"goto {args[0]}"]
+        if op in ('if', 'ifFalse'):
+            return [f"{op} {args[0]} goto {args[1]}"]
+        if op == 'return':
+            return [f"return {args[0]}" if args else "return"]
+        if op == 'call':
+            lines = [f"param {arg}" for arg in args[1:]]
+            lines.append(f"{self.dest} = call {args[0]}, {len(args) - 1}")
+            return lines
+        if op == 'copy':
+            return [f"{self.dest} = {args[0]}"]
+        if op in UNARY:
+            return [f"{self.dest} = {UNARY[op]} {args[0]}"]
+        return [f"{self.dest} = {args[0]} {op} {args[1]}"]
+
+    def __str__(self):
+        return '\n'.join(self.tac())
+
+    def __repr__(self):
+        return f"<Instr {'; '.join(self.tac())}>"
+
+
+class Phi(Instr):
+    """SSA join: dest is args[i] when control arrives from the block labelled labels[i]."""
+
+    __slots__ = ('labels',)
+
+    def __init__(self, dest, args, labels):
+        super().__init__('phi', dest, args)
+        self.labels = list(labels)
+
+    def tac(self):
+        return [f"{self.dest} = phi " + ', '.join(f"[{arg}, {label}]" for arg, label in zip(self.args, self.labels))]
+
+
+class Function:
+    """A function definition lowered to a list of instructions.
+
+    locals are the names declared in the body other than static and extern
+    ones (which lower to file-scope variables), params the parameter names,
+    and memory the locals and parameters that also live in memory: arrays,
+    structs and anything whose address is taken, which a store through a
+    pointer or a call may change behind the IR's back. temps are the
+    compiler's temporaries, and floating the names known to hold a
+    floating-point value.
+    """
+
+    def __init__(self, name, params=()):
+        self.name = name
+        self.params = list(params)
+        self.body = []
+        self.locals = set()
+        self.memory = set()
+        self.temps = set()
+        self.floating = set()
+
+    def is_register(self, name):
+        """Whether name is a temporary or a local or parameter that never lives in memory."""
+        return name in self.temps or (name in self.locals or name in self.params) and name not in self.memory
+
+    def tac(self):
+        lines = [f"func {self.name}"]
+        for instr in self.body:
+            lines.extend(instr.tac())
+        lines.append("endfunc")
+        return lines
+
+
+class Program:
+    def __init__(self):
+        self.globals = []       # Instr initializing file-scope variables
+        self.functions = []
+
+    def tac(self):
+        lines = []
+        for instr in self.globals:
+            lines.extend(instr.tac())
+        for function in self.functions:
+            lines.extend(function.tac())
+        return lines
+
+    def instructions(self):
+        return len(self.globals) + sum(len(f.body) for f in self.functions)
+
+
+def fresh_prefix(names, prefix):
+    """prefix, lengthened with underscores until no name is prefix + digits."""
+    while any(re.fullmatch(re.escape(prefix) + r'\d+', name) for name in names):
+        prefix = '_' + prefix
+    return prefix
+
+
+class Lowering:
+    """Flattens a cparser FileAST into a Program, one statement at a time."""
+
+    def __init__(self, tree, constants=None):
+        self.constants = constants or {}
+        # An unnamed parameter, a struct tag declaration or an anonymous enum is a Decl without a name
+        names = set()
+        shared = {node.name for node in tree.ext if isinstance(node, c_ast.Decl)}
+        for node in c_ast.walk(tree):
+            if isinstance(node, (c_ast.ID, c_ast.Label, c_ast.Decl)) and node.name is not None:
+                names.add(node.name)
+                if isinstance(node, c_ast.Decl) and 'extern' in node.storage:
+                    shared.add(node.name)
+        self.names = names
+        self.shared = shared    # file-scope names; a local of the same name is renamed apart
+        self.temp_prefix = fresh_prefix(names, 't')
+        self.label_prefix = fresh_prefix(names, 'L')
+        self.program = Program()
+        self.function = None
+        self.code = self.program.globals
+        self.temps = 0
+        self.labels = 0
+        self.breaks = []        # label a `break` jumps to, innermost last
+        self.continues = []
+        self.case_targets = {}  # Case/Default node -> its label
+        self.bound = {}         # local name -> the IR names it denotes in the open blocks, innermost last
+        self.blocks = []        # names declared in each open block
+
+    def temp(self, floating=False):
+        self.temps += 1
+        name = f"{self.temp_prefix}{self.temps}"
+        if self.function is not None:
+            self.function.temps.add(name)
+            if floating:
+                self.function.floating.add(name)
+        return name
+
+    def label(self):
+        self.labels += 1
+        return f"{self.label_prefix}{self.labels}"
+
+    def emit(self, op, dest=None, *args):
+        self.code.append(Instr(op, dest, args))
+
+    def is_floating(self, operand):
+        if isinstance(operand, Const):
+            return isinstance(operand.value, float)
+        return self.function is not None and operand in self.function.floating
+
+    # --- declarations ---
+    def external(self, node):
+        if isinstance(node, c_ast.FuncDef):
+            decl = node.decl
+            args = decl.type.args if isinstance(decl.type, c_ast.FuncDecl) else None
+            params = [p for p in (args.params if args is not None else ()) if isinstance(p, c_ast.Decl)]
+            function = self.function = Function(decl.name, [p.name for p in params if p.name is not None])
+            self.enter()
+            for param in params:
+                self.declared(param)
+            self.code = function.body
+            self.statement(node.body)
+            self.leave()
+            self.program.functions.append(function)
+            self.function, self.code = None, self.program.globals
+        elif isinstance(node, c_ast.Decl):
+            self.declaration(node)
+
+    def enter(self):
+        self.blocks.append([])
+
+    def leave(self):
+        for name in self.blocks.pop():
+            stack = self.bound[name]
+            stack.pop()
+            if not stack:
+                del self.bound[name]
+
+    def bind(self, name, bound=None):
+        """The IR name for a local declaration of name; one that hides another local gets a new name.
+
+        bound, when given, is the IR name to use instead.
+        """
+        stack = self.bound.setdefault(name, [])
+        if bound is None:
+            bound = self.unique(name) if stack else name
+        stack.append(bound)
+        self.blocks[-1].append(name)
+        return bound
+
+    def unique(self, name):
+        """A new name of the form name_2, name_3, ... that no declaration uses."""
+        n = 2
+        while f"{name}_{n}" in self.names:
+            n += 1
+        name = f"{name}_{n}"
+        self.names.add(name)
+        return name
+
+    def declared(self, node):
+        """The IR name of a declaration, noting what the lowering needs to know about a local one.
+
+        A static or extern local is a file-scope variable to the IR: an extern
+        one keeps its name, a static one gets a name of its own.
+        """
+        function = self.function
+        if function is None or node.name is None:
+            return node.name
+        if 'extern' in node.storage:
+            return self.bind(node.name, node.name)
+        if 'static' in node.storage:
+            name = self.bind(node.name, self.unique(node.name))
+        else:
+            hides = node.name in self.shared and node.name not in function.params
+            name = self.bind(node.name, self.unique(node.name) if hides else None)
+            if name not in function.params:
+                function.locals.add(name)
+        t = node.type
+        if isinstance(t, c_ast.ArrayDecl) or isinstance(t, c_ast.TypeDecl) and isinstance(t.type, (c_ast.Struct, c_ast.Union)):
+            function.memory.add(name)
+        elif isinstance(t, c_ast.TypeDecl) and isinstance(t.type, c_ast.IdentifierType) \
+                and {'float', 'double'} & set(t.type.names):
+            function.floating.add(name)
+        return name
+
+    def declaration(self, node):
+        if node.name is None or isinstance(node.type, c_ast.FuncDecl):
+            return
+        name = self.declared(node)
+        if node.init is None:
+            return
+        function, code = self.function, self.code
+        if function is not None and 'static' in node.storage:
+            # Initialized once, before the program runs, like a file-scope variable
+            self.function, self.code = None, self.program.globals
+        if isinstance(node.init, c_ast.InitList):
+            for i, expr in enumerate(node.init.exprs):
+                if not isinstance(expr, c_ast.InitList):
+                    self.emit('copy', Mem('[]', name, Const(i)), self.expression(expr))
+            if self.function is not None:
+                # The elements without an initializer are zero; static storage already starts out so
+                for i in range(len(node.init.exprs), self.length(node.type) or 0):
+                    self.emit('copy', Mem('[]', name, Const(i)), Const(0))
+        else:
+            self.emit('copy', name, self.expression(node.init))
+        self.function, self.code = function, code
+
+    def length(self, t):
+        """The number of elements of an array declarator, or None if it is not a known constant."""
+        if not isinstance(t, c_ast.ArrayDecl) or t.dim is None:
+            return None
+        known = self.constants.get(t.dim)
+        if known is not None:
+            value = known[0]
+        elif isinstance(t.dim, c_ast.Constant):
+            value = literal(t.dim.value).value
+        else:
+            return None
+        return value if type(value) is int else None
+
+    # --- statements ---
+    def statement(self, node):
+        if node is None:
+            return
+        method = getattr(self, 'stmt_' + type(node).__name__, None)
+        if method is not None:
+            method(node)
+        else:
+            self.expression(node)
+
+    def stmt_Compound(self, node):
+        self.enter()
+        for item in node.block_items:
+            self.statement(item)
+        self.leave()
+
+    def stmt_Decl(self, node):
+        self.declaration(node)
+
+    def stmt_DeclList(self, node):
+        for decl in node.decls:
+            self.declaration(decl)
+
+    def stmt_Typedef(self, node):
+        pass
+
+    def stmt_EmptyStatement(self, node):
+        pass
+
+    def stmt_If(self, node):
+        cond = self.expression(node.cond)
+        if isinstance(cond, Const) and cond.value is not None:
+            taken, skipped = (node.iftrue, node.iffalse) if cond.value else (node.iffalse, node.iftrue)
+            # A goto may still enter the branch that the condition skips
+            if skipped is None or not any(isinstance(n, c_ast.Label) for n in c_ast.walk(skipped)):
+                self.statement(taken)
+                return
+        end = self.label()
+        other = self.label() if node.iffalse is not None else end
+        self.emit('ifFalse', None, cond, other)
+        self.statement(node.iftrue)
+        if node.iffalse is not None:
+            self.emit('goto', None, end)
+            self.emit('label', None, other)
+            self.statement(node.iffalse)
+        self.emit('label', None, end)
+
+    def loop(self, cond, body, step=None, test_first=True):
+        top, next_, end = self.label(), self.label(), self.label()
+        self.emit('label', None, top)
+        if test_first and cond is not None:
+            self.emit('ifFalse', None, self.expression(cond), end)
+        self.breaks.append(end)
+        self.continues.append(next_)
+        self.statement(body)
+        self.breaks.pop()
+        self.continues.pop()
+        self.emit('label', None, next_)
+        if step is not None:
+            self.expression(step)
+        if test_first:
+            self.emit('goto', None, top)
+        else:
+            self.emit('if', None, self.expression(cond), top)
+        self.emit('label', None, end)
+
+    def stmt_While(self, node):
+        self.loop(node.cond, node.stmt)
+
+    def stmt_DoWhile(self, node):
+        self.loop(node.cond, node.stmt, test_first=False)
+
+    def stmt_For(self, node):
+        self.enter()
+        self.statement(node.init)
+        self.loop(node.cond, node.stmt, node.next)
+        self.leave()
+
+    def stmt_Switch(self, node):
+        value = self.expression(node.cond)
+        end = default = self.label()
+        # Only the cases of this switch, not of switches nested in it
+        stack = [node.stmt]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, c_ast.Switch):
+                continue
+            if isinstance(item, c_ast.Case):
+                target = self.case_targets[item] = self.label()
+                flag = self.temp()
+                self.emit('==', flag, value, self.expression(item.expr))
+                self.emit('if', None, flag, target)
+            elif isinstance(item, c_ast.Default):
+                default = self.case_targets[item] = self.label()
+            stack.extend(reversed(list(item)))
+        self.emit('goto', None, default)
+        self.breaks.append(end)
+        self.statement(node.stmt)
+        self.breaks.pop()
+        self.emit('label', None, end)
+
+    def stmt_Case(self, node):
+        self.emit('label', None, self.case_targets[node])
+        for stmt in node.stmts:
+            self.statement(stmt)
+
+    stmt_Default = stmt_Case
+
+    def stmt_Label(self, node):
+        self.emit('label', None, node.name)
+        self.statement(node.stmt)
+
+    def stmt_Goto(self, node):
+        self.emit('goto', None, node.name)
+
+    def stmt_Break(self, node):
+        if self.breaks:
+            self.emit('goto', None, self.breaks[-1])
+
+    def stmt_Continue(self, node):
+        if self.continues:
+            self.emit('goto', None, self.continues[-1])
+
+    def stmt_Return(self, node):
+        if node.expr is None:
+            self.emit('return')
+        else:
+            self.emit('return', None, self.expression(node.expr))
+
+    # --- expressions: each returns the operand holding its value ---
+    def expression(self, node):
+        known = self.constants.get(node)
+        if known is not None:
+            return Const(known[0], spell(*known))
+        return getattr(self, 'expr_' + type(node).__name__)(node)
+
+    def expr_ID(self, node):
+        stack = self.bound.get(node.name)
+        return stack[-1] if stack else node.name
+
+    def expr_Constant(self, node):
+        if node.type in ('string', 'char'):
+            return Const(None, node.value)
+        return literal(node.value)
+
+    def expr_ExprList(self, node):
+        value = None
+        for expr in node.exprs:
+            value = self.expression(expr)
+        return value
+
+    def expr_Cast(self, node):
+        return self.expression(node.expr)
+
+    def expr_Typename(self, node):
+        names, pointers = [], 0
+        for child in c_ast.walk(node):
+            if isinstance(child, c_ast.IdentifierType):
+                names.extend(child.names)
+            elif isinstance(child, (c_ast.Struct, c_ast.Union, c_ast.Enum)):
+                names.append(f"{type(child).__name__.lower()} {child.name}")
+            elif isinstance(child, c_ast.PtrDecl):
+                pointers += 1
+        return Const(None, '(' + ' '.join(names) + '*' * pointers + ')')
+
+    def address(self, node):
+        """The operand for an lvalue: a name or a Mem."""
+        if isinstance(node, c_ast.UnaryOp) and node.op == '*':
+            return Mem('*', self.value(node.expr))
+        if isinstance(node, c_ast.ArrayRef):
+            base = self.address(node.name) if isinstance(node.name, (c_ast.ArrayRef, c_ast.StructRef)) \
+                else self.value(node.name)
+            return Mem('[]', base, self.value(node.subscript))
+        if isinstance(node, c_ast.StructRef):
+            if node.type == '.':
+                return Mem('.', self.address(node.name), node.field.name)
+            return Mem('->', self.value(node.name), node.field.name)
+        return self.expression(node)
+
+    def value(self, node):
+        return self.operand(self.expression(node))
+
+    def operand(self, operand):
+        """operand as something an instruction can compute with: a Mem is loaded into a temporary."""
+        if isinstance(operand, Mem):
+            result = self.temp()
+            self.emit('copy', result, operand)
+            return result
+        return operand
+
+    def expr_ArrayRef(self, node):
+        return self.address(node)
+
+    expr_StructRef = expr_ArrayRef
+
+    def expr_Assignment(self, node):
+        target = self.address(node.lvalue)
+        value = self.expression(node.rvalue)
+        if node.op != '=':
+            op = node.op[:-1]
+            current = self.operand(target)
+            result = self.temp(self.is_floating(current) or self.is_floating(value))
+            self.emit(op, result, current, self.operand(value))
+            value = result
+        elif isinstance(target, Mem) and isinstance(value, Mem):
+            value = self.operand(value)
+        self.emit('copy', target, value)
+        if self.function is not None and isinstance(target, str) and self.is_floating(value):
+            self.function.floating.add(target)
+        return target
+
+    def expr_BinaryOp(self, node):
+        if node.op in ('&&', '||'):
+            result, end = self.temp(), self.label()
+            short = Const(0) if node.op == '&&' else Const(1)
+            jump = 'ifFalse' if node.op == '&&' else 'if'
+            self.emit('copy', result, short)
+            self.emit(jump, None, self.value(node.left), end)
+            self.emit(jump, None, self.value(node.right), end)
+            self.emit('copy', result, Const(1 - short.value))
+            self.emit('label', None, end)
+            return result
+        left = self.value(node.left)
+        right = self.value(node.right)
+        floating = node.op not in ('==', '!=', '<', '<=', '>', '>=') and (self.is_floating(left) or self.is_floating(right))
+        result = self.temp(floating)
+        self.emit(node.op, result, left, right)
+        return result
+
+    def expr_UnaryOp(self, node):
+        op = node.op
+        if op == 'sizeof':
+            result = self.temp()
+            operand = self.expression(node.expr) if isinstance(node.expr, c_ast.Typename) else self.address(node.expr)
+            self.emit('sizeof', result, operand)
+            return result
+        if op == '&':
+            operand = self.address(node.expr)
+            if self.function is not None:
+                name = operand.root() if isinstance(operand, Mem) else operand
+                if name is not None:
+                    self.function.memory.add(name)
+            result = self.temp()
+            self.emit('addr', result, operand)
+            return result
+        if op == '*':
+            return self.address(node)
+        if op in ('++', '--', 'p++', 'p--'):
+            target = self.address(node.expr)
+            current = self.operand(target)
+            result = None
+            if op[0] == 'p':
+                result = self.temp(self.is_floating(current))
+                self.emit('copy', result, current)
+            updated = self.temp(self.is_floating(current))
+            self.emit(op[-1], updated, current, Const(1))
+            self.emit('copy', target, updated)
+            return result if result is not None else target
+        operand = self.value(node.expr)
+        if op == '+':
+            return operand
+        result = self.temp(op == '-' and self.is_floating(operand))
+        self.emit(UNARY_OPS[op], result, operand)
+        return result
+
+    def expr_TernaryOp(self, node):
+        result, other, end = self.temp(), self.label(), self.label()
+        self.emit('ifFalse', None, self.value(node.cond), other)
+        self.emit('copy', result, self.value(node.iftrue))
+        self.emit('goto', None, end)
+        self.emit('label', None, other)
+        self.emit('copy', result, self.value(node.iffalse))
+        self.emit('label', None, end)
+        return result
+
+    def expr_FuncCall(self, node):
+        args = [self.value(arg) for arg in node.args.exprs] if node.args is not None else []
+        result = self.temp()
+        self.emit('call', result, self.value(node.name), *args)
+        return result
+
+    def expr_InitList(self, node):
+        return Const(None, '{' + ', '.join(str(self.expression(expr)) for expr in node.exprs) + '}')
+
+
+def lower(tree, constants=None):
+    """The Program for a cparser FileAST; constants maps expression nodes to known (value, type)."""
+    lowering = Lowering(tree, constants)
+    for node in tree.ext:
+        lowering.external(node)
+    return lowering.program
@@ -0,0 +1,254 @@
+"""Headless lexer: tokenize whole source trees from the command line.
+
+    python lex.py src/ 'include/**/*.h' -j 8 -o tokens/ --summary summary.json
+    python lex.py huge.c --split 8 -o tokens/ --format bin
+
+Files are fanned out over a process pool. Per-file token streams and the
+aggregate counts do not depend on the number of workers; only the timing
+section of the summary does. With --split each file is instead cut into
+chunks that are lexed concurrently and stitched back together.
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from token_buffer import TokenBuffer
+from token_dump import write_dump
+from tokenizer import ENGINES, KIND_CODES, buffered_spans, newline_decoder, read_chunks
+
+SOURCE_SUFFIXES = ('.c', '.h')
+
+
+def expand_paths(patterns):
+    """Resolve files, directories and globs to a sorted list of source files."""
+    found = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if os.path.isdir(path):
+                for dirpath, _, filenames in os.walk(path):
+                    found.update(os.path.join(dirpath, name) for name in filenames
+                                 if name.endswith(SOURCE_SUFFIXES))
+            elif os.path.isfile(path):
+                found.add(path)
+    return sorted(os.path.normpath(path) for path in found)
+
+
+FORMATS = {'csv': '.tokens.csv', 'bin': '.tokens.bin'}
+
+
+def output_path(path, base, out_dir, fmt='csv'):
+    return os.path.join(out_dir, os.path.relpath(os.path.abspath(path), base) + FORMATS[fmt])
+
+
+def write_tokens(tokens, out_path):
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    if out_path.endswith(FORMATS['bin']):
+        write_dump(out_path, tokens)
+    else:
+        with open(out_path, 'w', newline='') as f:
+            tokens.write_csv(f)
+
+
+def lex_file(path, engine='regex', out_path=None):
+    """Lex one file; returns (path, size in bytes, token counts by kind, error)."""
+    try:
+        with open(path, 'r') as f:
+            source = f.read()
+        tokens = TokenBuffer.from_source(source, ENGINES[engine])
+        if out_path:
+            write_tokens(tokens, out_path)
+        return path, os.path.getsize(path), tokens.counts(), None
+    except (OSError, UnicodeDecodeError) as e:
+        return path, 0, {}, str(e)
+
+
+def lex_files(paths, engine='regex', out_dir=None, jobs=None, fmt='csv'):
+    """Lex many files, in parallel when jobs > 1. Results come back in input order."""
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else ''
+    outs = [output_path(p, base, out_dir, fmt) if out_dir else None for p in paths]
+    engines = [engine] * len(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        return list(map(lex_file, paths, engines, outs))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lex_file, paths, engines, outs, chunksize=max(1, len(paths) // (jobs * 4))))
+
+
+def split_points(path, parts):
+    """Byte offsets cutting a file into about `parts` pieces, each starting a line."""
+    size = os.path.getsize(path)
+    points = [0]
+    if size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(1, parts):
+                nl = mm.find(b'\n', max(size * i // parts, points[-1]))
+                if nl < 0 or nl + 1 >= size:
+                    break
+                if nl + 1 > points[-1]:
+                    points.append(nl + 1)
+    points.append(size)
+    return points
+
+
+def lex_range(path, start, stop, engine='regex', encoding=None):
+    """Lex the tokens that start in bytes [start, stop) of a file.
+
+    start must begin a line. The range is lexed as if start were a token
+    boundary; the last token may run on past stop. Returns the number of
+    characters in the range and kind/start/end columns relative to start.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = newline_decoder(encoding).decode(f.read(stop - start), final=True)
+    limit = len(text)
+    kinds, starts, ends = array('B'), array('I'), array('I')
+    chunks = chain((text,), read_chunks(path, encoding=encoding, use_mmap=True, offset=stop))
+    for kind, buf, s, e, base in buffered_spans(chunks, ENGINES[engine]):
+        s += base
+        if s >= limit:
+            break
+        kinds.append(KIND_CODES[kind])
+        starts.append(s)
+        ends.append(base + e)
+    return limit, kinds, starts, ends
+
+
+def lex_split(path, parts=None, engine='regex', encoding=None):
+    """Lex one large file in `parts` concurrent pieces; returns a TokenBuffer.
+
+    A piece may start inside a comment or literal, so its speculative
+    tokens are only trusted from the first one that starts exactly where
+    the verified stream so far ends. If no such token exists the gap is
+    re-lexed sequentially until the two streams agree on a token start;
+    from there on they are identical, since a token depends only on the
+    text at and after its start. The result equals analyze_code() on the
+    whole file, with global offsets.
+    """
+    parts = parts or os.cpu_count() or 1
+    points = split_points(path, parts)
+    n = len(points) - 1
+    args = ([path] * n, points[:-1], points[1:], [engine] * n, [encoding] * n)
+    if n > 1:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            pieces = list(pool.map(lex_range, *args))
+    else:
+        pieces = list(map(lex_range, *args))
+
+    with open(path, 'r', encoding=encoding) as f:
+        source = f.read()
+    tokens = TokenBuffer(source)
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+    spans, codes = ENGINES[engine], KIND_CODES
+    offset = 0        # global character offset of the current piece
+    pos = 0           # end of the verified stream so far
+    for length, p_kinds, p_starts, p_ends in pieces:
+        j = bisect_left(p_starts, pos - offset)
+        if j == len(p_starts) or p_starts[j] != pos - offset:
+            # Out of step (the cut fell inside a token): re-lex until we meet
+            # a start the piece agrees with, or run past the piece.
+            j = len(p_starts)
+            for kind, start, end in spans(source, pos):
+                if start >= offset + length:
+                    break
+                k = bisect_left(p_starts, start - offset)
+                if k < len(p_starts) and p_starts[k] == start - offset:
+                    j = k
+                    break
+                kinds.append(codes[kind])
+                starts.append(start)
+                ends.append(end)
+                pos = end
+        if j < len(p_starts):
+            kinds.extend(p_kinds[j:])
+            starts.extend(array('I', [s + offset for s in p_starts[j:]]))
+            ends.extend(array('I', [e + offset for e in p_ends[j:]]))
+            pos = ends[-1]
+        offset += length
+    return tokens
+
+
+def lex_file_split(path, parts, engine='regex', out_path=None):
+    """Like lex_file, but lexing the file with lex_split."""
+    try:
+        tokens = lex_split(path, parts, engine)
+        if out_path:
+            write_tokens(tokens, out_path)
+        return path, os.path.getsize(path), tokens.counts(), None
+    except (OSError, UnicodeDecodeError) as e:
+        return path, 0, {}, str(e)
+
+
+def summarize(results, elapsed):
+    counts = {}
+    for _, _, file_counts, _ in results:
+        for kind, n in file_counts.items():
+            counts[kind] = counts.get(kind, 0) + n
+    total_bytes = sum(size for _, size, _, _ in results)
+    return {
+        'files': len(results),
+        'bytes': total_bytes,
+        'tokens': sum(counts.values()),
+        'counts': dict(sorted(counts.items())),
+        'errors': {path: error for path, _, _, error in results if error},
+        'timing': {
+            'elapsed_s': round(elapsed, 6),
+            'files_per_s': round(len(results) / elapsed, 2) if elapsed else None,
+            'bytes_per_s': round(total_bytes / elapsed, 2) if elapsed else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='lex', description="Tokenize C sources without the GUI.")
+    parser.add_argument('paths', nargs='+', help="files, directories or glob patterns")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('-o', '--out-dir', help="write a token file for every input under this directory")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv',
+                        help="token file format: CSV like the GUI export, or the binary token dump")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='regex')
+    parser.add_argument('--summary', help="write the aggregate summary as JSON to this file")
+    parser.add_argument('--split', type=int, metavar='N',
+                        help="lex each file in N concurrent chunks instead of one file per worker")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.error("no source files matched")
+
+    start = time.perf_counter()
+    if args.split:
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+        results = [lex_file_split(p, args.split, args.engine,
+                                  output_path(p, base, args.out_dir, args.format) if args.out_dir else None)
+                   for p in paths]
+    else:
+        results = lex_files(paths, args.engine, args.out_dir, args.jobs, args.format)
+    summary = summarize(results, time.perf_counter() - start)
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+            f.write('\n')
+
+    timing = summary['timing']
+    print(f"{summary['files']} files, {summary['bytes']:,} bytes, {summary['tokens']:,} tokens "
+          f"in {timing['elapsed_s']:.3f}s ({timing['files_per_s']} files/s, "
+          f"{(timing['bytes_per_s'] or 0) / 1e6:.2f} MB/s)")
+    for kind, n in summary['counts'].items():
+        print(f"  {kind:<12} {n:>12,}")
+    for path, error in summary['errors'].items():
+        print(f"error: {path}: {error}", file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
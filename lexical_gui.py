@@ -1,54 +1,80 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-import re
-import csv
-
-# Token specification
-KEYWORDS = {
-    "auto", "break", "case", "char", "const", "continue", "default", "do", "double",
-    "else", "enum", "extern", "float", "for", "goto", "if", "int", "long", "register",
-    "return", "short", "signed", "sizeof", "static", "struct", "switch", "typedef",
-    "union", "unsigned", "void", "volatile", "while"
-}
-
-TOKEN_SPEC = [
-    ('COMMENT', r'//.*?$|/\*.*?\*/'),
-    ('STRING', r'"(?:\\.|[^"\\])*"'),
-    ('CHAR', r"'(?:\\.|[^'\\])'"),
-    ('NUMBER', r'\b\d+(\.\d+)?\b'),
-    ('IDENTIFIER', r'\b[A-Za-z_]\w*\b'),
-    ('OPERATOR', r'[+\-*/%=!<>]=?|&&|\|\|'),
-    ('DELIMITER', r'[;,\[\](){}]'),
-    ('SKIP', r'[ \t\n]+'),
-    ('MISMATCH', r'.'),
-]
-
-TOK_REGEX = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPEC)
-TOKEN_RE = re.compile(TOK_REGEX, re.DOTALL | re.MULTILINE)
-
-def analyze_code(code):
-    tokens = []
-    for match in TOKEN_RE.finditer(code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == 'SKIP':
-            continue
-        elif kind == 'IDENTIFIER' and value in KEYWORDS:
-            kind = 'KEYWORD'
-        elif kind == 'MISMATCH':
-            kind = 'UNKNOWN'
-        tokens.append((kind, value))
-    return tokens
+from tokenizer import ENGINES
+from token_buffer import TokenBuffer
+from session import Session
+
+def analyze_code(code, engine='regex'):
+    return [(kind, code[start:end]) for kind, start, end in ENGINES[engine](code)]
+
+class TokenView(tk.Frame):
+    """Token list that only creates rows for the tokens currently on screen."""
+
+    def __init__(self, master, height=20, **listbox_options):
+        super().__init__(master)
+        self.tokens = TokenBuffer("")
+        self.first = 0
+        self.rows = height
+        self.listbox = tk.Listbox(self, height=height, **listbox_options)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_by(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_by(1, "units"))
+
+    def set_tokens(self, tokens):
+        self.tokens = tokens
+        self.first = 0
+        self.refresh()
+
+    def row(self, i):
+        return f"{self.tokens.kind(i):<15} | {self.tokens.text(i)}"
+
+    def refresh(self):
+        total = len(self.tokens)
+        self.first = max(0, min(self.first, total - self.rows))
+        last = min(self.first + self.rows, total)
+        self.listbox.delete(0, tk.END)
+        if last > self.first:
+            self.listbox.insert(0, *(self.row(i) for i in range(self.first, last)))
+        if total:
+            self.scrollbar.set(self.first / total, last / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_by(self, amount, what):
+        self.first += amount * (self.rows if what == "pages" else 3)
+        self.refresh()
+        return "break"
+
+    def yview(self, action, amount, what=None):
+        if action == tk.MOVETO:
+            self.first = int(float(amount) * len(self.tokens))
+            self.refresh()
+        else:
+            self.scroll_by(int(amount), what)
+
+    def set_colors(self, bg, fg):
+        self.listbox.config(bg=bg, fg=fg)
+
 
 class LexicalAnalyzerGUI:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("Lexical Analyzer - Mini C Compiler")
         self.root.geometry("1000x700")
         self.dark_mode = False
+        self.tokens = TokenBuffer("")
+        self.lexer = None
+        self.relex_pending = False
 
         self.setup_gui()
         self.set_light_mode()
+        if self.session.source:
+            self.code_display.insert(tk.END, self.session.source)
+            self.code_display.edit_modified(False)
 
     def setup_gui(self):
         # File controls
@@ -59,41 +85,52 @@ class LexicalAnalyzerGUI:
         tk.Button(file_frame, text="Analyze Code", command=self.run_analysis, bg="blue", fg="white").pack(side=tk.LEFT, padx=10)
         tk.Button(file_frame, text="Export Tokens", command=self.export_tokens, bg="purple", fg="white").pack(side=tk.LEFT, padx=10)
         tk.Button(file_frame, text="Toggle Theme", command=self.toggle_theme, bg="gray", fg="white").pack(side=tk.LEFT, padx=10)
+        self.engine = tk.StringVar(value='regex')
+        tk.Label(file_frame, text="Engine:").pack(side=tk.LEFT, padx=(10, 0))
+        tk.OptionMenu(file_frame, self.engine, *ENGINES).pack(side=tk.LEFT)
 
         # Code display
         self.code_display = scrolledtext.ScrolledText(self.root, height=15, width=120, font=("Consolas", 12))
         self.code_display.pack(pady=10)
+        self.code_display.bind("<<Modified>>", self.on_modified)
 
         # Token result display
-        self.token_list = tk.Listbox(self.root, height=20, width=120, font=("Courier", 11))
+        self.token_list = TokenView(self.root, height=20, width=120, font=("Courier", 11))
         self.token_list.pack(pady=10)
 
     def load_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("C Files", "*.c"), ("All Files", "*.*")])
         if file_path:
-            with open(file_path, 'r') as f:
-                code = f.read()
+            code = self.session.load(file_path)
             self.code_display.delete("1.0", tk.END)
             self.code_display.insert(tk.END, code)
 
     def run_analysis(self):
-        code = self.code_display.get("1.0", tk.END)
-        tokens = analyze_code(code)
-        self.token_list.delete(0, tk.END)
-        for tok_type, tok_value in tokens:
-            self.token_list.insert(tk.END, f"{tok_type:<15} | {tok_value}")
-        messagebox.showinfo("Lexical Analysis Complete", f"{len(tokens)} tokens identified.")
+        self.session.set_source(self.code_display.get("1.0", "end-1c"))
+        self.lexer = self.session.tokens(self.engine.get())
+        self.tokens = self.lexer
+        self.token_list.set_tokens(self.tokens)
+        messagebox.showinfo("Lexical Analysis Complete", f"{len(self.tokens)} tokens identified.")
+
+    def on_modified(self, event=None):
+        # After the first analysis, keep the token list live while typing
+        if self.code_display.edit_modified():
+            self.code_display.edit_modified(False)
+            if self.lexer is not None and not self.relex_pending:
+                self.relex_pending = True
+                self.root.after_idle(self.relex)
+
+    def relex(self):
+        self.relex_pending = False
+        self.session.set_source(self.code_display.get("1.0", "end-1c"))
+        self.session.tokens(self.lexer.engine)
+        self.token_list.refresh()
 
     def export_tokens(self):
         filepath = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
         if filepath:
             with open(filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Token Type", "Token Value"])
-                for i in range(self.token_list.size()):
-                    line = self.token_list.get(i)
-                    tok_type, tok_value = line.split('|', 1)
-                    writer.writerow([tok_type.strip(), tok_value.strip()])
+                self.tokens.write_csv(f)
             messagebox.showinfo("Export Successful", f"Tokens saved to: {filepath}")
 
     def toggle_theme(self):
@@ -107,14 +144,14 @@ class LexicalAnalyzerGUI:
         bg_color = "white"
         fg_color = "black"
         self.code_display.config(bg=bg_color, fg=fg_color, insertbackground=fg_color)
-        self.token_list.config(bg=bg_color, fg=fg_color)
+        self.token_list.set_colors(bg_color, fg_color)
 
     def set_dark_mode(self):
         self.dark_mode = True
         bg_color = "#1e1e1e"
         fg_color = "white"
         self.code_display.config(bg=bg_color, fg=fg_color, insertbackground=fg_color)
-        self.token_list.config(bg=bg_color, fg=fg_color)
+        self.token_list.set_colors(bg_color, fg_color)
 
 # Run the app
 if __name__ == "__main__":
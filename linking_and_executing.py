@@ -3,39 +3,51 @@ from tkinter import scrolledtext
 from tkinter import filedialog
 import subprocess
 import os
+from session import Session
+
+# Compile (and link) a C file with GCC; returns (executable path, error message)
+def compile_c_file(file_path, executable_path=None):
+    executable_path = executable_path or file_path.replace(".c", ".exe")
+    try:
+        compile_process = subprocess.run(["gcc", file_path, "-o", executable_path], capture_output=True, text=True)
+    except OSError as e:
+        return None, f"Compilation Error:\ncannot run gcc: {e}"
+    if compile_process.returncode != 0:
+        return None, f"Compilation Error:\n{compile_process.stderr}"
+    return executable_path, None
+
+
+# Run a compiled program; returns (exit status, stdout, stderr)
+def run_executable(executable_path, timeout=None, input=None):
+    run_process = subprocess.run([os.path.abspath(executable_path)], capture_output=True, text=True,
+                                 timeout=timeout, input=input)
+    return run_process.returncode, run_process.stdout, run_process.stderr
+
 
 # Function to compile and run the C file
 def compile_and_run_c_file(file_path):
-    # File paths
-    executable_path = file_path.replace(".c", ".exe")
-    
-    # Compile the C file using GCC
-    compile_command = f"gcc {file_path} -o {executable_path}"
-    compile_process = subprocess.Popen(compile_command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    compile_stdout, compile_stderr = compile_process.communicate()
-    
-    if compile_process.returncode != 0:
-        return f"Compilation Error:\n{compile_stderr.decode()}"
-    
-    # Run the compiled C program
-    run_process = subprocess.Popen(executable_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    run_stdout, run_stderr = run_process.communicate()
-    
-    if run_process.returncode != 0:
-        return f"Runtime Error:\n{run_stderr.decode()}"
-    
-    return run_stdout.decode()
+    executable_path, error = compile_c_file(file_path)
+    if error:
+        return error
+
+    returncode, stdout, stderr = run_executable(executable_path)
+    if returncode != 0:
+        return f"Runtime Error:\n{stderr}"
+
+    return stdout
 
 # GUI Class
 class TACCodeGeneratorApp:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("Three Address Code (TAC) Generator")
         self.dark_mode = False
-        self.selected_code = ""
+        self.selected_code = self.session.source
 
         self.create_widgets()
         self.set_light_mode()
+        self.selected_code_text.insert(tk.END, self.selected_code)
 
     def create_widgets(self):
         self.frame = tk.Frame(self.root)
@@ -71,7 +83,7 @@ class TACCodeGeneratorApp:
     def load_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("C Files", "*.c")])
         if file_path:
-            self.selected_code = open(file_path, 'r').read()
+            self.selected_code = self.session.load(file_path)
             self.selected_code_text.delete(1.0, tk.END)
             self.selected_code_text.insert(tk.END, self.selected_code)
 
@@ -1,61 +1,98 @@
-import tkinter as tk 
-import subprocess
-import sys
+import importlib
 import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
 
-print("Current Working Directory:", os.getcwd())
-
-def run_script(script_name):
-    if os.path.exists(script_name):
-        subprocess.Popen([sys.executable, script_name])
-    else:
-        print(f"Error: {script_name} not found!")
-
-root = tk.Tk()
-root.title("Mini C Compiler - Launcher")
-root.geometry("420x520")
-root.configure(bg="#2b2b2b")
-
-tk.Label(
-    root,
-    text="Mini C Compiler - Module Launcher",
-    font=("Arial", 15, "bold"),
-    fg="white",
-    bg="#2b2b2b"
-).pack(pady=15)
-
-buttons = [
-    ("Lexical Analysis", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\lexical_gui.py"),
-    ("Syntax Analysis", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\syntax_gui.py"),
-    ("Semantic Analysis", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\sementic.py"),  
-    ("Optimization", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\optimization.py"),
-    ("Code Generation", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\code_generation.py"),
-    ("Error Handling", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\error_handling.py"),
-    ("Link & Execute", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\linking_and_executing.py"),
-    ("Testing & Debugging", r"C:\Users\nived\OneDrive\Desktop\my-mini-compiler-nived\testing_and_debugging.py"),
+from session import Session
+
+# (button label, module, GUI class); a module is imported the first time its button is used
+PHASES = [
+    ("Lexical Analysis", "lexical_gui", "LexicalAnalyzerGUI"),
+    ("Syntax Analysis", "syntax_gui", "SyntaxAnalyzerGUI"),
+    ("Semantic Analysis", "sementic", "SemanticAnalyzerGUI"),
+    ("Optimization", "optimization", "CodeOptimizerGUI"),
+    ("Code Generation", "code_generation", "TACCodeGeneratorApp"),
+    ("Error Handling", "error_handling", "ModernCCompilerGUI"),
+    ("Link & Execute", "linking_and_executing", "TACCodeGeneratorApp"),
+    ("Testing & Debugging", "testing_and_debugging", "ModernCCompilerGUI"),
 ]
 
-for label, script in buttons:
-    tk.Button(
-        root,
-        text=label,
-        width=36,
-        height=5,
-        bg="#3399FF",       # lighter_blue color
-        fg="white",
-        font=("Arial", 10, "bold"),
-        command=lambda s=script: run_script(s)
-    ).pack(pady=6)
-
-tk.Button(
-    root,
-    text="Exit Launcher",
-    width=35,
-    height=2,
-    bg="#f44336",
-    fg="white",
-    font=("Arial", 10, "bold"),
-    command=root.destroy
-).pack(pady=15)
-
-root.mainloop()
+
+class Launcher:
+    """Opens every phase as a Toplevel of one Tk root, all sharing one Session."""
+
+    def __init__(self, root):
+        self.root = root
+        self.session = Session()
+        root.title("Mini C Compiler - Launcher")
+        root.geometry("420x600")
+        root.configure(bg="#2b2b2b")
+
+        tk.Label(
+            root,
+            text="Mini C Compiler - Module Launcher",
+            font=("Arial", 15, "bold"),
+            fg="white",
+            bg="#2b2b2b"
+        ).pack(pady=15)
+
+        tk.Button(
+            root,
+            text="Load C File",
+            width=36,
+            height=2,
+            bg="#4CAF50",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            command=self.load_file
+        ).pack(pady=6)
+
+        self.file_label = tk.Label(root, text="No file loaded", fg="#cccccc", bg="#2b2b2b")
+        self.file_label.pack()
+
+        for label, module, cls in PHASES:
+            tk.Button(
+                root,
+                text=label,
+                width=36,
+                height=3,
+                bg="#3399FF",       # lighter_blue color
+                fg="white",
+                font=("Arial", 10, "bold"),
+                command=lambda m=module, c=cls: self.open_phase(m, c)
+            ).pack(pady=6)
+
+        tk.Button(
+            root,
+            text="Exit Launcher",
+            width=35,
+            height=2,
+            bg="#f44336",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            command=root.destroy
+        ).pack(pady=15)
+
+    def load_file(self):
+        file_path = filedialog.askopenfilename(filetypes=[("C Files", "*.c"), ("All Files", "*.*")])
+        if file_path:
+            try:
+                self.session.load(file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to load file:\n{e}")
+                return
+            self.file_label.config(text=os.path.basename(file_path))
+
+    def open_phase(self, module, cls):
+        try:
+            gui = getattr(importlib.import_module(module), cls)
+        except ImportError as e:
+            messagebox.showerror("Error", f"Cannot open {module}:\n{e}")
+            return
+        gui(tk.Toplevel(self.root), self.session)
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = Launcher(root)
+    root.mainloop()
@@ -0,0 +1,122 @@
+"""minicc: run the compiler phases on C files from the command line.
+
+    python minicc.py prog.c                                   # compile, link with gcc, run
+    python minicc.py src/ --stop-after codegen --emit tac --emit asm -o build/
+    python minicc.py prog.c --stop-after parse --emit ast -o -
+    python minicc.py src/ --stop-after codegen --profile --trace trace.json
+    python minicc.py prog.c --stop-after optimize --passes fold,copy_prop,dead_temps --emit optimized -o -
+    python minicc.py prog.c --stop-after codegen --registers 4 --emit asm -o -
+
+Each file is lexed and parsed once; every later phase works from that
+token stream and tree (see pipeline.py). Artifacts are written to the
+output directory as <name><suffix>, or to stdout with -o -.
+
+--profile prints wall and CPU time, peak memory and input/output sizes
+per phase; --profile-json and --trace save the same measurements as JSON
+and as a Chrome trace (open it in chrome://tracing or ui.perfetto.dev).
+With --profile, each file's optimizer passes are reported too.
+"""
+import argparse
+import os
+import sys
+
+from code_generation import REGISTERS
+from cparser import MAX_ERRORS
+from lex import expand_paths
+from optimization import DEFAULT_ORDER
+from pipeline import ARTIFACTS, PHASES, Pipeline, write_artifact
+from profiling import Profiler
+
+
+def emit(compilation, kinds, out_dir):
+    for kind in kinds:
+        if kind == 'exe':
+            continue
+        if out_dir == '-':
+            write_artifact(compilation, kind, sys.stdout)
+            continue
+        with open(os.path.join(out_dir, compilation.name + ARTIFACTS[kind][1]), 'w') as f:
+            write_artifact(compilation, kind, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='minicc', description="Compile C files without the GUI.")
+    parser.add_argument('paths', nargs='+', help="files, directories or glob patterns")
+    parser.add_argument('--stop-after', choices=PHASES, default='run', help="last phase to run (default: run)")
+    parser.add_argument('--emit', action='append', default=[], choices=sorted(ARTIFACTS),
+                        help="artifact to write; may be repeated")
+    parser.add_argument('-o', '--out-dir', default='.', help="directory for artifacts, or - for stdout")
+    parser.add_argument('-k', '--keep-going', action='store_true',
+                        help="carry on to code generation despite syntax or semantic errors")
+    parser.add_argument('--max-errors', type=int, default=MAX_ERRORS, help="syntax errors reported per file")
+    parser.add_argument('--passes', default=','.join(DEFAULT_ORDER),
+                        help="optimizer passes in the order to run them, comma separated")
+    parser.add_argument('--registers', type=int, default=REGISTERS,
+                        help="registers to allocate variables to in the target code; 0 keeps them all in memory")
+    parser.add_argument('--timeout', type=float, default=10, help="seconds a compiled program may run")
+    parser.add_argument('--profile', action='store_true', help="print a per-phase profile to stderr")
+    parser.add_argument('--profile-json', metavar='FILE', help="write the per-phase measurements as JSON")
+    parser.add_argument('--trace', metavar='FILE', help="write the phases as a Chrome trace")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="do not trace memory while profiling (tracemalloc slows every phase down)")
+    args = parser.parse_args(argv)
+
+    last = PHASES.index(args.stop_after)
+    for kind in args.emit:
+        if PHASES.index(ARTIFACTS[kind][0]) > last:
+            parser.error(f"--emit {kind} needs --stop-after {ARTIFACTS[kind][0]} or later")
+    if 'exe' in args.emit and args.out_dir == '-':
+        parser.error("--emit exe needs an output directory")
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.error("no source files matched")
+    if args.out_dir != '-':
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    profiler = Profiler(memory=not args.no_memory) if args.profile or args.profile_json or args.trace else None
+    try:
+        pipeline = Pipeline(args.stop_after, args.max_errors, args.keep_going,
+                            work_dir=args.out_dir if 'exe' in args.emit else None, run_timeout=args.timeout,
+                            profiler=profiler, passes=[p for p in args.passes.split(',') if p],
+                            registers=args.registers)
+    except ValueError as e:
+        parser.error(str(e))
+    status = 0
+    for path in paths:
+        try:
+            compilation = pipeline.run_file(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"error: {path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        for phase, message in compilation.errors:
+            print(f"{path}: {phase}: {message}", file=sys.stderr)
+        if not compilation.ok:
+            status = 1
+        if args.profile and compilation.optimizer is not None:
+            folder = compilation.folder
+            print(f"{path}: {folder.folded} constant expressions folded, {folder.propagated} uses of known values\n"
+                  f"{compilation.optimizer.report()}", file=sys.stderr)
+        # Artifacts of phases that ran are written even if a later one failed
+        emit(compilation, [k for k in args.emit if ARTIFACTS[k][0] in compilation.completed], args.out_dir)
+        if compilation.run_result is not None:
+            returncode, stdout, stderr = compilation.run_result
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+            if returncode:
+                status = max(status, returncode if returncode > 0 else 1)
+
+    if profiler is not None:
+        if args.profile:
+            print(profiler.report(), file=sys.stderr)
+        if args.profile_json:
+            with open(args.profile_json, 'w') as f:
+                profiler.write_json(f)
+        if args.trace:
+            with open(args.trace, 'w') as f:
+                profiler.write_chrome_trace(f)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,273 @@
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import re
+from cparser import parse_with_errors
+from cfg import CFG
+from const_fold import binary, fold_constants, literal, spell, unary
+from dataflow import Liveness
+from gvn import value_numbering
+from ir import BINARY, UNARY, Const, lower
+from session import Session
 
-def optimize_code(code):
-    lines = code.splitlines()
-    optimized_lines = []
+# name -> pass; a pass rewrites one ir.Function in place and returns how many changes it made
+PASSES = {}
+DEFAULT_ORDER = ('fold', 'identity', 'mul_zero', 'self_assign', 'gvn', 'copy_prop', 'dead_temps', 'dead_stores')
+MAX_ROUNDS = 10
 
-    for line in lines:
-        stripped = line.strip()
 
-        # Remove self assignments like x = x;
-        if re.match(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\1\s*;', stripped):
+def optimization_pass(name):
+    """Register the decorated function as the pass called name."""
+    def register(function):
+        PASSES[name] = function
+        return function
+    return register
+
+
+def _typed(operand):
+    """(value, type) of a constant operand, else None."""
+    return literal(operand.text) if isinstance(operand, Const) else None
+
+
+def _int(operand):
+    """The value of an integer constant operand, else None."""
+    if isinstance(operand, Const) and type(operand.value) is int:
+        return operand.value
+    return None
+
+
+def _to_copy(instr, operand):
+    instr.op = 'copy'
+    instr.args = [operand]
+
+
+@optimization_pass('fold')
+def fold(function):
+    """t = 7 / 2  ->  t = 3, with C's arithmetic on constants typed by their spelling (see const_fold)."""
+    changes = 0
+    for instr in function.body:
+        op = instr.op
+        if op in BINARY:
+            a, b = _typed(instr.args[0]), _typed(instr.args[1])
+            result = binary(op, a[0], a[1], b[0], b[1]) if a is not None and b is not None else None
+        elif op in ('neg', 'compl', 'not'):
+            a = _typed(instr.args[0])
+            result = unary(UNARY[op], a[0], a[1]) if a is not None else None
+        else:
+            continue
+        if result is not None:
+            _to_copy(instr, Const(result[0], spell(*result)))
+            changes += 1
+    return changes
+
+
+@optimization_pass('identity')
+def identity(function):
+    """x + 0, 0 + x, x - 0, x * 1, 1 * x  ->  x; a floating x + 0 stays, since -0.0 + 0 is 0.0."""
+    changes = 0
+    for instr in function.body:
+        op = instr.op
+        if op not in ('+', '-', '*'):
+            continue
+        a, b = instr.args
+        unit = 1 if op == '*' else 0
+        if _int(b) == unit and not (op == '+' and a in function.floating):
+            _to_copy(instr, a)
+        elif op != '-' and _int(a) == unit and not (op == '+' and b in function.floating):
+            _to_copy(instr, b)
+        else:
+            continue
+        changes += 1
+    return changes
+
+
+@optimization_pass('mul_zero')
+def mul_zero(function):
+    """x * 0, 0 * x  ->  0, unless x may be floating-point (NaN * 0 is NaN)."""
+    changes = 0
+    for instr in function.body:
+        if instr.op != '*':
+            continue
+        a, b = instr.args
+        other = a if _int(b) == 0 else b if _int(a) == 0 else None
+        if other is None or other in function.floating:
+            continue
+        _to_copy(instr, Const(0))
+        changes += 1
+    return changes
+
+
+@optimization_pass('self_assign')
+def self_assign(function):
+    """Drop x = x."""
+    body = function.body
+    kept = [instr for instr in body
+            if not (instr.op == 'copy' and isinstance(instr.dest, str) and instr.dest == instr.args[0])]
+    function.body = kept
+    return len(body) - len(kept)
+
+
+@optimization_pass('gvn')
+def gvn(function):
+    """Reuse a computation or load that an earlier one already made on every path to it (see gvn.py).
+
+    Counts the computations and loads removed; the copies it folds along
+    the way are not counted, since leaving SSA form may need new ones.
+    """
+    removed = value_numbering(function)
+    return removed.computations + removed.loads
+
+
+@optimization_pass('copy_prop')
+def copy_prop(function):
+    """Replace uses of a temporary that holds a copy by what it copies.
+
+    A temporary assigned once from a constant or from another such
+    temporary is replaced everywhere. One copied from a variable is
+    replaced up to the next label, jump, call or store that could change
+    the variable.
+    """
+    temps = function.temps
+    definitions = {}
+    for instr in function.body:
+        name = instr.defines()
+        if name in temps:
+            definitions[name] = None if name in definitions else instr
+    forever = {}
+    for name, instr in definitions.items():
+        if instr is not None and instr.op == 'copy':
+            source = instr.args[0]
+            if isinstance(source, Const) or source in definitions and definitions[source] is not None:
+                forever[name] = source
+    # Chains of temporaries end at their first non-temporary source
+    for name in forever:
+        source = forever[name]
+        while source in forever:
+            source = forever[source]
+        forever[name] = source
+
+    changes = 0
+    local = dict(forever)
+    copied = {}             # variable -> temporaries in `local` that copy it
+    for instr in function.body:
+        if instr.replace_uses(local):
+            changes += 1
+        op = instr.op
+        if op == 'label' or op in ('goto', 'if', 'ifFalse', 'return') or op == 'call' or not isinstance(instr.dest, (str, type(None))):
+            # Anything but a plain assignment may change a variable the IR cannot see
+            local = dict(forever)
+            copied.clear()
             continue
+        name = instr.dest
+        if name is None:
+            continue
+        for temp in copied.pop(name, ()):
+            local.pop(temp, None)
+        if op == 'copy' and name in temps and definitions.get(name) is instr and name not in forever:
+            source = instr.args[0]
+            if isinstance(source, str) and function.is_register(source):
+                local[name] = source
+                copied.setdefault(source, []).append(name)
+    return changes
+
+
+@optimization_pass('dead_temps')
+def dead_temps(function):
+    """Drop assignments to temporaries that are never read; calls stay for their effects."""
+    used = set()
+    for instr in function.body:
+        used.update(instr.uses())
+    temps = function.temps
+    body = function.body
+    kept = [instr for instr in body
+            if instr.op == 'call' or not (instr.dest in temps and instr.dest not in used)]
+    function.body = kept
+    return len(body) - len(kept)
+
+
+@optimization_pass('dead_stores')
+def dead_stores(function):
+    """Drop assignments to register variables that no path reads before the next assignment (see dataflow.Liveness)."""
+    graph = CFG(function)
+    live = Liveness(graph)
+    dead = {id(instr) for block in graph.blocks for instr in live.dead_definitions(block)}
+    if dead:
+        function.body = [instr for instr in function.body if id(instr) not in dead]
+    return len(dead)
+
+
+class PassStats:
+    __slots__ = ('name', 'runs', 'changes', 'seconds')
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = self.changes = 0
+        self.seconds = 0.0
 
-        # Constant folding for int declaration: int x = 2 + 3;
-        const_decl = re.match(r'^\s*int\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9+\-*/\s]+);$', stripped)
-        if const_decl:
-            var, expr = const_decl.group(1), const_decl.group(2)
-            try:
-                value = eval(expr)
-                optimized_lines.append(f"int {var} = {value};")
-                continue
-            except:
-                pass
 
-        # Constant folding for assignment: x = 2 + 3;
-        const_assign = re.match(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9+\-*/\s]+);$', stripped)
-        if const_assign:
-            var, expr = const_assign.group(1), const_assign.group(2)
-            try:
-                value = eval(expr)
-                optimized_lines.append(f"{var} = {value};")
-                continue
-            except:
-                pass
+class PassManager:
+    """Runs passes over each function in the given order, round after round, until a round changes nothing."""
 
-        # Algebraic simplifications
-        simplified = stripped
+    def __init__(self, order=DEFAULT_ORDER, max_rounds=MAX_ROUNDS):
+        unknown = [name for name in order if name not in PASSES]
+        if unknown:
+            raise ValueError(f"unknown optimization pass(es): {', '.join(unknown)}; "
+                             f"expected some of {', '.join(PASSES)}")
+        self.order = tuple(order)
+        self.max_rounds = max_rounds
+        self.stats = {name: PassStats(name) for name in self.order}
+        self.rounds = 0                 # most rounds any function needed
+        self.before = self.after = 0    # instructions
 
-        # x = y + 0 or x = 0 + y → x = y;
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\+\s*0\s*;', r'\1 = \2;', simplified)
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*0\s*\+\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*;', r'\1 = \2;', simplified)
+    def run(self, program):
+        self.before += program.instructions()
+        passes = [(PASSES[name], self.stats[name]) for name in self.order]
+        for function in program.functions:
+            for rounds in range(1, self.max_rounds + 1):
+                changed = False
+                for run, stats in passes:
+                    start = time.perf_counter()
+                    changes = run(function)
+                    stats.seconds += time.perf_counter() - start
+                    stats.runs += 1
+                    stats.changes += changes
+                    changed = changed or changes
+                if not changed:
+                    break
+            self.rounds = max(self.rounds, rounds)
+        self.after += program.instructions()
+        return program
 
-        # x = y - 0 → x = y;
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*-\s*0\s*;', r'\1 = \2;', simplified)
+    def report(self):
+        lines = [f"{'pass':<12} {'runs':>6} {'changes':>8} {'ms':>9}"]
+        for s in self.stats.values():
+            lines.append(f"{s.name:<12} {s.runs:>6} {s.changes:>8} {s.seconds * 1e3:>9.2f}")
+        total = sum(s.seconds for s in self.stats.values())
+        lines.append(f"{'total':<12} {'':>6} {sum(s.changes for s in self.stats.values()):>8} {total * 1e3:>9.2f}")
+        lines.append(f"{self.before} -> {self.after} instructions, at most {self.rounds} round(s) per function")
+        return '\n'.join(lines)
 
-        # x = y * 1 or x = 1 * y → x = y;
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\*\s*1\s*;', r'\1 = \2;', simplified)
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*1\s*\*\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*;', r'\1 = \2;', simplified)
 
-        # x = y * 0 or x = 0 * y → x = 0;
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\*\s*0\s*;', r'\1 = 0;', simplified)
-        simplified = re.sub(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*0\s*\*\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*;', r'\1 = 0;', simplified)
+def optimize(program, order=DEFAULT_ORDER):
+    """Optimize an ir.Program in place; returns the PassManager with its statistics."""
+    manager = PassManager(order)
+    manager.run(program)
+    return manager
 
-        optimized_lines.append(simplified)
 
-    return '\n'.join(optimized_lines)
+def optimize_code(code, tree=None, order=DEFAULT_ORDER):
+    """Optimized TAC listing for C source text (or a TokenBuffer of it)."""
+    if tree is None:
+        tree, _ = parse_with_errors(code)
+    program = lower(tree, fold_constants(tree).constants)
+    optimize(program, order)
+    return '\n'.join(program.tac())
 
 
 # GUI Codes
 class CodeOptimizerGUI:
-    def __init__(self, master):
+    def __init__(self, master, session=None):
         self.master = master
+        self.session = session or Session()
         master.title("Mini Compiler - Code Optimizer")
         master.geometry("900x600")
 
@@ -70,39 +276,45 @@ class CodeOptimizerGUI:
         tk.Label(master, text="Enter C Code to Optimize:").pack(anchor="w", padx=10)
         self.input_text = tk.Text(master, height=15, width=100, font=("Consolas", 12))
         self.input_text.pack(padx=10, pady=5)
+        self.input_text.insert(tk.END, self.session.source)
 
         button_frame = tk.Frame(master)
         button_frame.pack(pady=10)
 
         tk.Button(button_frame, text="Optimize Code", command=self.optimize_code).grid(row=0, column=0, padx=10)
         tk.Button(button_frame, text="Load Code from File", command=self.load_file).grid(row=0, column=1, padx=10)
-        tk.Button(button_frame, text="Save Optimized Code", command=self.save_file).grid(row=0, column=2, padx=10)
+        tk.Button(button_frame, text="Save Optimized TAC", command=self.save_file).grid(row=0, column=2, padx=10)
 
-        tk.Label(master, text="Optimized Code:").pack(anchor="w", padx=10)
+        tk.Label(master, text="Optimized Three-Address Code:").pack(anchor="w", padx=10)
         self.output_text = tk.Text(master, height=15, width=100, font=("Consolas", 12), bg="#f0f0f0")
         self.output_text.pack(padx=10, pady=5)
 
     def optimize_code(self):
-        code = self.input_text.get("1.0", tk.END)
-        optimized = optimize_code(code)
+        code = self.input_text.get("1.0", "end-1c")
+        self.session.set_source(code)
+        tree, errors = parse_with_errors(self.session.tokens())
+        if errors:
+            messagebox.showerror("Syntax Error", str(errors[0]))
+            return
+        program = lower(tree, fold_constants(tree).constants)
+        manager = optimize(program)
         self.output_text.delete("1.0", tk.END)
-        self.output_text.insert(tk.END, optimized)
+        self.output_text.insert(tk.END, '\n'.join(program.tac()) + '\n\n' + manager.report())
 
     def load_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("C files", "*.c"), ("Text files", "*.txt"), ("All files", "*.*")])
         if file_path:
-            with open(file_path, "r") as f:
-                code = f.read()
+            code = self.session.load(file_path)
             self.input_text.delete("1.0", tk.END)
             self.input_text.insert(tk.END, code)
 
     def save_file(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".c",
-                                                 filetypes=[("C files", "*.c"), ("Text files", "*.txt"), ("All files", "*.*")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".tac",
+                                                 filetypes=[("TAC files", "*.tac"), ("Text files", "*.txt"), ("All files", "*.*")])
         if file_path:
             with open(file_path, "w") as f:
                 f.write(self.output_text.get("1.0", tk.END))
-            messagebox.showinfo("Saved", "Optimized code saved successfully!")
+            messagebox.showinfo("Saved", "Optimized TAC saved successfully!")
 
 # Run GUI
 if __name__ == "__main__":
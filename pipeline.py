@@ -0,0 +1,224 @@
+"""The compiler phases as one in-process pipeline, no GUI needed.
+
+    result = Pipeline(stop_after='codegen').run_file('prog.c')
+    print('\\n'.join(result.target))
+
+Each phase reads what the earlier ones left on the Compilation, so the
+source is lexed once and parsed once: the parser consumes the lexer's
+token stream, and semantic analysis and code generation share its AST.
+A Compilation that already carries tokens or a tree (for instance from a
+Session) skips the phases that made them.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from ast_nodes import walk
+from code_generation import REGISTERS, allocate_program, generate_code
+from const_fold import fold_constants
+from cparser import MAX_ERRORS, parse_with_errors
+from ir import lower
+from linking_and_executing import compile_c_file, run_executable
+from optimization import DEFAULT_ORDER, PassManager
+from sementic import check_semantics
+from token_buffer import TokenBuffer
+from tokenizer import scanner_spans
+
+PHASES = ('lex', 'parse', 'semantic', 'optimize', 'codegen', 'link', 'run')
+
+# artifact: (phase that produces it, file suffix)
+ARTIFACTS = {
+    'tokens': ('lex', '.tokens.csv'),
+    'ast': ('parse', '.ast.txt'),
+    'dot': ('parse', '.dot'),
+    'optimized': ('optimize', '.opt.tac'),
+    'tac': ('codegen', '.tac'),
+    'asm': ('codegen', '.s'),
+    'exe': ('link', '.exe' if os.name == 'nt' else ''),
+}
+
+
+class Compilation:
+    """One source file and everything the pipeline has produced for it so far."""
+
+    def __init__(self, source, path=None):
+        self.source = source
+        self.path = path
+        self.tokens = None          # TokenBuffer, scanner engine
+        self.ast = None             # FileAST
+        self.diagnostics = []       # syntax errors
+        self.semantic_errors = []
+        self.folder = None          # const_fold.ConstantFolder run on the AST
+        self.ir = None              # ir.Program, optimized in place by the optimize phase
+        self.optimizer = None       # the PassManager that optimized it, with its statistics
+        self.optimized = None       # optimized three address code text
+        self.tac = None             # three address code lines
+        self.target = None          # target code lines
+        self.executable = None
+        self.temp_dir = None        # made by the link phase, removed after the run phase
+        self.run_result = None      # (exit status, stdout, stderr)
+        self.errors = []            # (phase, message) that stopped the pipeline
+        self.completed = []         # phases run, in order
+
+    @classmethod
+    def from_session(cls, session):
+        """Start from a Session's cached tokens and tree."""
+        compilation = cls(session.source, session.path)
+        compilation.tokens = session.tokens()
+        compilation.ast, compilation.diagnostics = session.parsed()
+        return compilation
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def name(self):
+        if self.path:
+            return os.path.splitext(os.path.basename(self.path))[0]
+        return 'a'
+
+
+class Pipeline:
+    """Runs the phases in order up to `stop_after`, stopping at the first that fails.
+
+    Syntax and semantic errors stop compilation before code generation
+    unless `keep_going` is set. The link phase needs gcc; the executable is
+    written to `work_dir`, or else to a temporary directory that the run
+    phase removes again. Code generation gives variables one of
+    `registers` registers where their live ranges allow (0 for none).
+    """
+
+    def __init__(self, stop_after='run', max_errors=MAX_ERRORS, keep_going=False, work_dir=None,
+                 run_timeout=10, profiler=None, passes=DEFAULT_ORDER, registers=REGISTERS):
+        if stop_after not in PHASES:
+            raise ValueError(f"unknown phase {stop_after!r}; expected one of {', '.join(PHASES)}")
+        PassManager(passes)         # fails now on an unknown pass name
+        self.passes = tuple(passes)
+        self.registers = registers
+        self.phases = PHASES[:PHASES.index(stop_after) + 1]
+        self.max_errors = max_errors
+        self.keep_going = keep_going
+        self.work_dir = work_dir
+        self.run_timeout = run_timeout
+        self.profiler = profiler
+
+    def run(self, source, path=None):
+        return self.compile(Compilation(source, path))
+
+    def run_file(self, path):
+        with open(path, 'r') as f:
+            return self.run(f.read(), path)
+
+    def run_session(self, session):
+        return self.compile(Compilation.from_session(session))
+
+    def compile(self, compilation):
+        sizes = {}
+        for phase in self.phases:
+            if self.profiler is None:
+                getattr(self, '_' + phase)(compilation)
+            else:
+                with self.profiler.phase(phase, compilation.path or compilation.name) as record:
+                    getattr(self, '_' + phase)(compilation)
+                record.inputs, record.outputs = self._sizes(phase, compilation, sizes)
+            compilation.completed.append(phase)
+            if compilation.errors and (not self.keep_going or phase == 'link'):
+                break
+        return compilation
+
+    def _sizes(self, phase, c, sizes):
+        """(inputs, outputs) of a phase for the profiler; `sizes` carries counts between phases."""
+        if phase == 'lex':
+            sizes['tokens'] = len(c.tokens)
+            return {'chars': len(c.source)}, {'tokens': sizes['tokens']}
+        if phase == 'parse':
+            sizes['nodes'] = sum(1 for _ in walk(c.ast))
+            return {'tokens': sizes.get('tokens', len(c.tokens))}, {'nodes': sizes['nodes'], 'errors': len(c.diagnostics)}
+        if phase == 'semantic':
+            return {'nodes': sizes.get('nodes', 0)}, {'errors': len(c.semantic_errors)}
+        if phase == 'optimize':
+            manager = c.optimizer
+            changes = sum(s.changes for s in manager.stats.values())
+            return {'instructions': manager.before}, {'instructions': manager.after, 'folded': c.folder.folded,
+                                                      'changes': changes}
+        if phase == 'codegen':
+            return {'nodes': sizes.get('nodes', 0)}, {'tac': len(c.tac), 'instructions': len(c.target)}
+        if phase == 'link':
+            built = c.executable and os.path.exists(c.executable)
+            return {'bytes': len(c.source.encode())}, {'bytes': os.path.getsize(c.executable)} if built else {}
+        if phase == 'run':
+            return {}, {'bytes': len(c.run_result[1])} if c.run_result else {}
+        return {}, {}
+
+    def _lex(self, c):
+        if c.tokens is None:
+            c.tokens = TokenBuffer.from_source(c.source, scanner_spans)
+
+    def _parse(self, c):
+        if c.ast is None:
+            c.ast, c.diagnostics = parse_with_errors(c.tokens, self.max_errors)
+        c.errors.extend(('parse', str(d)) for d in c.diagnostics)
+
+    def _semantic(self, c):
+        c.semantic_errors = check_semantics(c.tokens, c.ast)
+        c.errors.extend(('semantic', str(d)) for d in c.semantic_errors)
+
+    def _optimize(self, c):
+        c.folder = fold_constants(c.ast)
+        c.ir = lower(c.ast, c.folder.constants)
+        c.optimizer = PassManager(self.passes)
+        c.optimizer.run(c.ir)
+        c.optimized = '\n'.join(c.ir.tac())
+
+    def _codegen(self, c):
+        program = c.ir or lower(c.ast)
+        c.tac = program.tac()
+        c.target = generate_code(c.tac, allocate_program(program, self.registers) if self.registers else None)
+
+    def _link(self, c):
+        if shutil.which('gcc') is None:
+            c.errors.append(('link', "gcc not found"))
+            return
+        # gcc gets a private copy, so the source compiled is exactly c.source
+        c.temp_dir = tempfile.mkdtemp(prefix='minicc-')
+        source_path = os.path.join(c.temp_dir, c.name + '.c')
+        with open(source_path, 'w') as f:
+            f.write(c.source)
+        executable = os.path.join(self.work_dir or c.temp_dir, c.name + ARTIFACTS['exe'][1])
+        c.executable, error = compile_c_file(source_path, executable)
+        if error:
+            c.errors.append(('link', error))
+        if self.work_dir or error:
+            shutil.rmtree(c.temp_dir, ignore_errors=True)
+            c.temp_dir = None
+
+    def _run(self, c):
+        try:
+            c.run_result = run_executable(c.executable, self.run_timeout)
+        except subprocess.TimeoutExpired:
+            c.errors.append(('run', f"timed out after {self.run_timeout}s"))
+        if c.temp_dir:
+            shutil.rmtree(c.temp_dir, ignore_errors=True)
+            c.temp_dir = c.executable = None
+
+
+def write_artifact(c, kind, f):
+    """Write one artifact of a finished Compilation to an open text file."""
+    if kind == 'tokens':
+        c.tokens.write_csv(f)
+    elif kind == 'ast':
+        from ast_nodes import dump
+        f.write(dump(c.ast) + '\n')
+    elif kind == 'dot':
+        from tree_layout import write_dot
+        write_dot(f, c.ast, title=c.name)
+    elif kind == 'optimized':
+        f.write(c.optimized + '\n')
+    elif kind == 'tac':
+        f.write('\n'.join(c.tac) + '\n')
+    elif kind == 'asm':
+        f.write('\n'.join(c.target) + '\n')
+    else:
+        raise ValueError(f"{kind} cannot be written as text")
@@ -0,0 +1,174 @@
+"""Per-phase measurements: wall and CPU time, peak memory, input and output sizes.
+
+    profiler = Profiler()
+    with profiler.phase('parse', file='prog') as record:
+        tree = parse(tokens)
+    record.inputs['tokens'] = len(tokens)
+    print(profiler.report())
+
+CPU time includes child processes, so gcc and the compiled program are
+counted in their phases. Peak memory is what tracemalloc saw allocated
+during the phase, on top of what was live when it began.
+
+Samplers and other tools can follow along: functions registered with
+add_hook() are called as hook(event, record) with event 'start' or 'end',
+and current_phase() names the phase a thread is in at any moment, e.g.
+for attributing the stacks from sys._current_frames().
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_hooks = []
+_active = {}        # thread id -> names of the phases it is in, innermost last
+
+
+def add_hook(hook):
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def current_phase(thread_id=None):
+    """The innermost phase running in a thread (default: this one), or None."""
+    stack = _active.get(threading.get_ident() if thread_id is None else thread_id)
+    return stack[-1] if stack else None
+
+
+def _cpu_time():
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class PhaseRecord:
+    __slots__ = ('name', 'file', 'start', 'wall', 'cpu', 'peak_memory', 'inputs', 'outputs', 'thread')
+
+    def __init__(self, name, file=None):
+        self.name = name
+        self.file = file
+        self.start = self.wall = self.cpu = 0.0     # seconds; start is relative to the profiler
+        self.peak_memory = None                     # bytes, when memory is traced
+        self.inputs = {}                            # unit -> count, e.g. {'tokens': 812}
+        self.outputs = {}
+        self.thread = threading.get_ident()
+
+    def as_dict(self):
+        return {
+            'phase': self.name,
+            'file': self.file,
+            'start_s': round(self.start, 6),
+            'wall_s': round(self.wall, 6),
+            'cpu_s': round(self.cpu, 6),
+            'peak_memory_bytes': self.peak_memory,
+            'inputs': self.inputs,
+            'outputs': self.outputs,
+        }
+
+
+class Profiler:
+    """Collects a PhaseRecord for every `with profiler.phase(name):` block."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name, file=None):
+        record = PhaseRecord(name, file)
+        stack = _active.setdefault(record.thread, [])
+        stack.append(name)
+        for hook in list(_hooks):
+            hook('start', record)
+        started = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            # There is one peak per process: a nested phase hides its parent's earlier peak
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        cpu = _cpu_time()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            record.cpu = _cpu_time() - cpu
+            if self.memory:
+                record.peak_memory = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+                if started:
+                    tracemalloc.stop()
+            record.start = start - self.origin
+            record.wall = end - start
+            stack.pop()
+            self.records.append(record)
+            for hook in list(_hooks):
+                hook('end', record)
+
+    def totals(self):
+        """(merged record, runs) per phase name, in the order the phases first ran."""
+        merged, runs = {}, {}
+        for record in self.records:
+            total = merged.get(record.name)
+            if total is None:
+                total = merged[record.name] = PhaseRecord(record.name)
+                total.peak_memory = record.peak_memory
+                runs[record.name] = 0
+            runs[record.name] += 1
+            total.wall += record.wall
+            total.cpu += record.cpu
+            if record.peak_memory is not None:
+                total.peak_memory = max(total.peak_memory or 0, record.peak_memory)
+            for mine, theirs in ((total.inputs, record.inputs), (total.outputs, record.outputs)):
+                for unit, count in theirs.items():
+                    mine[unit] = mine.get(unit, 0) + count
+        return [(total, runs[name]) for name, total in merged.items()]
+
+    def report(self):
+        """A table of the totals per phase, with each phase's share of the wall time."""
+        totals = self.totals()
+        wall = sum(t.wall for t, _ in totals)
+        cpu = sum(t.cpu for t, _ in totals)
+        lines = [f"{'phase':<10} {'runs':>5} {'wall ms':>10} {'share':>6} {'cpu ms':>10} {'peak KiB':>10}  in -> out"]
+        for t, runs in totals:
+            peak = f"{t.peak_memory / 1024:,.0f}" if t.peak_memory is not None else "-"
+            sizes = f"{_sizes(t.inputs)} -> {_sizes(t.outputs)}" if t.inputs or t.outputs else ""
+            lines.append(f"{t.name:<10} {runs:>5} {t.wall * 1e3:>10.2f} {t.wall / (wall or 1):>6.0%} "
+                         f"{t.cpu * 1e3:>10.2f} {peak:>10}  {sizes}")
+        lines.append(f"{'total':<10} {'':>5} {wall * 1e3:>10.2f} {'':>6} {cpu * 1e3:>10.2f}")
+        return '\n'.join(lines)
+
+    def as_dict(self):
+        return {
+            'records': [r.as_dict() for r in self.records],
+            'totals': [dict(t.as_dict(), runs=runs) for t, runs in self.totals()],
+        }
+
+    def write_json(self, f):
+        json.dump(self.as_dict(), f, indent=2)
+        f.write('\n')
+
+    def write_chrome_trace(self, f):
+        """Write the records as Chrome trace events, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            args = {'cpu_ms': round(r.cpu * 1e3, 3), 'inputs': r.inputs, 'outputs': r.outputs}
+            if r.file is not None:
+                args['file'] = r.file
+            if r.peak_memory is not None:
+                args['peak_memory_bytes'] = r.peak_memory
+            events.append({'name': r.name, 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': r.thread,
+                           'ts': round(r.start * 1e6, 3), 'dur': round(r.wall * 1e6, 3), 'args': args})
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        f.write('\n')
+
+
+def _sizes(counts):
+    return ', '.join(f"{count:,} {unit}" for unit, count in counts.items())
@@ -4,8 +4,7 @@ from tkinter import filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 from ttkthemes import ThemedTk
 from tkinter import ttk
-import networkx as nx
-import matplotlib.pyplot as plt
+from highlighting import Highlighter
 
 KEYWORDS = {"int", "float", "char", "double", "if", "else", "while", "for", "return", "void", "main"}
 
@@ -35,7 +34,6 @@ def load_file():
             code = file.read()
             code_area.delete(1.0, tk.END)
             code_area.insert(tk.END, code)
-            apply_syntax_highlighting()
 
 def analyze_syntax():
     code = code_area.get(1.0, tk.END)
@@ -51,19 +49,6 @@ def analyze_syntax():
         status_bar.config(text="Syntax analysis complete. No errors found.")
     result_area.config(state='disabled')
 
-def apply_syntax_highlighting():
-    code_area.tag_remove("keyword", "1.0", tk.END)
-    for keyword in KEYWORDS:
-        start = "1.0"
-        while True:
-            start = code_area.search(rf'\y{keyword}\y', start, stopindex=tk.END, regexp=True)
-            if not start:
-                break
-            end = f"{start}+{len(keyword)}c"
-            code_area.tag_add("keyword", start, end)
-            start = end
-    code_area.tag_config("keyword", foreground="blue")
-
 def clear_all():
     code_area.delete(1.0, tk.END)
     result_area.config(state='normal')
@@ -82,6 +67,9 @@ def toggle_theme():
     theme_btn.config(text="☀️ Light Mode" if is_dark else "🌙 Dark Mode")
 
 def generate_parse_tree():
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     code = code_area.get(1.0, tk.END)
     lines = [line.strip() for line in code.splitlines() if line.strip()]
 
@@ -145,6 +133,8 @@ frame.pack(fill=tk.BOTH, expand=True)
 ttk.Label(frame, text="Enter or Load C Code:").pack(anchor=tk.W)
 code_area = ScrolledText(frame, height=18, font=("Consolas", 12), undo=True)
 code_area.pack(fill=tk.BOTH, expand=True, pady=5)
+code_area.tag_config("keyword", foreground="blue")
+highlighter = Highlighter(code_area, KEYWORDS)
 
 # Buttons
 button_frame = ttk.Frame(frame)
@@ -1,12 +1,929 @@
 import tkinter as tk
 from tkinter import scrolledtext, filedialog
 import re
+from bisect import bisect_right
+from itertools import chain
+import ast_nodes as c_ast
+from c_types import (BOOL, INT, PTRDIFF_T, SIZE_T, STRING, VOID, Array, Function, Pointer, Tagged,
+                     compatible, composite, decay, from_specifiers, promote, usual_arithmetic)
+from cparser import Diagnostic, parse_with_errors
+from session import Session
+from symbol_table import Symbol, SymbolTable
+from token_buffer import TokenBuffer
+from tokenizer import KIND_CODES, scanner_spans
+
+
+# Names that standard headers define as macros or objects; the parser skips #include
+HEADER_NAMES = frozenset((
+    'NULL', 'EOF', 'stdin', 'stdout', 'stderr', 'errno', 'true', 'false',
+    'EXIT_SUCCESS', 'EXIT_FAILURE', 'RAND_MAX', 'INT_MAX', 'INT_MIN', 'UINT_MAX', 'LONG_MAX',
+    'LONG_MIN', 'CHAR_MAX', 'CHAR_MIN', 'CHAR_BIT', 'SEEK_SET', 'SEEK_CUR', 'SEEK_END', 'BUFSIZ',
+))
+
+DEFINE_RE = re.compile(r'^[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)', re.MULTILINE)
+
+TYPE_KEYWORDS = frozenset(('void', 'char', 'short', 'int', 'long', 'float', 'double', 'signed', 'unsigned', '_Bool'))
+COMPARISONS = frozenset(('<', '>', '<=', '>=', '==', '!='))
+INTEGER_OPERATORS = frozenset(('%', '&', '|', '^', '<<', '>>'))
+UNARY_NAMES = {'+': 'unary plus', '-': 'unary minus', '~': 'bit-complement', '!': 'unary exclamation mark'}
+
+
+def integer_value(node):
+    """The value of an integer literal node, or None."""
+    if not isinstance(node, c_ast.Constant) or node.type in ('string', 'char') or node.type.endswith(('float', 'double')):
+        return None
+    text = node.value.rstrip('uUlL')
+    if text[:2].lower() == '0x':
+        return int(text, 16)
+    return int(text, 8) if len(text) > 1 and text[0] == '0' else int(text)
+
+
+def is_null(node):
+    """Whether node is a null pointer constant: 0, NULL, or (void *)0."""
+    if isinstance(node, c_ast.Cast):
+        return is_null(node.expr)
+    if isinstance(node, c_ast.ID):
+        return node.name == 'NULL'
+    return integer_value(node) == 0
+
+
+class SemanticChecker(c_ast.NodeVisitor):
+    """Scope, declaration and type checks in one walk over a cparser FileAST.
+
+    Reports undeclared identifiers, redeclarations and conflicting types,
+    redefined functions and parameters, gotos to missing labels, duplicate
+    labels, break/continue/case outside the statements they belong to, and
+    assignments to const-qualified objects.
+
+    Every expression visitor returns the expression's c_types type, or
+    None when it is unknown, in which case nothing is reported about it:
+    a mistake is reported once, not again by every expression around it.
+    Calls to undeclared functions are let through with an unknown result,
+    since their prototypes usually come from headers the parser never sees.
+    """
+
+    table = SymbolTable
+
+    def __init__(self, macros=()):
+        self.symbols = self.table()
+        self.tags = self.table()    # struct and union tags, a namespace of their own
+        self.diagnostics = []
+        for name in chain(HEADER_NAMES, macros):
+            self.symbols.declare(Symbol(name, 'macro'))
+        self.function = None
+        self.result = None          # return type of the current function
+        self.labels = {}            # label -> Label node, in the current function
+        self.gotos = []
+        self.undeclared = set()     # reported once per function, like gcc
+        self.loops = 0
+        self.switches = 0
+
+    def check(self, tree):
+        self.visit(tree)
+        return self.diagnostics
+
+    def error(self, node, message):
+        self.diagnostics.append(Diagnostic(node.line, node.column, message))
+
+    def push(self):
+        self.symbols.push()
+        self.tags.push()
+
+    def pop(self):
+        self.symbols.pop()
+        self.tags.pop()
+
+    # --- types ---
+    def resolve(self, node):
+        """The type a declarator node denotes; its array sizes are checked on the way."""
+        if isinstance(node, c_ast.TypeDecl):
+            node = node.type
+        if isinstance(node, c_ast.PtrDecl):
+            target = self.resolve(node.type)
+            return None if target is None else Pointer(target)
+        if isinstance(node, c_ast.ArrayDecl):
+            element = self.resolve(node.type)
+            length = None
+            if node.dim is not None:
+                size = self.value(node.dim)
+                if size is not None and not size.integer:
+                    self.error(node.dim, f"size of array has non-integer type '{size}'")
+                length = integer_value(node.dim)
+            if element is VOID or isinstance(element, Function):
+                self.error(node, f"declaration of array of {'voids' if element is VOID else 'functions'}")
+                return None
+            return None if element is None else Array(element, length)
+        if isinstance(node, c_ast.FuncDecl):
+            result = self.resolve(node.type)
+            if isinstance(result, (Array, Function)):
+                self.error(node, f"function cannot return {'an array' if isinstance(result, Array) else 'a function'}")
+                return None
+            params, variadic = self.parameters(node.args)
+            return None if result is None else Function(result, params, variadic)
+        if isinstance(node, c_ast.IdentifierType):
+            names = node.names
+            if len(names) == 1 and names[0] not in TYPE_KEYWORDS:
+                symbol = self.symbols.lookup(names[0])
+                return symbol.type if symbol is not None and symbol.kind == 'typedef' else None
+            return from_specifiers(names)
+        if isinstance(node, (c_ast.Struct, c_ast.Union)):
+            return self.tagged(node)
+        if isinstance(node, c_ast.Enum):
+            self.enum(node)
+            return INT
+        return None
+
+    def parameters(self, args):
+        """(parameter types, variadic) of a ParamList; the types are None for `f()`."""
+        if args is None:
+            return None, False
+        types, variadic = [], False
+        # Parameter names are in scope for the rest of the list, e.g. `int n, int a[n]`
+        self.push()
+        for param in args.params:
+            if isinstance(param, c_ast.EllipsisParam):
+                variadic = True
+                continue
+            t = self.resolve(param.type)
+            if isinstance(t, Array):
+                t = Pointer(t.element)
+            elif isinstance(t, Function):
+                t = Pointer(t)
+            types.append(t)
+            if param.name is not None:
+                if self.symbols.lookup_local(param.name) is not None:
+                    self.error(param, f"redefinition of parameter '{param.name}'")
+                self.symbols.declare(Symbol(param.name, 'parameter', param, True, t))
+        self.pop()
+        return (None if None in types else tuple(types)), variadic
+
+    def tagged(self, node):
+        kind = 'struct' if isinstance(node, c_ast.Struct) else 'union'
+        symbol = self.tags.lookup(node.name) if node.name is not None else None
+        if node.decls is None:
+            if symbol is not None:
+                if symbol.type.kind != kind:
+                    self.error(node, f"'{node.name}' defined as wrong kind of tag")
+                return symbol.type
+            return self.new_tag(kind, node)
+        if symbol is not None and symbol.depth == self.tags.depth and symbol.type.kind == kind \
+                and symbol.type.members is None:
+            t = symbol.type         # the definition of a forward declaration
+            symbol.node = node
+        else:
+            if symbol is not None and symbol.depth == self.tags.depth:
+                self.error(node, f"redefinition of '{kind} {node.name}' (previous at line {symbol.line})")
+            t = self.new_tag(kind, node)
+        members = {}
+        for decl in node.decls:
+            member = self.resolve(decl.type)
+            if decl.bitsize is not None:
+                self.value(decl.bitsize)
+            if decl.name is None:
+                if isinstance(member, Tagged) and member.members:
+                    members.update(member.members)      # anonymous struct or union
+            elif decl.name in members:
+                self.error(decl, f"duplicate member '{decl.name}'")
+            else:
+                members[decl.name] = member
+        t.members = members
+        return t
+
+    def new_tag(self, kind, node):
+        t = Tagged(kind, node.name)
+        if node.name is not None:
+            self.tags.declare(Symbol(node.name, 'tag', node, type=t))
+        return t
+
+    def enum(self, node):
+        if node.values is None:
+            return
+        for enumerator in node.values.enumerators:
+            if enumerator.value is not None:
+                t = self.value(enumerator.value)
+                if t is not None and not t.integer:
+                    self.error(enumerator.value, f"enumerator value for '{enumerator.name}' is not an integer constant")
+            self.declare(enumerator.name, 'enumerator', enumerator, INT, defined=True)
+
+    def value(self, node):
+        """Type of node used as a value: arrays and functions decay to pointers."""
+        t = self.visit(node)
+        if t is VOID:
+            self.error(node, "void value not ignored as it ought to be")
+            return None
+        return None if t is None else decay(t)
+
+    def condition(self, node):
+        t = self.value(node)
+        if t is not None and not t.scalar:
+            self.error(node, f"used '{t}' value where scalar is required")
+
+    def convert(self, target, source, node, context):
+        """Check that a value of type source, the value of node, may be assigned to target.
+
+        context is a message prefix with {t} and {s} in place of the two types.
+        """
+        if target is None or source is None or target is source:
+            return
+        if target.arithmetic and source.arithmetic:
+            return
+        if isinstance(target, Pointer):
+            if isinstance(source, Pointer):
+                if target.target is VOID or source.target is VOID or compatible(target.target, source.target):
+                    return
+                reason = "uses incompatible pointer types"
+            elif source.integer:
+                if is_null(node):
+                    return
+                reason = "makes pointer from integer without a cast"
+            else:
+                reason = "uses incompatible types"
+        elif target is BOOL and isinstance(source, Pointer):
+            return
+        elif target.integer and isinstance(source, Pointer):
+            reason = "makes integer from pointer without a cast"
+        else:
+            reason = "uses incompatible types"
+        self.error(node, f"{context.format(t=target, s=source)} {reason}")
+
+    # --- declarations ---
+    def declare(self, name, kind, node, type=None, defined=False):
+        previous = self.symbols.lookup_local(name)
+        if previous is not None and previous.kind != 'macro':
+            where = f" (previous declaration at line {previous.line})"
+            if previous.kind != kind and {previous.kind, kind} != {'variable', 'parameter'}:
+                self.error(node, f"'{name}' redeclared as a different kind of symbol{where}")
+            elif kind == 'function' or self.symbols.depth == 0:
+                # Prototypes and tentative definitions may repeat; bodies and initializers may not
+                if defined and previous.defined:
+                    self.error(node, f"redefinition of '{name}'{where}")
+                elif type is not None and previous.type is not None:
+                    if compatible(type, previous.type):
+                        type = composite(type, previous.type)
+                    else:
+                        self.error(node, f"conflicting types for '{name}'; have '{type}'{where}")
+                defined = defined or previous.defined
+            elif previous.kind == 'parameter':
+                self.error(node, f"'{name}' redeclared in the body of its function{where}"
+                           if kind == 'variable' else f"redefinition of parameter '{name}'")
+            elif not ('extern' in getattr(node, 'storage', ()) and 'extern' in getattr(previous.node, 'storage', ())):
+                self.error(node, f"redeclaration of '{name}'{where}")
+        self.symbols.declare(Symbol(name, kind, node, defined, type))
+
+    def visit_Decl(self, node):
+        t = self.resolve(node.type)
+        if node.name is None:
+            return
+        if t is VOID:
+            self.error(node, f"variable '{node.name}' declared void")
+            t = None
+        elif (isinstance(t, Tagged) and t.members is None and self.symbols.depth
+              and 'extern' not in node.storage):
+            self.error(node, f"storage size of '{node.name}' isn't known")
+        kind = 'function' if isinstance(node.type, c_ast.FuncDecl) else 'variable'
+        self.declare(node.name, kind, node, t, defined=node.init is not None)
+        if node.init is not None:
+            self.initialize(t, node.init)
+
+    def initialize(self, target, init):
+        if isinstance(init, c_ast.InitList):
+            if isinstance(target, Array):
+                for expr in init.exprs:
+                    self.initialize(target.element, expr)
+            elif isinstance(target, Tagged) and target.members is not None:
+                members = list(target.members.values())
+                for member, expr in zip(members, init.exprs):
+                    self.initialize(member, expr)
+                for expr in init.exprs[len(members):]:
+                    self.error(expr, f"excess elements in {target.kind} initializer")
+                    self.visit(expr)
+            else:
+                for expr in init.exprs:
+                    self.initialize(target if expr is init.exprs[0] else None, expr)
+            return
+        if isinstance(target, Array) and isinstance(init, c_ast.Constant) and init.type == 'string':
+            if not (target.element.integer and target.element.size == 1):
+                self.error(init, f"array of '{target.element}' initialized from a string literal")
+            return
+        source = self.value(init)
+        if isinstance(target, Array):
+            if source is not None:
+                self.error(init, "invalid initializer")
+            return
+        self.convert(target, source, init, "initialization of '{t}' from '{s}'")
+
+    def visit_Typedef(self, node):
+        self.declare(node.name, 'typedef', node, self.resolve(node.type))
+
+    def visit_FuncDef(self, node):
+        self.check_body(node, self.declare_function(node))
+
+    def declare_function(self, node):
+        """Declare the function a FuncDef defines; returns its type."""
+        t = self.resolve(node.decl.type)
+        self.declare(node.decl.name, 'function', node.decl, t, defined=True)
+        return t
+
+    def check_body(self, node, t):
+        decl = node.decl
+        self.function = decl.name
+        self.result = t.result if isinstance(t, Function) else None
+        undeclared = self.undeclared
+        self.labels, self.gotos, self.undeclared = {}, [], set()
+        self.push()
+        args = decl.type.args if isinstance(decl.type, c_ast.FuncDecl) else None
+        params = [p for p in (args.params if args is not None else ()) if isinstance(p, c_ast.Decl)]
+        types = t.params if isinstance(t, Function) and t.params is not None else (None,) * len(params)
+        for param, param_type in zip(params, types):
+            # Duplicates were reported when the parameter list was resolved
+            if param.name is not None:
+                self.symbols.declare(Symbol(param.name, 'parameter', param, True, param_type))
+        for param in node.param_decls or ():
+            self.declare(param.name, 'parameter', param, self.resolve(param.type), defined=True)
+        # The outermost block of the body shares the parameters' scope
+        for item in node.body.block_items:
+            self.visit(item)
+        self.pop()
+        for goto in self.gotos:
+            if goto.name not in self.labels:
+                self.error(goto, f"label '{goto.name}' used but not defined")
+        self.function = self.result = None
+        self.undeclared = undeclared
+
+    # --- statements ---
+    def visit_Compound(self, node):
+        self.push()
+        for item in node.block_items:
+            self.visit(item)
+        self.pop()
+
+    def visit_If(self, node):
+        self.condition(node.cond)
+        self.visit(node.iftrue)
+        if node.iffalse is not None:
+            self.visit(node.iffalse)
+
+    def visit_While(self, node):
+        self.condition(node.cond)
+        self.loops += 1
+        self.visit(node.stmt)
+        self.loops -= 1
+
+    visit_DoWhile = visit_While
+
+    def visit_For(self, node):
+        # Declarations in the for header are local to the loop
+        self.push()
+        if node.init is not None:
+            self.visit(node.init)
+        if node.cond is not None:
+            self.condition(node.cond)
+        if node.next is not None:
+            self.visit(node.next)
+        self.loops += 1
+        self.visit(node.stmt)
+        self.loops -= 1
+        self.pop()
+
+    def visit_Switch(self, node):
+        t = self.value(node.cond)
+        if t is not None and not t.integer:
+            self.error(node.cond, "switch quantity not an integer")
+        self.switches += 1
+        loops, self.loops = self.loops, self.loops      # `continue` still refers to an enclosing loop
+        self.visit(node.stmt)
+        self.loops = loops
+        self.switches -= 1
+
+    def visit_Case(self, node):
+        if not self.switches:
+            self.error(node, "case label not within a switch statement")
+        t = self.value(node.expr)
+        if t is not None and not t.integer:
+            self.error(node.expr, "case label does not reduce to an integer constant")
+        for stmt in node.stmts:
+            self.visit(stmt)
+
+    def visit_Default(self, node):
+        if not self.switches:
+            self.error(node, "'default' label not within a switch statement")
+        self.generic_visit(node)
+
+    def visit_Break(self, node):
+        if not self.loops and not self.switches:
+            self.error(node, "break statement not within loop or switch")
+
+    def visit_Continue(self, node):
+        if not self.loops:
+            self.error(node, "continue statement not within a loop")
+
+    def visit_Label(self, node):
+        previous = self.labels.get(node.name)
+        if previous is not None:
+            self.error(node, f"duplicate label '{node.name}' (previous at line {previous.line})")
+        else:
+            self.labels[node.name] = node
+        if node.stmt is not None:
+            self.visit(node.stmt)
+
+    def visit_Goto(self, node):
+        self.gotos.append(node)
+
+    def visit_Return(self, node):
+        result = self.result
+        if node.expr is None:
+            if result is not None and result is not VOID:
+                self.error(node, "'return' with no value, in function returning non-void")
+        elif result is VOID:
+            if self.visit(node.expr) is not VOID:
+                self.error(node, "'return' with a value, in function returning void")
+        else:
+            self.convert(result, self.value(node.expr), node.expr, "returning '{s}' from a function returning '{t}'")
+
+    # --- expressions ---
+    def is_lvalue(self, node):
+        if isinstance(node, c_ast.ID):
+            symbol = self.symbols.lookup(node.name)
+            return symbol is None or symbol.kind not in ('function', 'enumerator')
+        if isinstance(node, c_ast.UnaryOp):
+            return node.op == '*'
+        return isinstance(node, (c_ast.ArrayRef, c_ast.StructRef))
+
+    def declarator(self, node):
+        """The declarator node that gives lvalue node its type, or None when there is none to go by."""
+        if isinstance(node, c_ast.ID):
+            symbol = self.symbols.lookup(node.name)
+            if symbol is None or symbol.kind not in ('variable', 'parameter') or not isinstance(symbol.node, c_ast.Decl):
+                return None
+            return symbol.node.type
+        if isinstance(node, (c_ast.UnaryOp, c_ast.ArrayRef)):
+            d = self.typedef_target(self.declarator(node.expr if isinstance(node, c_ast.UnaryOp) else node.name))
+            return d.type if isinstance(d, (c_ast.PtrDecl, c_ast.ArrayDecl)) else None
+        if isinstance(node, c_ast.StructRef):
+            d = self.typedef_target(self.declarator(node.name))
+            if node.type == '->':
+                d = self.typedef_target(d.type) if isinstance(d, (c_ast.PtrDecl, c_ast.ArrayDecl)) else None
+            if not isinstance(d, c_ast.TypeDecl) or not isinstance(d.type, (c_ast.Struct, c_ast.Union)):
+                return None
+            definition = d.type
+            if definition.decls is None and definition.name is not None:
+                symbol = self.tags.lookup(definition.name)
+                definition = symbol.node if symbol is not None else definition
+            for decl in definition.decls or ():
+                if decl.name == node.field.name:
+                    return decl.type
+        return None
+
+    def typedef_target(self, d):
+        """d, or the declarator of the typedef that d names."""
+        while isinstance(d, c_ast.TypeDecl) and isinstance(d.type, c_ast.IdentifierType) and len(d.type.names) == 1:
+            symbol = self.symbols.lookup(d.type.names[0])
+            if symbol is None or symbol.kind != 'typedef':
+                break
+            d = symbol.node.type
+        return d
+
+    def is_const(self, d):
+        """Whether declarator d, or the typedef it names, is const-qualified at the top."""
+        if isinstance(d, (c_ast.TypeDecl, c_ast.PtrDecl)) and 'const' in d.quals:
+            return True
+        target = self.typedef_target(d)
+        return target is not d and self.is_const(target)
+
+    def const_lvalue(self, node):
+        """Whether lvalue node is const-qualified, or part of an object that is."""
+        if self.is_const(self.declarator(node)):
+            return True
+        if isinstance(node, c_ast.StructRef) and node.type == '->':
+            d = self.typedef_target(self.declarator(node.name))
+            return isinstance(d, (c_ast.PtrDecl, c_ast.ArrayDecl)) and self.is_const(d.type)
+        if isinstance(node, c_ast.StructRef) or isinstance(node, c_ast.ArrayRef) \
+                and isinstance(self.typedef_target(self.declarator(node.name)), c_ast.ArrayDecl):
+            return self.const_lvalue(node.name)
+        return False
+
+    def read_only(self, node, action):
+        """Report the assignment, increment or decrement (action) of lvalue node if it is const."""
+        if not self.const_lvalue(node):
+            return
+        if isinstance(node, c_ast.ID):
+            self.error(node, f"{action} of read-only {self.symbols.lookup(node.name).kind} '{node.name}'")
+        elif isinstance(node, c_ast.StructRef):
+            self.error(node, f"{action} of read-only member '{node.field.name}'")
+        else:
+            self.error(node, f"{action} of read-only location")
+
+    def visit_ID(self, node):
+        symbol = self.symbols.lookup(node.name)
+        if symbol is not None:
+            return symbol.type
+        if node.name not in self.undeclared:
+            self.undeclared.add(node.name)
+            where = f" in function '{self.function}'" if self.function else ""
+            self.error(node, f"'{node.name}' undeclared{where}")
+        return None
+
+    def visit_Constant(self, node):
+        if node.type == 'string':
+            return STRING
+        if node.type == 'char':
+            return INT      # a character constant has type int in C
+        return from_specifiers(node.type.split())
+
+    def arithmetic(self, op, left, right, node):
+        """Result type of left op right for the arithmetic operators, or None after an error."""
+        if op in ('+', '-'):
+            if left.arithmetic and right.arithmetic:
+                return usual_arithmetic(left, right)
+            if isinstance(left, Pointer) and right.integer:
+                return left
+            if op == '+' and left.integer and isinstance(right, Pointer):
+                return right
+            if op == '-' and isinstance(left, Pointer) and isinstance(right, Pointer) \
+                    and compatible(left.target, right.target):
+                return PTRDIFF_T
+        elif op in INTEGER_OPERATORS:
+            if left.integer and right.integer:
+                return promote(left) if op in ('<<', '>>') else usual_arithmetic(left, right)
+        elif left.arithmetic and right.arithmetic:
+            return usual_arithmetic(left, right)
+        self.error(node, f"invalid operands to binary {op} (have '{left}' and '{right}')")
+        return None
+
+    def visit_BinaryOp(self, node):
+        op = node.op
+        left, right = self.value(node.left), self.value(node.right)
+        if op in ('&&', '||'):
+            for t in (left, right):
+                if t is not None and not t.scalar:
+                    self.error(node, f"invalid operands to binary {op} (have '{left}' and '{right}')")
+                    break
+            return INT
+        if left is None or right is None:
+            return INT if op in COMPARISONS else None
+        if op not in COMPARISONS:
+            return self.arithmetic(op, left, right, node)
+        if left.arithmetic and right.arithmetic:
+            return INT
+        left_pointer, right_pointer = isinstance(left, Pointer), isinstance(right, Pointer)
+        if left_pointer and right_pointer:
+            if not (compatible(left.target, right.target)
+                    or op in ('==', '!=') and (left.target is VOID or right.target is VOID)):
+                self.error(node, f"comparison of distinct pointer types ('{left}' and '{right}')")
+        elif left_pointer and right.integer or right_pointer and left.integer:
+            if not (op in ('==', '!=') and is_null(node.right if left_pointer else node.left)):
+                self.error(node, f"comparison between pointer and integer ('{left}' and '{right}')")
+        else:
+            self.error(node, f"invalid operands to binary {op} (have '{left}' and '{right}')")
+        return INT
+
+    def visit_UnaryOp(self, node):
+        op = node.op
+        if op == 'sizeof':
+            if isinstance(node.expr, c_ast.Typename):
+                t = self.resolve(node.expr.type)
+            else:
+                t = self.visit(node.expr)
+            if isinstance(t, Function) or isinstance(t, Tagged) and t.members is None:
+                self.error(node, f"invalid application of 'sizeof' to {'a function' if isinstance(t, Function) else 'incomplete'} type '{t}'")
+            return SIZE_T
+        if op == '&':
+            t = self.visit(node.expr)
+            if not self.is_lvalue(node.expr):
+                self.error(node, "lvalue required as unary '&' operand")
+                return None
+            return None if t is None else Pointer(t)
+        raw = self.visit(node.expr)
+        t = None if raw is None else decay(raw)
+        if op in ('++', '--', 'p++', 'p--'):
+            action = 'increment' if '+' in op else 'decrement'
+            if not self.is_lvalue(node.expr) or isinstance(raw, Array):
+                self.error(node, f"lvalue required as {action} operand")
+            elif t is not None and not t.scalar:
+                self.error(node, f"wrong type argument to {action}")
+            else:
+                self.read_only(node.expr, action)
+            return t
+        if t is None:
+            return INT if op == '!' else None
+        if op == '*':
+            if not isinstance(t, Pointer):
+                self.error(node, f"invalid type argument of unary '*' (have '{t}')")
+                return None
+            return t.target
+        if op == '!':
+            if not t.scalar:
+                self.error(node, f"wrong type argument to {UNARY_NAMES[op]}")
+            return INT
+        if not (t.integer if op == '~' else t.arithmetic):
+            self.error(node, f"wrong type argument to {UNARY_NAMES[op]}")
+            return None
+        return promote(t)
+
+    def visit_Assignment(self, node):
+        target = self.visit(node.lvalue)
+        source = self.value(node.rvalue)
+        if not self.is_lvalue(node.lvalue):
+            self.error(node, "lvalue required as left operand of assignment")
+            return None
+        if isinstance(target, Array):
+            self.error(node, "assignment to expression with array type")
+            return None
+        self.read_only(node.lvalue, 'assignment')
+        if target is None or source is None:
+            return target
+        if node.op == '=':
+            self.convert(target, source, node.rvalue, "assignment to '{t}' from '{s}'")
+        elif self.arithmetic(node.op[:-1], target, source, node) is PTRDIFF_T and isinstance(target, Pointer):
+            self.error(node, f"invalid operands to binary {node.op[:-1]} (have '{target}' and '{source}')")
+        return target
+
+    def visit_TernaryOp(self, node):
+        self.condition(node.cond)
+        a, b = self.value(node.iftrue), self.visit(node.iffalse)
+        b = None if b is None else decay(b)
+        if a is None or b is None:
+            return None
+        if a is b:
+            return a
+        if a.arithmetic and b.arithmetic:
+            return usual_arithmetic(a, b)
+        if isinstance(a, Pointer) and isinstance(b, Pointer):
+            if compatible(a.target, b.target):
+                return composite(a, b)
+            if a.target is VOID or b.target is VOID:
+                return Pointer(VOID)
+            self.error(node, f"pointer type mismatch in conditional expression ('{a}' and '{b}')")
+            return a
+        if isinstance(a, Pointer) and is_null(node.iffalse):
+            return a
+        if isinstance(b, Pointer) and is_null(node.iftrue):
+            return b
+        self.error(node, f"type mismatch in conditional expression ('{a}' and '{b}')")
+        return None
+
+    def visit_Cast(self, node):
+        t = self.resolve(node.to_type.type)
+        source = self.value(node.expr)
+        if t is None or t is VOID or source is None:
+            return t
+        if not t.scalar:
+            self.error(node, f"conversion to non-scalar type '{t}' requested")
+        elif not source.scalar or (t.floating and isinstance(source, Pointer)) \
+                or (isinstance(t, Pointer) and source.floating):
+            self.error(node, f"cannot convert a value of type '{source}' to '{t}'")
+        return t
+
+    def visit_FuncCall(self, node):
+        arg_nodes = node.args.exprs if node.args is not None else []
+        name = node.name.name if isinstance(node.name, c_ast.ID) else None
+        if name is not None and self.symbols.lookup(name) is None:
+            # Implicitly declared, most likely in a header: nothing to check the call against
+            for arg in arg_nodes:
+                self.value(arg)
+            return None
+        callee = self.value(node.name)
+        args = [self.value(arg) for arg in arg_nodes]
+        if callee is None:
+            return None
+        if not (isinstance(callee, Pointer) and isinstance(callee.target, Function)):
+            self.error(node, "called object is not a function or function pointer")
+            return None
+        function = callee.target
+        what = f"'{name}'" if name else "the function"
+        if function.params is not None:
+            if len(args) < len(function.params):
+                self.error(node, f"too few arguments to function {what}")
+            elif len(args) > len(function.params) and not function.variadic:
+                self.error(node, f"too many arguments to function {what}")
+            for i, (param, arg, arg_node) in enumerate(zip(function.params, args, arg_nodes), 1):
+                self.convert(param, arg, arg_node, f"passing '{{s}}' as argument {i} of {what}, which expects '{{t}}',")
+        return function.result
+
+    def visit_ArrayRef(self, node):
+        base, index = self.value(node.name), self.value(node.subscript)
+        if base is None or index is None:
+            return None
+        if isinstance(base, Pointer) and index.integer:
+            return base.target
+        if base.integer and isinstance(index, Pointer):
+            return index.target
+        if isinstance(base, Pointer) or isinstance(index, Pointer):
+            self.error(node.subscript, "array subscript is not an integer")
+        else:
+            self.error(node, "subscripted value is neither array nor pointer")
+        return None
+
+    def visit_StructRef(self, node):
+        # The field belongs to the struct, not to any scope
+        t = self.visit(node.name)
+        if t is None:
+            return None
+        field = node.field.name
+        if node.type == '->':
+            t = decay(t)
+            if not isinstance(t, Pointer):
+                self.error(node, f"invalid type argument of '->' (have '{t}')")
+                return None
+            t = t.target
+        if not isinstance(t, Tagged):
+            self.error(node, f"request for member '{field}' in something not a structure or union")
+            return None
+        if t.members is None:
+            self.error(node, f"invalid use of incomplete type '{t}'")
+            return None
+        if field not in t.members:
+            self.error(node.field, f"'{t}' has no member named '{field}'")
+            return None
+        return t.members[field]
+
+    def visit_ExprList(self, node):
+        t = None
+        for expr in node.exprs:
+            t = self.visit(expr)
+        return t
+
+
+def check_semantics(code, tree=None):
+    """Semantic diagnostics for C source text or a scanner-engine TokenBuffer of it.
+
+    Pass the FileAST as `tree` when it has already been parsed.
+    """
+    if tree is None:
+        tree, _ = parse_with_errors(code)
+    source = code.source if isinstance(code, TokenBuffer) else code
+    return SemanticChecker(DEFINE_RE.findall(source)).check(tree)
+
+
+def statement_starts(tokens):
+    """Source offsets where each top-level declaration or function definition begins."""
+    tokens.flush()
+    source = tokens.source
+    skip = (KIND_CODES['COMMENT'], KIND_CODES['DIRECTIVE'])
+    punctuation = (KIND_CODES['DELIMITER'], KIND_CODES['OPERATOR'])
+    starts = []
+    depth, body, ended, previous = 0, False, True, ''
+    for kind, start in zip(tokens.kinds, tokens.starts):
+        if kind in skip:
+            continue
+        if ended:
+            starts.append(start)
+            ended = False
+        if kind not in punctuation:
+            previous = ''
+            continue
+        char = source[start]
+        if char == '{':
+            if not depth:
+                body = previous == ')'
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            ended = not depth and body
+        elif char == ';':
+            ended = not depth
+        previous = char
+    return starts
+
+
+# Messages about a function body only refer to lines of the same body
+LINE_REFERENCE_RE = re.compile(r'(?<=at line )\d+')
+
+
+def _moved(diagnostic, shift):
+    """diagnostic as it reads after its function moved by `shift` lines."""
+    message = LINE_REFERENCE_RE.sub(lambda m: str(int(m.group()) + shift), diagnostic.message)
+    return Diagnostic(diagnostic.line + shift, diagnostic.column, message)
+
+
+class _TrackingTable(SymbolTable):
+    """A SymbolTable that notes the file-scope names looked up and declared."""
+
+    def __init__(self):
+        super().__init__()
+        self.used = set()       # names found at file scope, or not found at all
+        self.declared = []      # names declared at file scope
+
+    def declare(self, symbol):
+        if len(self._scopes) == 1:
+            self.used.add(symbol.name)      # a redeclaration depends on the previous one
+            self.declared.append(symbol.name)
+        return super().declare(symbol)
+
+    def lookup(self, name):
+        symbol = super().lookup(name)
+        if symbol is None or symbol.depth == 0:
+            self.used.add(name)
+        return symbol
+
+    def reset(self):
+        self.used.clear()
+        self.declared.clear()
+
+
+class _TrackingChecker(SemanticChecker):
+    table = _TrackingTable
+
+
+class IncrementalChecker:
+    """check_semantics() for a text under edit, re-checking only what an edit can affect.
+
+    File-scope declarations and function signatures are checked on every
+    update; they rebuild the scope the bodies see and are cheap. Each
+    function body's diagnostics are kept, with the version of every
+    file-scope name the body used, and are reused as long as the body's
+    text is unchanged and none of those names was declared differently.
+    Every identifier in the body counts as used, since which names are
+    typedefs decides how the body parses, and a part that fails to parse
+    looks nothing up. A version changes with the text of the declaration and, transitively,
+    with the versions of the names that declaration itself used.
+    """
+
+    def __init__(self):
+        self._bodies = {}       # (text, column) -> (line, diagnostics, dependencies) of a function
+        self._macros = None
+        self.checked = self.reused = 0      # function bodies in the last update
+
+    def update(self, code, tree=None):
+        """Diagnostics for C source text or a scanner-engine TokenBuffer of it, like check_semantics()."""
+        tokens = code if isinstance(code, TokenBuffer) else TokenBuffer.from_source(code, scanner_spans)
+        if tree is None:
+            tree, _ = parse_with_errors(tokens)
+        source = tokens.source
+        macros = DEFINE_RE.findall(source)
+        if macros != self._macros:
+            self._bodies, self._macros = {}, macros
+        checker = _TrackingChecker(macros)
+        symbols, tags = checker.symbols, checker.tags
+        versions = {}           # ('' or 'tag', name) -> version of its visible file-scope declaration
+        starts = statement_starts(tokens)
+        kinds, identifier = tokens.kinds, KIND_CODES['IDENTIFIER']
+        bodies = {}
+        self.checked = self.reused = 0
+
+        def offset(node):
+            return tokens.line_start(node.line) + node.column - 1
+
+        def dependencies(begin=None, end=None):
+            deps = {('', name): versions.get(('', name)) for name in symbols.used}
+            deps.update((('tag', name), versions.get(('tag', name))) for name in tags.used)
+            if begin is not None:
+                # What parses depends on which names are typedefs, even the names of what failed to
+                for i in range(tokens.index_at(begin), tokens.index_at(end)):
+                    if kinds[i] == identifier:
+                        name = tokens.text(i)
+                        deps[('', name)] = versions.get(('', name))
+            return deps
+
+        for node in tree.ext:
+            i = bisect_right(starts, offset(node)) - 1
+            begin = starts[i] if i >= 0 else 0
+            end = starts[i + 1] if i + 1 < len(starts) else len(source)
+            symbols.reset()
+            tags.reset()
+            if isinstance(node, c_ast.FuncDef):
+                t = checker.declare_function(node)
+                declaration = source[begin:offset(node.body)]
+            else:
+                checker.visit(node)
+                declaration = source[begin:end]
+            version = hash((declaration, frozenset(dependencies().items())))
+            versions.update((('', name), version) for name in symbols.declared)
+            versions.update((('tag', name), version) for name in tags.declared)
+            if not isinstance(node, c_ast.FuncDef):
+                continue
+
+            key = (source[begin:end], begin - tokens.line_start(tokens.line_at(begin)))
+            line = tokens.line_at(begin)
+            cached = self._bodies.get(key)
+            if cached is not None and all(versions.get(name) == v for name, v in cached[2].items()):
+                shift = line - cached[0]
+                diagnostics = [_moved(d, shift) for d in cached[1]] if shift else cached[1]
+                checker.diagnostics.extend(diagnostics)
+                bodies[key] = (line, diagnostics, cached[2])
+                self.reused += 1
+                continue
+            mark = len(checker.diagnostics)
+            checker.check_body(node, t)
+            bodies[key] = (line, checker.diagnostics[mark:], dependencies(begin, end))
+            self.checked += 1
+        self._bodies = bodies
+        return checker.diagnostics
+
+
+# Pause in typing after which live diagnostics are brought up to date
+LIVE_DELAY_MS = 300
+
 
 class SemanticAnalyzerGUI:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("Mini Compiler - Semantic Analyzer")
         self.is_dark_mode = False
+        self.checker = IncrementalChecker()
+        self.live = False
+        self.pending = None
 
         # Define color themes correctly
         self.colors = {
@@ -45,6 +962,8 @@ class SemanticAnalyzerGUI:
         self.code_label.pack(anchor="w")
         self.code_input = scrolledtext.ScrolledText(self.main_frame, height=12, wrap=tk.WORD, font=("Consolas", 11))
         self.code_input.pack(fill=tk.BOTH, expand=True)
+        self.code_input.insert(tk.END, self.session.source)
+        self.code_input.bind("<<Modified>>", self.on_modified)
 
         # Analyze button
         self.analyze_btn = tk.Button(self.main_frame, text="Analyze Semantics", command=self.analyze)
@@ -91,8 +1010,7 @@ class SemanticAnalyzerGUI:
         )
         if file_path:
             try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
+                content = self.session.load(file_path)
                 self.code_input.delete("1.0", tk.END)
                 self.code_input.insert(tk.END, content)
                 self.output_box.config(state=tk.NORMAL)
@@ -108,40 +1026,14 @@ class SemanticAnalyzerGUI:
         self.output_box.config(state=tk.DISABLED)
 
     def analyze(self):
-        code = self.code_input.get("1.0", tk.END)
-        lines = code.strip().split('\n')
-        declared_vars = {}
-        errors = []
-
-        for i, line in enumerate(lines, 1):
-            # Remove inline comments
-            line = re.sub(r'//.*', '', line).strip()
-            if not line:
-                continue
-
-            # Variable declaration (int, float, char) with optional initialization
-            match_decl = re.match(r'^(int|float|char)\s+(\w+)\s*=?\s*(.*);', line)
-            if match_decl:
-                var_type, var_name, value = match_decl.groups()
-                if var_name in declared_vars:
-                    errors.append(f"[Line {i}] Variable '{var_name}' already declared.")
-                else:
-                    declared_vars[var_name] = var_type
-                    # Simple type check: int cannot be assigned string
-                    if value:
-                        if var_type == "int" and re.search(r'["\']', value):
-                            errors.append(f"[Line {i}] Type mismatch: cannot assign string to int '{var_name}'.")
-                continue
-
-            # Variable assignment: var = value;
-            match_assign = re.match(r'^(\w+)\s*=\s*(.*);', line)
-            if match_assign:
-                var_name, value = match_assign.groups()
-                if var_name not in declared_vars:
-                    errors.append(f"[Line {i}] Variable '{var_name}' used without declaration.")
-                else:
-                    if declared_vars[var_name] == "int" and re.search(r'["\']', value):
-                        errors.append(f"[Line {i}] Type mismatch: assigning string to int '{var_name}'.")
+        # After the first analysis, keep the diagnostics live while typing
+        self.live = True
+        self.pending = None
+        self.session.set_source(self.code_input.get("1.0", "end-1c"))
+        tree, syntax_errors = self.session.parsed()
+        errors = [f"Syntax: {e}" for e in syntax_errors]
+        errors += map(str, self.checker.update(self.session.tokens(), tree))
+        checked, total = self.checker.checked, self.checker.checked + self.checker.reused
 
         # Show results in output box
         self.output_box.config(state=tk.NORMAL)
@@ -150,8 +1042,17 @@ class SemanticAnalyzerGUI:
             self.output_box.insert(tk.END, "❌ Semantic Errors Found:\n" + "\n".join(errors))
         else:
             self.output_box.insert(tk.END, "✅ No semantic errors found.")
+        self.output_box.insert(tk.END, f"\n\n({checked} of {total} function bodies re-checked)")
         self.output_box.config(state=tk.DISABLED)
 
+    def on_modified(self, event=None):
+        if self.code_input.edit_modified():
+            self.code_input.edit_modified(False)
+            if self.live:
+                if self.pending is not None:
+                    self.root.after_cancel(self.pending)
+                self.pending = self.root.after(LIVE_DELAY_MS, self.analyze)
+
     def add_hover_effect(self, widget):
         def on_enter(e):
             widget['bg'] = "#5ab1ff"  # lighter blue on hover
@@ -0,0 +1,47 @@
+"""The C source the phase windows work on, with its tokens and parse cached.
+
+One Session is shared by every window the launcher opens: a file loaded in
+one phase shows up in the next, and tokens and the AST are only rebuilt
+after the text has actually changed. Token streams are IncrementalLexers,
+so small edits re-lex just the changed region.
+"""
+from cparser import parse_with_errors
+from token_buffer import IncrementalLexer
+
+
+class Session:
+    def __init__(self, source="", path=None):
+        self.source = source
+        self.path = path
+        self._lexers = {}       # engine -> IncrementalLexer
+        self._parsed = None     # (FileAST, diagnostics) for the current source
+
+    def load(self, path):
+        with open(path, 'r') as f:
+            source = f.read()
+        self.set_source(source, path)
+        return source
+
+    def set_source(self, source, path=None):
+        """Replace the text; returns False if nothing changed."""
+        if path is not None:
+            self.path = path
+        if source == self.source:
+            return False
+        self.source = source
+        self._parsed = None
+        return True
+
+    def tokens(self, engine='scanner'):
+        lexer = self._lexers.get(engine)
+        if lexer is None:
+            lexer = self._lexers[engine] = IncrementalLexer(self.source, engine)
+        elif lexer.source is not self.source and lexer.source != self.source:
+            lexer.update(self.source)
+        return lexer
+
+    def parsed(self):
+        """(FileAST, diagnostics) for the current source."""
+        if self._parsed is None:
+            self._parsed = parse_with_errors(self.tokens())
+        return self._parsed
@@ -0,0 +1,279 @@
+"""Static single assignment form for ir.Function.
+
+    tree = to_ssa(function)         # function.body is now in SSA form
+    tree.cfg.blocks                 # its blocks, tree the dominator tree
+
+Each variable that lives in a register (Function.is_register) and is
+assigned in more than one place gets a new name for every assignment:
+x.1, x.2 and so on, which no C identifier can clash with. The bare name
+stands for the value on entry, a parameter's argument. A name assigned
+once, like most temporaries, keeps its name.
+
+Phis are placed on the iterated dominance frontier of each variable's
+assignments (Cytron et al.), which gives the minimal set of joins.
+Variables that are never used outside the block that assigns them need
+no joins at all and get none (the "semi-pruned" form of Briggs et al.).
+Renaming is one walk down the dominator tree. Every step is linear in
+the size of the function except the frontiers, which are as large as
+the joins they describe.
+
+from_ssa(function) turns the phis back into copies and the versions back
+into plain names, so that the body prints as TAC generate_code reads.
+"""
+from cfg import CFG, DominatorTree
+from dataflow import Liveness
+from ir import JUMPS, Instr, Phi
+
+
+def to_ssa(function):
+    """Rewrite function.body in SSA form; returns the DominatorTree of its CFG."""
+    graph = CFG(function)
+    graph.label_blocks()
+    tree = DominatorTree(graph)
+    blocks = tree.order
+    is_register = function.is_register
+
+    # Where each register variable is assigned, and which are read in a block that has not assigned them
+    sites = {}
+    assignments = dict.fromkeys(function.params, 1)     # the call assigns the parameters
+    live_in = set()
+    for block in blocks:
+        assigned = set()
+        for instr in block.instrs:
+            for name in instr.uses():
+                if name not in assigned:
+                    live_in.add(name)
+            name = instr.defines()
+            if name is not None and is_register(name):
+                assigned.add(name)
+                sites.setdefault(name, []).append(block)
+                assignments[name] = assignments.get(name, 0) + 1
+
+    frontier = tree.frontiers()
+    phis = {}                       # block -> [(Phi, variable), ...]
+    for name, where in sites.items():
+        if name not in live_in:
+            continue
+        placed = set()
+        work = list(set(where))
+        defined = set(work)
+        while work:
+            for join in frontier[work.pop()]:
+                if join in placed:
+                    continue
+                placed.add(join)
+                phi = Phi(name, [name] * len(join.preds), [pred.label for pred in join.preds])
+                phis.setdefault(join, []).append((phi, name))
+                if join not in defined:
+                    defined.add(join)
+                    work.append(join)
+    for block, joins in phis.items():
+        start = block.body()
+        block.instrs[start:start] = [phi for phi, _ in joins]
+
+    renamed = {name for joins in phis.values() for _, name in joins}
+    renamed.update(name for name, count in assignments.items() if count > 1 and name in sites)
+    _rename(function, tree, phis, renamed)
+    function.body = graph.instructions()
+    return tree
+
+
+def _rename(function, tree, phis, renamed):
+    stacks = {name: [name] for name in renamed}     # current name of each variable, innermost last
+    versions = dict.fromkeys(renamed, 0)
+    temps, floating = function.temps, function.floating
+    stack = [(tree.order[0], None)]
+    while stack:
+        block, pushed = stack.pop()
+        if pushed is not None:
+            # Leaving block: its names go out of scope
+            for name in pushed:
+                stacks[name].pop()
+            continue
+        pushed = []
+        for instr in block.instrs:
+            if instr.op != 'phi':
+                mapping = {name: stacks[name][-1] for name in instr.uses() if name in stacks}
+                if mapping:
+                    instr.replace_uses(mapping)
+            name = instr.defines()
+            if name in stacks:
+                versions[name] += 1
+                new = instr.dest = f"{name}.{versions[name]}"
+                stacks[name].append(new)
+                pushed.append(name)
+                (temps if name in temps else function.locals).add(new)
+                if name in floating:
+                    floating.add(new)
+        for succ in block.succs:
+            joins = phis.get(succ)
+            if joins:
+                i = succ.preds.index(block)
+                for phi, name in joins:
+                    phi.args[i] = stacks[name][-1]
+        stack.append((block, pushed))
+        stack.extend((child, None) for child in reversed(tree.children[block]))
+
+
+def from_ssa(function, graph=None):
+    """Replace the phis of an SSA function.body by copies, and give its versions names TAC can spell.
+
+    graph is the CFG to_ssa returned the tree of, if instructions have
+    only been dropped from its blocks since: a block left empty must stay
+    a block of its own, or the copies its phi arguments need lose their
+    place.
+
+    The versions of a variable go back to its own name unless two of them
+    are live at once, as when an optimization has made a later use read
+    an earlier version; those keep a name each. A phi then becomes copies
+    at the ends of its predecessors, done as one parallel copy per
+    predecessor. Where such a copy could overwrite a value that another
+    successor of the predecessor still reads, the predecessors copy into
+    a fresh name that the join copies from instead (Sreedhar et al.'s
+    method I). Phis whose value nothing needs, which semi-pruned form
+    places, and labels no jump refers to, such as those to_ssa gave the
+    blocks, are dropped.
+    """
+    graph = graph or CFG(function)
+    _drop_unused_phis(graph)
+    live = Liveness(graph)
+    bit = live.bit
+    taken = set(function.params) | function.locals | function.temps
+    for instr in graph.instructions():
+        taken.update(instr.uses())
+        if instr.defines() is not None:
+            taken.add(instr.defines())
+    versions = {}                   # variable -> mask of it and its versions
+    for name in taken:
+        if '.' in name:
+            variable = name.rpartition('.')[0]
+            versions[variable] = versions.get(variable, 0) | bit.get(name, 0) | bit.get(variable, 0)
+
+    # A variable whose versions are ever live at the same time cannot go back to one name
+    clash = set()
+    for block in graph.blocks:
+        after = live.live_out[block.index]
+        local = {}                  # variable -> versions without a bit read later in the block
+        for instr in reversed(block.instrs):
+            name = instr.defines()
+            if name is not None and '.' in name:
+                variable = name.rpartition('.')[0]
+                mask = bit.get(name, 0)
+                if after & versions[variable] & ~mask or local.get(variable, set()) - {name}:
+                    clash.add(variable)
+                after &= ~mask
+                local.get(variable, set()).discard(name)
+            if instr.op == 'phi':
+                continue
+            for used in instr.uses():
+                if used in bit:
+                    after |= bit[used]
+                elif '.' in used or used in versions:
+                    local.setdefault(used.rpartition('.')[0] or used, set()).add(used)
+
+    def fresh(name, like):
+        base, _, n = name.rpartition('.')
+        base, n = (base, int(n)) if base else (name, 1)
+        while f"{base}_{n}" in taken:
+            n += 1
+        new = f"{base}_{n}"
+        taken.add(new)
+        (function.temps if like in function.temps else function.locals).add(new)
+        if like in function.floating:
+            function.floating.add(new)
+        return new
+
+    renames = {}
+    for name in sorted(taken):
+        if '.' in name:
+            variable = name.rpartition('.')[0]
+            renames[name] = fresh(name, name) if variable in clash else variable
+
+    def spelled(operand):
+        return renames.get(operand, operand) if isinstance(operand, str) else operand
+
+    def web(name):
+        """Mask of what a copy to the (SSA) name would overwrite."""
+        variable = name.rpartition('.')[0]
+        return bit.get(name, 0) if not variable or variable in clash else versions[variable]
+
+    by_label = graph.by_label()
+    ends = {}                       # block -> [(dest, source)] to copy in parallel at its end
+    for block in graph.blocks:
+        start = block.body()
+        phis = [instr for instr in block.instrs[start:] if instr.op == 'phi']
+        if not phis:
+            continue
+        preds = [by_label[label] for label in phis[0].labels]
+        entry = []
+        for phi in phis:
+            target = spelled(phi.dest)
+            clobbers = web(phi.dest)
+            for pred, arg in zip(preds, phi.args):
+                if spelled(arg) == target:
+                    continue            # no copy at all, so nothing to overwrite
+                last = pred.instrs[-1]
+                if last.op in JUMPS and target in map(spelled, last.uses()) or any(
+                        succ is not block and live.live_in[succ.index] & clobbers for succ in pred.succs):
+                    fresh_name = fresh(phi.dest, phi.dest)
+                    entry.append(Instr('copy', target, [fresh_name]))
+                    target = fresh_name
+                    break
+            for pred, arg in zip(preds, phi.args):
+                ends.setdefault(pred, []).append((target, spelled(arg)))
+        block.instrs[start:start + len(phis)] = entry
+    for block, copies in ends.items():
+        at = len(block.instrs) - 1 if block.instrs[-1].op in JUMPS else len(block.instrs)
+        block.instrs[at:at] = [Instr('copy', dest, [source]) for dest, source in _sequential(copies, fresh)]
+
+    body = graph.instructions()
+    targets = {instr.args[-1] for instr in body if instr.op in JUMPS}
+    body = [instr for instr in body if instr.op != 'label' or instr.args[0] in targets]
+    for instr in body:
+        instr.replace_uses(renames)
+        if instr.dest in renames:
+            instr.dest = renames[instr.dest]
+    for names in (function.temps, function.locals, function.floating):
+        names.difference_update(renames)
+    function.body = [instr for instr in body if not (instr.op == 'copy' and instr.dest == instr.args[0])]
+
+
+def _drop_unused_phis(graph):
+    phis = {}
+    used = set()
+    for block in graph.blocks:
+        for instr in block.instrs:
+            if instr.op == 'phi':
+                phis[instr.dest] = instr
+            else:
+                used.update(instr.uses())
+    # A phi is needed if an instruction reads it, or a needed phi does
+    work = [name for name in used if name in phis]
+    needed = set(work)
+    while work:
+        for arg in phis[work.pop()].args:
+            if arg in phis and arg not in needed:
+                needed.add(arg)
+                work.append(arg)
+    if len(needed) < len(phis):
+        for block in graph.blocks:
+            block.instrs = [instr for instr in block.instrs if instr.op != 'phi' or instr.dest in needed]
+
+
+def _sequential(copies, fresh):
+    """The (dest, source) copies, all made at once, as copies made one after another."""
+    pending = [(dest, source) for dest, source in copies if dest != source]
+    result = []
+    while pending:
+        read = {source for _, source in pending if isinstance(source, str)}
+        ready = [copy for copy in pending if copy[0] not in read]
+        if ready:
+            result.extend(ready)
+            pending = [copy for copy in pending if copy[0] in read]
+        else:
+            # A cycle, such as swapping two names: save one of them first
+            dest = pending[0][0]
+            saved = fresh(dest, dest)
+            result.append((saved, dest))
+            pending = [(d, saved if s == dest else s) for d, s in pending]
+    return result
@@ -0,0 +1,86 @@
+"""Block-structured symbol table for the semantic checker.
+
+Every name maps to the stack of symbols it currently denotes, innermost
+last, so finding the visible declaration is one dict lookup however deep
+the nesting. Each scope only lists the names it declared, so leaving a
+scope costs in proportion to those. Names are interned: most come from
+the lexer interned already, and equal names then share one key object.
+"""
+import sys
+
+
+class Symbol:
+    """kind is 'variable', 'parameter', 'function', 'typedef', 'enumerator', 'macro' or 'tag'."""
+
+    __slots__ = ('name', 'kind', 'node', 'type', 'depth', 'line', 'column', 'defined')
+
+    def __init__(self, name, kind, node=None, defined=False, type=None):
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.type = type            # a c_types type, None when unknown (macros)
+        self.depth = 0
+        self.line = node.line if node is not None else 0
+        self.column = node.column if node is not None else 0
+        self.defined = defined      # has a body or an initializer
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.kind!r}, depth={self.depth})"
+
+
+class SymbolTable:
+    def __init__(self):
+        self._symbols = {}          # name -> [Symbol, ...], innermost last
+        self._scopes = [[]]         # names declared in each open scope; [0] is file scope
+
+    @property
+    def depth(self):
+        """0 at file scope, one more for each open block."""
+        return len(self._scopes) - 1
+
+    def push(self):
+        self._scopes.append([])
+
+    def pop(self):
+        symbols = self._symbols
+        for name in self._scopes.pop():
+            stack = symbols[name]
+            stack.pop()
+            if not stack:
+                del symbols[name]
+
+    def declare(self, symbol):
+        """Add symbol to the innermost scope.
+
+        Returns the symbol it replaces in that same scope, if any; the
+        caller decides whether that is an error and the new one stays.
+        """
+        name = symbol.name = sys.intern(symbol.name)
+        symbol.depth = depth = len(self._scopes) - 1
+        stack = self._symbols.get(name)
+        if stack is None:
+            self._symbols[name] = [symbol]
+            self._scopes[-1].append(name)
+            return None
+        if stack[-1].depth == depth:
+            previous = stack[-1]
+            stack[-1] = symbol
+            return previous
+        stack.append(symbol)
+        self._scopes[-1].append(name)
+        return None
+
+    def lookup(self, name):
+        """The visible symbol for name, or None."""
+        stack = self._symbols.get(name)
+        return stack[-1] if stack else None
+
+    def lookup_local(self, name):
+        """The symbol for name declared in the innermost scope, or None."""
+        stack = self._symbols.get(name)
+        if stack and stack[-1].depth == len(self._scopes) - 1:
+            return stack[-1]
+        return None
+
+    def __contains__(self, name):
+        return name in self._symbols
@@ -3,18 +3,21 @@ from tkinter import filedialog, scrolledtext, messagebox
 import subprocess
 import os
 import time
+from session import Session
 
 class ModernCCompilerGUI:
-    def __init__(self, root):
+    def __init__(self, root, session=None):
         self.root = root
+        self.session = session or Session()
         self.root.title("🛠️ Mini C Compiler & Runner")
         self.root.geometry("900x700")
         self.root.resizable(False, False)
         self.dark_mode = False
 
-        self.file_path = ""
+        self.file_path = self.session.path or ""
         self.setup_ui()
         self.set_light_mode()
+        self.code_editor.insert(tk.END, self.session.source)
 
     def setup_ui(self):
         # --- Header Frame ---
@@ -53,8 +56,7 @@ class ModernCCompilerGUI:
     def load_file(self):
         self.file_path = filedialog.askopenfilename(filetypes=[("C Files", "*.c")])
         if self.file_path:
-            with open(self.file_path, 'r') as file:
-                code = file.read()
+            code = self.session.load(self.file_path)
             self.code_editor.delete(1.0, tk.END)
             self.code_editor.insert(tk.END, code)
 
@@ -0,0 +1,98 @@
+"""A small interpreter for ir.Program, so that tests can compare what a program computes before and after a pass.
+
+Values are Python ints wrapped to 32 bits, as int arithmetic in C on the
+targets gcc is run on. Names that are not a function's locals, parameters
+or temporaries are file-scope variables; arrays are dicts from index to
+value, and a call to a function the program does not define returns 0.
+"""
+from ir import Const, Mem
+
+
+def wrap(value):
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value >> 31 else value
+
+
+def _divide(a, b):
+    quotient = abs(a) // abs(b)
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+BINARY = {
+    '+': lambda a, b: wrap(a + b), '-': lambda a, b: wrap(a - b), '*': lambda a, b: wrap(a * b),
+    '/': lambda a, b: wrap(_divide(a, b)), '%': lambda a, b: wrap(a - b * _divide(a, b)),
+    '<<': lambda a, b: wrap(a << b), '>>': lambda a, b: a >> b,
+    '&': lambda a, b: a & b, '|': lambda a, b: a | b, '^': lambda a, b: a ^ b,
+    '==': lambda a, b: int(a == b), '!=': lambda a, b: int(a != b), '<': lambda a, b: int(a < b),
+    '<=': lambda a, b: int(a <= b), '>': lambda a, b: int(a > b), '>=': lambda a, b: int(a >= b),
+}
+UNARY = {'neg': lambda a: wrap(-a), 'not': lambda a: int(not a), 'compl': lambda a: ~a}
+
+
+class Machine:
+    def __init__(self, program, limit=1_000_000):
+        self.functions = {function.name: function for function in program.functions}
+        self.memory = {}        # file-scope name -> value, or dict of index -> value for an array
+        self.steps = 0
+        self.limit = limit
+        self.execute(program.globals, {}, lambda name: False)
+
+    def call(self, name, args=()):
+        function = self.functions.get(name)
+        if function is None:
+            return 0
+        frame = dict(zip(function.params, args))
+        local = set(function.params) | function.locals | function.temps
+        return self.execute(function.body, frame, local.__contains__)
+
+    def execute(self, body, frame, is_local):
+        def place(name):
+            return frame if is_local(name) else self.memory
+
+        def read(operand):
+            if isinstance(operand, Const):
+                return operand.value
+            if isinstance(operand, Mem):
+                return place(operand.base)[operand.base].get(read(operand.index), 0)
+            return place(operand).get(operand, 0)
+
+        def write(dest, value):
+            if isinstance(dest, Mem):
+                place(dest.base).setdefault(dest.base, {})[read(dest.index)] = value
+            else:
+                place(dest)[dest] = value
+
+        labels = {instr.args[0]: i for i, instr in enumerate(body) if instr.op == 'label'}
+        pc = 0
+        while pc < len(body):
+            self.steps += 1
+            assert self.steps < self.limit, "too many steps"
+            instr = body[pc]
+            pc += 1
+            op, args = instr.op, instr.args
+            if op == 'label':
+                continue
+            if op == 'goto':
+                pc = labels[args[0]]
+            elif op in ('if', 'ifFalse'):
+                if bool(read(args[0])) == (op == 'if'):
+                    pc = labels[args[1]]
+            elif op == 'return':
+                return read(args[0]) if args else None
+            elif op == 'copy':
+                write(instr.dest, read(args[0]))
+            elif op == 'call':
+                write(instr.dest, self.call(args[0], [read(arg) for arg in args[1:]]))
+            elif op in BINARY:
+                write(instr.dest, BINARY[op](read(args[0]), read(args[1])))
+            else:
+                write(instr.dest, UNARY[op](read(args[0])))
+        return None
+
+
+def run(program, *calls):
+    """What main returns, or for each (name, args) of calls in turn, what that call returns."""
+    machine = Machine(program)
+    if not calls:
+        return machine.call('main')
+    return [machine.call(name, args) for name, args in calls]
@@ -0,0 +1,48 @@
+from code_generation import allocate_program, allocate_registers, generate_code, symbol_table
+from cparser import parse_with_errors
+from ir import lower
+
+SOURCE = """
+int h(int v) { int k = v * 2; return k + 1; }
+int f(int n) {
+    int total = 0, i = 0, x = n + 1;
+    while (i < n) { total = total + h(i); i = i + 1; }
+    return total + x;
+}
+"""
+
+
+def program():
+    tree, errors = parse_with_errors(SOURCE)
+    assert not errors
+    return lower(tree)
+
+
+def test_values_live_across_a_call_stay_in_memory():
+    f = program().functions[1]
+    allocation = allocate_registers(f)
+    assert not {'total', 'i', 'x'} & set(allocation)
+    assert allocation           # the temporaries between calls still get registers
+
+
+def test_no_register_is_read_after_a_call_it_was_set_before():
+    p = program()
+    lines = generate_code(p.tac(), allocate_program(p))
+    written = set()
+    for line in lines:
+        op, _, operand = line.partition(' ')
+        if op == 'CALL':
+            written.clear()
+        elif op == 'STORE' and operand.startswith('R'):
+            written.add(operand)
+        elif op in ('LOAD', 'ADD', 'PUSH') and operand.startswith('R'):
+            assert operand in written, line
+
+
+def test_symbol_table_comes_from_the_shared_ast():
+    source = "struct P { int x, y; };\nint f(void) { int b[4]; struct P p; char *s; return 0; }\n"
+    tree, _ = parse_with_errors(source)
+    table = symbol_table(tree, source)
+    assert list(table) == ['f', 'b', 'p', 's']
+    assert table['b'] == {'type': 'int [4]', 'size': '16 bytes', 'dimension': '4', 'address': 'memory[2]'}
+    assert table['p']['size'] == '8 bytes' and table['s']['type'] == 'char *'
@@ -0,0 +1,58 @@
+import pytest
+
+from const_fold import fold_constants
+from cparser import parse_with_errors
+from ir import Const, lower
+
+
+def lowered(source):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return lower(tree, fold_constants(tree).constants).functions[-1].body
+
+
+def folded(expression):
+    """The value `return expression;` returns, or None if it is left to run time."""
+    body = lowered(f"long f(void) {{ return {expression}; }}")
+    result = body[-1].args[0]
+    return result.value if len(body) == 1 and isinstance(result, Const) else None
+
+
+@pytest.mark.parametrize('expression, value', [
+    ('2147483647 + 1', -2147483648),
+    ('0x7fffffff * 2', -2),
+    ('4294967295u + 1', 0),
+    ('(long)2147483647 + 1', 2147483648),
+    ('(unsigned char)300', 44),
+    ('(short)65535', -1),
+    ("'a' + 1", 98),
+    ('-1 < 0u', 0),
+    ('-1 >> 1', -1),
+    ('(unsigned)-1 >> 1', 2147483647),
+])
+def test_integer_results_wrap_to_their_type(expression, value):
+    assert folded(expression) == value
+
+
+@pytest.mark.parametrize('expression, value', [
+    ('-7 / 2', -3),
+    ('7 / -2', -3),
+    ('-7 % 2', -1),
+    ('5 % -3', 2),
+])
+def test_division_truncates_toward_zero(expression, value):
+    assert folded(expression) == value
+
+
+@pytest.mark.parametrize('expression', ['1 / 0', '1 % 0', '1 << 32', '1 << -1'])
+def test_undefined_operations_are_left_to_run_time(expression):
+    assert folded(expression) is None
+
+
+def test_value_agreed_on_by_both_branches_survives_the_join():
+    assert str(lowered("int f(int c) { int x = 3; if (c) x = 4; else x = 4; return x * 2; }")[-1]) == "return 8"
+
+
+def test_loop_forgets_what_it_assigns():
+    body = lowered("int f(int c) { int x = 3; while (c) { x = x + 1; c = c - 1; } return x; }")
+    assert str(body[-1]) == "return x"
@@ -0,0 +1,83 @@
+from cfg import CFG
+from cparser import parse_with_errors
+from dataflow import AvailableExpressions, Liveness, ReachingDefinitions
+from interpret import Machine, run
+from ir import Const, lower
+from optimization import PassManager
+
+
+def function(source, name='f'):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return next(f for f in lower(tree).functions if f.name == name)
+
+
+def available_at_return(source):
+    graph = CFG(function(source))
+    available = AvailableExpressions(graph)
+    block = next(b for b in graph.blocks if b.instrs[-1].op == 'return')
+    return available.members(available.avail_in[block.index])
+
+
+GLOBAL_PLUS_ONE = ('+', ('g', Const(1)))
+
+
+def test_expression_stays_available_across_a_branch():
+    assert GLOBAL_PLUS_ONE in available_at_return(
+        "int g;\nint f(int c) { int x = g + 1; if (c) x = 0; return x + (g + 1); }")
+
+
+def test_call_kills_expressions_that_read_memory():
+    # h may change g, so g + 1 has to be computed again after the call
+    assert GLOBAL_PLUS_ONE not in available_at_return(
+        "int g;\nvoid h(void) { g = 5; }\n"
+        "int f(int c) { int x = g + 1; h(); if (c) x = 0; return x + (g + 1); }")
+
+
+def optimized(source, order):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    program = lower(tree)
+    PassManager(order).run(program)
+    return program
+
+
+def test_dead_stores_keeps_statics_globals_and_calls():
+    source = """
+int g;
+int h(void) { g = g + 1; return g; }
+int counter(void) { static int n; n = n + 1; return 0; }
+int main(void) { int unused = h(); g = 7; counter(); counter(); return 0; }
+"""
+    program = optimized(source, ['dead_stores'])
+    counter, main = program.functions[1:]
+    assert [str(instr) for instr in counter.body[:2]] == ['t2 = n_2 + 1', 'n_2 = t2']
+    assert 'g = 7' in map(str, main.body) and sum(instr.op == 'call' for instr in main.body) == 3
+    assert 'unused' not in ' '.join(map(str, main.body))
+    machine = Machine(program)
+    machine.call('main')
+    assert machine.memory == {'g': 7, 'n_2': 2}
+
+
+def test_dead_stores_removes_overwritten_values_only():
+    source = "int f(int c) { int x = 1, y = 2; x = 3; while (c) { y = y + x; c = c - 1; } return y; }"
+    f = optimized(source, ['dead_stores']).functions[0]
+    assert [str(instr) for instr in f.body[:2]] == ['y = 2', 'x = 3']
+    assert run(optimized(source, ['dead_stores']), ('f', (4,))) == [14]
+
+
+def test_liveness_around_a_loop():
+    f = function("int f(int n) { int s = 0, i = 0; while (i < n) { s = s + i; i = i + 1; } return s; }")
+    graph = CFG(f)
+    live = Liveness(graph)
+    header = graph.blocks[1]
+    assert set(live.members(live.live_in[header.index])) == {'s', 'i', 'n'}
+    assert set(live.members(live.live_out[graph.blocks[-1].index])) == set()
+
+
+def test_both_definitions_reach_the_join():
+    f = function("int f(int c) { int x = 1; if (c) x = 2; return x; }")
+    graph = CFG(f)
+    reaching = ReachingDefinitions(graph)
+    join = graph.blocks[-1]
+    assert sorted(str(instr) for instr in reaching.members(reaching.reach_in[join.index])) == ['x = 1', 'x = 2']
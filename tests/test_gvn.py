@@ -0,0 +1,73 @@
+import pytest
+
+from cparser import parse_with_errors
+from gvn import value_numbering
+from interpret import run
+from ir import lower
+from optimization import DEFAULT_ORDER, PassManager
+from test_ssa import LOOPS
+
+
+def program(source):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return lower(tree)
+
+
+def numbered(source, *calls):
+    """(Eliminated of the last function, and what calls return before and after value numbering)."""
+    p = program(source)
+    before = run(p, *calls)
+    for f in p.functions:
+        removed = value_numbering(f)
+    return removed, before, run(p, *calls)
+
+
+def test_computation_repeated_on_every_path_is_reused():
+    removed, before, after = numbered(
+        "int f(int a, int b, int c) { int x = a * b, y; if (c) y = a * b + 1; else y = b * a - 1; return x + y; }",
+        ('f', (3, 4, 1)), ('f', (3, 4, 0)))
+    assert removed.computations == 2 and before == after == [25, 23]
+
+
+def test_computation_on_one_path_only_is_not_reused():
+    removed, before, after = numbered(
+        "int f(int a, int c) { int x = 0; if (c) x = a + 1; return x + (a + 1); }", ('f', (2, 1)), ('f', (2, 0)))
+    assert removed.computations == 0 and before == after == [6, 3]
+
+
+def test_repeated_load_of_a_global_is_reused_until_a_store():
+    source = "int g = 5;\nint f(int c) { int x = g, y, z; if (c) y = g; else y = 1; g = 2; z = g; return x + y + z; }"
+    removed, before, after = numbered(source, ('f', (1,)), ('f', (0,)))
+    assert removed.loads == 1 and before == after == [12, 5]
+
+
+def test_call_may_change_globals():
+    source = "int g = 5;\nvoid h(void) { g = g * 2; }\nint f(void) { int x = g + 1; h(); return x + (g + 1); }"
+    removed, before, after = numbered(source, ('f', ()), ('f', ()))
+    assert removed.computations == removed.loads == 0 and before == after == [17, 32]
+
+
+def test_static_local_is_not_folded_to_its_initial_value():
+    source = "int twice(void) { static int c = 0; c = c + 1; return c; }"
+    p = program(source)
+    PassManager(DEFAULT_ORDER).run(p)
+    assert run(p, ('twice', ()), ('twice', ()), ('twice', ())) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('name', sorted(LOOPS))
+def test_loops_survive_value_numbering_and_leaving_ssa(name):
+    source, args, expected = LOOPS[name]
+    p = program(source)
+    PassManager(DEFAULT_ORDER).run(p)
+    assert run(p, ('f', args)) == [expected]
+    assert not any(instr.op == 'phi' for instr in p.functions[0].body)
+
+
+def test_swap_through_copies_keeps_both_values():
+    # Folding the copies leaves phis that swap a and b: leaving SSA needs a temporary for the cycle
+    source = "int f(int n) { int a = 1, b = 2, t; while (n) { t = a; a = b; b = t; n = n - 1; } return a * 10 + b; }"
+    p = program(source)
+    removed = value_numbering(p.functions[0])
+    assert removed.copies >= 1
+    assert run(p, ('f', (0,)), ('f', (1,)), ('f', (2,))) == [12, 21, 12]
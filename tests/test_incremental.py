@@ -0,0 +1,20 @@
+from sementic import IncrementalChecker, check_semantics
+
+BODY = "int f(void) { T x = 1; return 0; }\n"
+
+
+def test_edit_reuses_unaffected_bodies():
+    checker = IncrementalChecker()
+    checker.update("int g;\nint h(void) { return g; }\n" + BODY)
+    checker.update("int g;\nint h(void) { return g + 1; }\n" + BODY)
+    assert (checker.checked, checker.reused) == (1, 1)
+
+
+def test_body_that_failed_to_parse_is_rechecked_after_typedef_appears():
+    checker = IncrementalChecker()
+    assert checker.update("int g;\n" + BODY) == []
+    source = "typedef double *T;\n" + BODY
+    assert [d.message for d in checker.update(source)] == [
+        "initialization of 'double *' from 'int' makes pointer from integer without a cast"]
+    assert checker.checked == 1
+    assert checker.update(source) == check_semantics(source)
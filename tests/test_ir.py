@@ -0,0 +1,44 @@
+from cparser import parse_with_errors
+from interpret import run
+from ir import Mem, lower
+
+
+def lowered(source):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return lower(tree)
+
+
+def test_unnamed_declarations():
+    program = lowered("int f(int);\nstruct S { int a; };\nenum { A, B };\n"
+                      "int main(void) { struct S s; s.a = f(B); return s.a; }\n")
+    assert [f.name for f in program.functions] == ['main']
+
+
+STATICS = """
+int n = 100;
+int counter(void) { static int n; n = n + 1; return n; }
+int twice(void) { static int c = 10; c = c + 1; return c; }
+int shadow(int k) { int n = k; { extern int n; n = n + k; } return n; }
+int global(void) { return n; }
+"""
+
+
+def test_static_locals_keep_their_value_between_calls():
+    program = lowered(STATICS)
+    assert run(program, ('counter', ()), ('counter', ()), ('twice', ()), ('twice', ())) == [1, 2, 11, 12]
+    counter = program.functions[0]
+    assert not counter.locals and all(counter.is_register(name) for name in counter.temps)
+    assert [str(instr) for instr in program.globals] == ['n = 100', 'c_2 = 10']
+
+
+def test_extern_local_is_the_file_scope_variable():
+    assert run(lowered(STATICS), ('shadow', (5,)), ('global', ())) == [5, 105]
+
+
+def test_partial_initializer_zeroes_the_other_elements():
+    program = lowered("int g[3] = {1};\n"
+                      "int f(void) { int a[4] = {7}; static int s[2] = {5}; return a[3] + s[1] + g[2]; }\n")
+    assert [str(instr) for instr in program.globals] == ['g[0] = 1', 's_2[0] = 5']
+    stores = [str(instr) for instr in program.functions[0].body if isinstance(instr.dest, Mem)]
+    assert stores == ['a[0] = 7', 'a[1] = 0', 'a[2] = 0', 'a[3] = 0']
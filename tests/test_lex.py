@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from lex import lex_split, split_points
+from lexical_gui import analyze_code
+from tokenizer import ENGINES
+
+# Comments, strings and char literals that run over line ends, so that a
+# cut, which always starts a line, can fall inside each of them
+BLOCK = ("int a{i} = {i};{pad}/* comment {i}\n"
+         "still inside \"no string\" 'q' {pad}\n"
+         "*/ char c{i} = {pad}'\\\n"
+         "'; char *s{i} = \"line one \\\n"
+         "line two /* no comment */ 'x' \\\n"
+         "\"; x = y / {i}; // done{pad}\n")
+
+
+def generated(blocks, seed=0):
+    rng = random.Random(seed)
+    return ''.join(BLOCK.format(i=i, pad=' ' * rng.randrange(40)) for i in range(blocks))
+
+
+def kinds_cut(source, points, engine):
+    """Kinds of the tokens that a cut point falls strictly inside of."""
+    cuts = set(points[1:-1])
+    return {kind for kind, start, end in ENGINES[engine](source) if any(start < p < end for p in cuts)}
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('parts', [1, 3, 16])
+def test_split_lexing_equals_whole_file_lexing(tmp_path, engine, parts):
+    source = generated(300, seed=parts)
+    path = tmp_path / 'big.c'
+    path.write_text(source)
+    if parts == 16:
+        assert {'COMMENT', 'STRING', 'CHAR'} <= kinds_cut(source, split_points(str(path), parts), engine)
+    assert list(lex_split(str(path), parts, engine)) == analyze_code(source, engine)
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_cut_inside_an_unterminated_comment(tmp_path, engine):
+    source = generated(40) + "/* never closed\n" + "int z;\n" * 200
+    path = tmp_path / 'open.c'
+    path.write_text(source)
+    assert list(lex_split(str(path), 8, engine)) == analyze_code(source, engine)
@@ -0,0 +1,90 @@
+import pytest
+
+from cparser import parse_with_errors
+from interpret import run
+from ir import Const, Function, Instr, lower
+from optimization import PASSES, PassManager
+
+PROGRAM = """
+int g;
+int bump(void) { g = g + 1; return g; }
+int main(void) {
+    int a = 7 / 2, b = a * 1, c = b * 0, d = 0 + c, i = 0, s = 0;
+    a = a;
+    while (i < 10) { s = s + i * 1; i = i + 1; }
+    int x = g;
+    bump();
+    return s + x * 100 + g * 1000 + a + b + c + d;
+}
+"""
+
+
+def lowered(source=PROGRAM):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return lower(tree)
+
+
+def function(*instrs, floating=()):
+    f = Function('f')
+    f.body = list(instrs)
+    f.temps = {'t1', 't2', 't3'}
+    f.locals = {'x', 'y'}
+    f.floating = set(floating)
+    return f
+
+
+def lines(f):
+    return [str(instr) for instr in f.body]
+
+
+@pytest.mark.parametrize('name', ['fold', 'identity', 'mul_zero', 'self_assign', 'copy_prop', 'dead_temps'])
+def test_pass_keeps_what_the_program_computes(name):
+    expected = run(lowered())
+    program = lowered()
+    PassManager([name]).run(program)
+    assert run(program) == expected == 1051
+
+
+def test_passes_reach_a_fixed_point():
+    program = lowered()
+    before = program.instructions()
+    manager = PassManager(['fold', 'identity', 'mul_zero', 'self_assign', 'copy_prop', 'dead_temps'])
+    manager.run(program)
+    assert manager.rounds < manager.max_rounds
+    assert program.instructions() < before
+    assert run(program) == 1051
+
+
+def test_fold_uses_c_arithmetic():
+    f = function(Instr('/', 't1', [Const(-7), Const(2)]), Instr('+', 't2', [Const(2147483647), Const(1)]))
+    assert PASSES['fold'](f) == 2
+    assert lines(f) == ['t1 = -3', 't2 = -2147483648']
+
+
+def test_floating_operands_keep_their_identities():
+    f = function(Instr('+', 't1', ['x', Const(0)]), Instr('*', 't2', ['x', Const(0)]), floating={'x'})
+    assert PASSES['identity'](f) == 0
+    assert PASSES['mul_zero'](f) == 0
+    f = function(Instr('+', 't1', ['x', Const(0)]), Instr('*', 't2', ['x', Const(0)]))
+    assert PASSES['identity'](f) == PASSES['mul_zero'](f) == 1
+    assert lines(f) == ['t1 = x', 't2 = 0']
+
+
+def test_copy_of_a_variable_is_propagated_until_the_variable_changes():
+    f = function(Instr('copy', 't1', ['x']), Instr('+', 't2', ['t1', Const(2)]),
+                 Instr('copy', 'x', [Const(1)]), Instr('+', 't3', ['t1', Const(2)]))
+    PASSES['copy_prop'](f)
+    assert lines(f)[1::2] == ['t2 = x + 2', 't3 = t1 + 2']
+
+
+def test_dead_temps_keeps_calls():
+    f = function(Instr('call', 't1', ['h']), Instr('copy', 't2', [Const(1)]), Instr('return', None, [Const(0)]))
+    assert PASSES['dead_temps'](f) == 1
+    assert lines(f) == ['t1 = call h, 0', 'return 0']
+
+
+def test_unknown_pass_is_rejected():
+    with pytest.raises(ValueError, match="unknown optimization pass"):
+        PassManager(['fold', 'nope'])
+
@@ -0,0 +1,53 @@
+import ast_nodes as c_ast
+from cparser import MAX_ERRORS, Diagnostic, parse_with_errors
+
+
+def names(tree):
+    return [(node.decl if isinstance(node, c_ast.FuncDef) else node).name for node in tree.ext]
+
+
+def test_every_error_is_reported_at_its_position():
+    tree, diagnostics = parse_with_errors(
+        "int f(void) {\n    int x = 1\n    int y = 2;\n    return x + ;\n}\nint g(void) { return 0; }\n")
+    assert diagnostics == [
+        Diagnostic(2, 14, "expected ';' before 'int'"),
+        Diagnostic(4, 16, "expected an expression before ';'"),
+    ]
+    assert names(tree) == ['f', 'g']
+    assert [item.name for item in tree.ext[0].body.block_items] == ['x', 'y']
+
+
+def test_declarations_resume_after_the_semicolon():
+    tree, diagnostics = parse_with_errors("int a = ;\nint b = 2;\nint c = (3;\nint d = 4;\n")
+    assert diagnostics == [
+        Diagnostic(1, 9, "expected an expression before ';'"),
+        Diagnostic(3, 11, "expected ')' before ';'"),
+    ]
+    assert names(tree) == ['b', 'd']
+
+
+def test_statements_resume_after_the_closing_brace():
+    tree, diagnostics = parse_with_errors(
+        "int f(void) {\n    { a = 1 +; b = 2; }\n    while (1) { a = (1; }\n    c = 3;\n}\nint h(void) { return 1; }\n")
+    assert diagnostics == [
+        Diagnostic(2, 14, "expected an expression before ';'"),
+        Diagnostic(3, 23, "expected ')' before ';'"),
+    ]
+    block, loop, assignment = tree.ext[0].body.block_items
+    assert [item.lvalue.name for item in block.block_items] == ['b']
+    assert isinstance(loop, c_ast.While) and loop.stmt.block_items == []
+    assert assignment.lvalue.name == 'c'
+    assert names(tree) == ['f', 'h']
+
+
+def test_one_error_per_function_when_each_breaks_differently():
+    tree, diagnostics = parse_with_errors("int f(void) { x = = 1; }\nint g(void) { y = ) ; }\n")
+    assert [(d.line, d.column) for d in diagnostics] == [(1, 19), (2, 19)]
+    assert names(tree) == ['f', 'g']
+
+
+def test_max_errors_truncates_the_list():
+    source = "int x = ;\n" * 20
+    diagnostics = parse_with_errors(source, max_errors=5)[1]
+    assert [(d.line, d.column) for d in diagnostics] == [(line, 9) for line in range(1, 6)]
+    assert len(parse_with_errors(source)[1]) == 20 < MAX_ERRORS
@@ -0,0 +1,30 @@
+from sementic import check_semantics
+
+
+def messages(source):
+    return [d.message for d in check_semantics(source)]
+
+
+def test_assignment_to_const_variable():
+    assert messages("int main(void) { const int x = 1; x = 2; return x; }") == [
+        "assignment of read-only variable 'x'"]
+
+
+def test_increment_and_decrement_of_const():
+    assert messages("typedef const int C;\n"
+                    "int f(const int p) { C y = 1; p++; --y; return p + y; }") == [
+        "increment of read-only parameter 'p'", "decrement of read-only variable 'y'"]
+
+
+def test_const_through_pointers_and_members():
+    source = """
+struct S { const int m; int n; };
+void f(int * const q, const int *r, const struct S *s, struct S t) {
+    const int a[2] = {1, 2};
+    q = 0; *q = 1; *r = 1; r = 0; a[0] = 3; s->n = 1; t.m = 1; t.n = 1;
+}
+"""
+    assert messages(source) == [
+        "assignment of read-only parameter 'q'", "assignment of read-only location",
+        "assignment of read-only location", "assignment of read-only member 'n'",
+        "assignment of read-only member 'm'"]
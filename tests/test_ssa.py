@@ -0,0 +1,70 @@
+import pytest
+
+from cfg import CFG, DominatorTree
+from cparser import parse_with_errors
+from interpret import run
+from ir import lower
+from ssa import from_ssa, to_ssa
+
+LOOPS = {
+    'sum': ("int f(int n) { int s = 0, i = 0; while (i < n) { s = s + i; i = i + 1; } return s; }", (10,), 45),
+    'gcd': ("int f(int a, int b) { while (b) { int t = a % b; a = b; b = t; } return a; }", (84, 36), 12),
+    'swap': ("int f(int n) { int a = 1, b = 2, t; while (n) { t = a; a = b; b = t; n = n - 1; } return a * 10 + b; }",
+             (3,), 21),
+    'nested': ("int f(int n) { int s = 0, i, j; for (i = 0; i < n; i++) { if (i == 2) continue;"
+               " for (j = 0; j < i; j++) { if (j == 3) break; s = s + j; } } return s; }", (6,), 9),
+    'do': ("int f(int n) { int k = 0; do { k = k + 2; n = n - 1; } while (n > 0); return k; }", (0,), 2),
+}
+
+
+def program(source):
+    tree, errors = parse_with_errors(source)
+    assert not errors
+    return lower(tree)
+
+
+def test_dominators_of_a_branch():
+    f = program("int f(int c) { int x; if (c) x = 1; else x = 2; return x; }").functions[0]
+    graph = CFG(f)
+    tree = DominatorTree(graph)
+    entry, then, other, join = graph.blocks
+    assert tree.parent[join] is entry and tree.parent[then] is tree.parent[other] is entry
+    assert tree.dominates(entry, join) and not tree.dominates(then, join)
+    assert tree.frontiers()[then] == [join] and tree.frontiers()[entry] == []
+
+
+def test_unreachable_code_is_left_out():
+    f = program("int f(void) { return 1; int dead = 2; return dead; }").functions[0]
+    assert len(CFG(f).blocks) == 1
+
+
+def test_phis_go_to_the_loop_header():
+    f = program(LOOPS['sum'][0]).functions[0]
+    tree = to_ssa(f)
+    header = next(block for block in tree.order if any(instr.op == 'phi' for instr in block.instrs))
+    phis = [instr for instr in header.instrs if instr.op == 'phi']
+    assert sorted(phi.dest.split('.')[0] for phi in phis) == ['i', 's']
+    for phi in phis:
+        assert phi.labels == [pred.label for pred in header.preds] and len(phi.args) == 2
+    assert len(header.preds) == 2 and tree.dominates(header, header.preds[1])
+    defined = [instr.dest for instr in f.body if instr.defines() is not None]
+    assert len(defined) == len(set(defined))
+
+
+def test_variable_used_only_where_it_is_assigned_gets_no_phi():
+    f = program("int f(int n) { int t, s = 0; while (n) { t = n * 2; s = s + t; n = n - 1; } return s; }").functions[0]
+    to_ssa(f)
+    assert sorted(instr.dest.split('.')[0] for instr in f.body if instr.op == 'phi') == ['n', 's']
+
+
+@pytest.mark.parametrize('name', sorted(LOOPS))
+def test_round_trip_keeps_what_loops_compute(name):
+    source, args, expected = LOOPS[name]
+    p = program(source)
+    f = p.functions[0]
+    before = len(f.body)
+    tree = to_ssa(f)
+    from_ssa(f, tree.cfg)
+    assert not any(instr.op == 'phi' or '.' in str(instr.dest) for instr in f.body)
+    assert run(p, ('f', args)) == [expected]
+    assert len(f.body) <= before + 1
@@ -0,0 +1,124 @@
+import csv
+import io
+import random
+
+import pytest
+
+from lexical_gui import analyze_code
+from token_buffer import IncrementalLexer, TokenBuffer
+from token_dump import TokenDump, write_dump
+from tokenizer import ENGINES, regex_spans, scanner_spans
+
+SOURCE = """#include <stdio.h>
+/* a comment
+   over two lines */
+int main(void) {
+    char *s = "a \\"quoted\\" string"; // trailing comment
+    int count = 42, x = 'c';
+    while (count >= 10 && x != 0) count = count - 1;
+    return count;
+}
+"""
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_buffer_iterates_like_analyze_code(engine):
+    tokens = TokenBuffer.from_source(SOURCE, ENGINES[engine])
+    assert list(tokens) == analyze_code(SOURCE, engine)
+    assert [tokens[i] for i in range(len(tokens))] == list(tokens)
+    assert sum(tokens.counts().values()) == len(tokens)
+
+
+def test_names_are_interned_and_positions_are_one_based():
+    tokens = TokenBuffer.from_source(SOURCE)
+    names = [i for i in range(len(tokens)) if tokens.text(i) == 'count']
+    assert len(names) == 5 and len({id(tokens.text(i)) for i in names}) == 1
+    assert tokens.position(names[0]) == (6, 9)
+    main = next(i for i in range(len(tokens)) if tokens.text(i) == 'main')
+    assert tokens.position(main) == (4, 5) and tokens.line_at(tokens.span(main)[0]) == 4
+
+
+def test_csv_reads_back_as_the_tokens():
+    tokens = TokenBuffer.from_source(SOURCE)
+    f = io.StringIO()
+    tokens.write_csv(f)
+    f.seek(0)
+    assert [tuple(row) for row in csv.reader(f)] == [("Token Type", "Token Value")] + list(tokens)
+
+
+# Tokens both engines spell the same way: the regex engine splits ++, ->
+# or 0x1F differently, and has no DIRECTIVE kind
+COMMON = ['int', 'while', 'return', 'x', 'count_2', '_tmp', '0', '42', '3.25', '+', '-', '*', '/', '%',
+          '=', '==', '!=', '<', '<=', '>', '>=', '!', '&&', '||', ';', ',', '(', ')', '[', ']', '{', '}',
+          '"text"', '"esc \\" \\\\"', "'a'", "'\\n'", '/* block\n comment */', '// line comment\n']
+SPACES = [' ', '  ', '\n', '\t', ' \n ']
+
+
+def random_source(rng, n):
+    return ''.join(rng.choice(COMMON) + rng.choice(SPACES) for _ in range(n))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_scanner_equals_regex_on_their_common_tokens(seed):
+    source = random_source(random.Random(seed), 2000)
+    assert list(scanner_spans(source)) == list(regex_spans(source))
+
+
+def test_scanner_takes_the_longest_operator():
+    source = "a++ + b->c <<= ~d & e | f ^ g"
+    assert [source[s:e] for kind, s, e in scanner_spans(source) if kind == 'OPERATOR'] == \
+        ['++', '+', '->', '<<=', '~', '&', '|', '^']
+
+
+# Edits that open or close comments, literals and lines, so that one change can reach far ahead
+SNIPPETS = ['', 'x', ' ', '\n', '"', "'", '/*', '*/', '//', '\\', '+', '=', '12', 'int y;', '#define N 2\n']
+
+
+def spans(tokens):
+    return [(tokens.kind(i),) + tokens.span(i) for i in range(len(tokens))]
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_lexer_after_random_edits_equals_a_fresh_lex(engine, seed):
+    rng = random.Random(seed)
+    source = random_source(rng, 300)
+    lexer = IncrementalLexer(source, engine)
+    for step in range(300):
+        start = rng.randrange(len(source) + 1)
+        end = min(len(source), start + rng.choice((0, 0, 1, 3, 20)))
+        text = rng.choice(SNIPPETS)
+        if step % 2:
+            lexer.edit(start, end, text)
+            source = source[:start] + text + source[end:]
+        else:
+            source = source[:start] + text + source[end:]
+            lexer.update(source)
+        assert lexer.source == source
+        assert spans(lexer) == spans(TokenBuffer.from_source(source, ENGINES[engine])), step
+    assert list(lexer) == analyze_code(source, engine)
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_dump_reads_back_what_was_written(tmp_path, engine):
+    source = SOURCE + "char *u = \"\u00e9t\u00e9\"; int COMMENT;\n"
+    tokens = IncrementalLexer(source, engine)
+    tokens.edit(0, 0, "int first;\n")
+    path = tmp_path / 'tokens.bin'
+    write_dump(path, tokens)
+    with TokenDump(path) as dump:
+        assert len(dump) == len(tokens)
+        assert list(dump) == list(tokens)
+        assert [dump[i] for i in range(len(dump))] == list(tokens)
+        assert [dump.position(i) for i in range(len(dump))] == [tokens.position(i) for i in range(len(tokens))]
+        assert [dump.offset(i) for i in range(len(dump))] == [tokens.span(i)[0] for i in range(len(tokens))]
+        assert dump[-1] == tokens[len(tokens) - 1]
+        with pytest.raises(IndexError):
+            dump[len(dump)]
+
+
+def test_dump_rejects_other_files(tmp_path):
+    path = tmp_path / 'tokens.csv'
+    path.write_bytes(b'Token Type,Token Value\r\n' * 4)
+    with pytest.raises(ValueError):
+        TokenDump(path)
@@ -0,0 +1,100 @@
+import io
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import ast_nodes as c_ast
+from cparser import parse_with_errors
+from tree_layout import layout, write_dot, write_svg
+
+
+class Tree:
+    def __init__(self, children=()):
+        self.children = list(children)
+
+
+def random_tree(rng, nodes):
+    root = Tree()
+    everything = [root]
+    for _ in range(nodes - 1):
+        parent = rng.choice(everything[-20:] if rng.random() < 0.7 else everything)
+        child = Tree()
+        parent.children.append(child)
+        everything.append(child)
+    return root
+
+
+def small_ast():
+    tree, errors = parse_with_errors("int f(int n) { int s = 0; while (n) { s = s + n; n = n - 1; } return s; }\n")
+    assert not errors
+    return tree
+
+
+def check(positions, children):
+    levels = {}
+    for node, (x, depth) in positions.items():
+        levels.setdefault(depth, []).append(x)
+        kids = list(children(node))
+        if kids and kids[0] in positions:
+            assert [positions[kid][1] for kid in kids] == [depth + 1] * len(kids)
+            assert x == pytest.approx((positions[kids[0]][0] + positions[kids[-1]][0]) / 2)
+            xs = [positions[kid][0] for kid in kids]
+            assert xs == sorted(xs)
+    # No two nodes on a level closer than the sibling distance, subtrees included
+    for xs in levels.values():
+        xs.sort()
+        assert all(b - a >= 1 - 1e-9 for a, b in zip(xs, xs[1:]))
+    assert min(x for x, _ in positions.values()) == 0
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_trees_are_tidy(seed):
+    root = random_tree(random.Random(seed), 400)
+    check(layout(root, lambda node: node.children), lambda node: node.children)
+
+
+def test_ast_is_tidy_and_folds():
+    tree = small_ast()
+    positions = layout(tree)
+    assert len(positions) == sum(1 for _ in c_ast.walk(tree))
+    check(positions, list)
+    body = tree.ext[0].body
+    folded = layout(tree, collapsed={body})
+    assert body in folded and not any(node in folded for node in body)
+    check(folded, lambda node: [] if node is body else list(node))
+    assert max(depth for _, depth in layout(tree, max_depth=2).values()) == 2
+
+
+def test_deep_chain_needs_no_recursion():
+    root = node = Tree()
+    for _ in range(5000):
+        child = Tree()
+        node.children.append(child)
+        node = child
+    positions = layout(root, lambda node: node.children)
+    assert positions[node] == (0, 5000)
+
+
+def test_dot_has_a_node_and_an_edge_per_ast_node():
+    tree = small_ast()
+    f = io.StringIO()
+    write_dot(f, tree)
+    lines = f.getvalue().splitlines()
+    count = sum(1 for _ in c_ast.walk(tree))
+    assert lines[1] == 'digraph {' and lines[-1] == '}'
+    assert sum('[label=' in line for line in lines) == count
+    assert sum(' -> ' in line for line in lines) == count - 1
+
+
+def test_svg_draws_a_box_per_shown_node():
+    tree = small_ast()
+    f = io.StringIO()
+    write_svg(f, tree, max_depth=3)
+    svg = ET.fromstring(f.getvalue())
+    ns = '{http://www.w3.org/2000/svg}'
+    shown = layout(tree, max_depth=3)
+    assert len(svg.findall(f'.//{ns}rect')) == len(shown)
+    assert len(svg.findall(f'.//{ns}line')) == len(shown) - 1
+    titles = [title.text for title in svg.iter(f'{ns}title')]
+    assert {'FileAST', 'FuncDef', 'Decl: f'} <= set(titles)
@@ -0,0 +1,251 @@
+import csv
+import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+from tokenizer import ENGINES, KIND_CODES, KIND_NAMES, LOOKAHEAD, OPEN_TOKEN_CHECKS, regex_spans
+
+_NAME_KINDS = frozenset((KIND_CODES['IDENTIFIER'], KIND_CODES['KEYWORD']))
+
+
+class TokenBuffer:
+    """Columnar token store: one kind code and one (start, end) pair per token.
+
+    Token text is never stored; it is sliced out of ``source`` when asked for,
+    and identifier/keyword text is interned so repeated names share one object.
+    Iterating yields the same ``(kind, value)`` tuples as ``analyze_code``.
+    """
+
+    __slots__ = ('source', 'kinds', 'starts', 'ends', '_line_starts')
+
+    def __init__(self, source, kinds=None, starts=None, ends=None):
+        self.source = source
+        self.kinds = kinds if kinds is not None else array('B')
+        self.starts = starts if starts is not None else array('I')
+        self.ends = ends if ends is not None else array('I')
+        self._line_starts = None
+
+    @classmethod
+    def from_source(cls, source, spans=regex_spans):
+        buf = cls(source)
+        add_kind, add_start, add_end = buf.kinds.append, buf.starts.append, buf.ends.append
+        codes = KIND_CODES
+        for kind, start, end in spans(source):
+            add_kind(codes[kind])
+            add_start(start)
+            add_end(end)
+        return buf
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        return KIND_NAMES[self.kinds[i]], self.text(i)
+
+    def __iter__(self):
+        source, names, intern = self.source, KIND_NAMES, sys.intern
+        for code, start, end in zip(self.kinds, self.starts, self.ends):
+            value = source[start:end]
+            yield names[code], intern(value) if code in _NAME_KINDS else value
+
+    def flush(self):
+        """Make kinds/starts/ends exact; only editable subclasses defer work."""
+
+    def kind(self, i):
+        return KIND_NAMES[self.kinds[i]]
+
+    def text(self, i):
+        start, end = self.span(i)
+        value = self.source[start:end]
+        return sys.intern(value) if self.kinds[i] in _NAME_KINDS else value
+
+    def span(self, i):
+        return self.starts[i], self.ends[i]
+
+    def _lines(self):
+        if self._line_starts is None:
+            line_starts = array('I', [0])
+            find, source, pos = self.source.find, self.source, 0
+            while True:
+                pos = find('\n', pos) + 1
+                if not pos:
+                    break
+                line_starts.append(pos)
+            self._line_starts = line_starts
+        return self._line_starts
+
+    def position(self, i):
+        """Return the 1-based (line, column) where token i starts."""
+        offset = self.span(i)[0]
+        line_starts = self._lines()
+        line = bisect_right(line_starts, offset)
+        return line, offset - line_starts[line - 1] + 1
+
+    def line_at(self, offset):
+        """1-based number of the line containing a source offset."""
+        return bisect_right(self._lines(), offset)
+
+    def line_start(self, line):
+        """Source offset where a 1-based line starts; past the last line, the end of the text."""
+        line_starts = self._lines()
+        return line_starts[line - 1] if line <= len(line_starts) else len(self.source)
+
+    def index_at(self, offset):
+        """Index of the first token ending after offset."""
+        return bisect_right(self.ends, offset)
+
+    def counts(self):
+        """Return {kind: number of tokens} for the kinds that occur."""
+        return {KIND_NAMES[code]: n for code, n in sorted(Counter(self.kinds).items())}
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in (self.kinds, self.starts, self.ends))
+
+    def write_csv(self, f):
+        writer = csv.writer(f)
+        writer.writerow(["Token Type", "Token Value"])
+        writer.writerows(self)
+
+
+def _common_prefix(a, b, block=4096):
+    n = min(len(a), len(b))
+    i = 0
+    while i + block <= n and a[i:i + block] == b[i:i + block]:
+        i += block
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _common_suffix(a, b, limit, block=4096):
+    i = 0
+    while i + block <= limit and a[len(a) - i - block:len(a) - i] == b[len(b) - i - block:len(b) - i]:
+        i += block
+    while i < limit and a[len(a) - i - 1] == b[len(b) - i - 1]:
+        i += 1
+    return i
+
+
+class IncrementalLexer(TokenBuffer):
+    """A TokenBuffer kept up to date under edits by re-lexing only near them.
+
+    An edit is re-lexed from the last token it cannot affect until the new
+    token stream lines up with the old one again. Tokens from ``_gap``
+    onwards store their offsets as distances from the end of the source,
+    which edits before them do not change; only the tokens between two
+    successive edit sites are ever rewritten, so typing in one place stays
+    cheap however large the file is.
+    """
+
+    __slots__ = ('engine', '_spans', '_is_open', '_open', '_gap')
+
+    def __init__(self, source='', engine='regex'):
+        built = TokenBuffer.from_source(source, ENGINES[engine])
+        super().__init__(source, built.kinds, built.starts, built.ends)
+        self.engine = engine
+        self._spans = ENGINES[engine]
+        self._is_open = OPEN_TOKEN_CHECKS[engine]
+        self._gap = len(self.kinds)
+        # Starts of tokens that depend on the rest of the input (see tokenizer.regex_open)
+        self._open = []
+        if self._is_open:
+            self._open = [start for kind, start, _ in self._spans(source)
+                          if self._is_open(kind, source, start)]
+
+    def span(self, i):
+        if i < 0:
+            i += len(self.kinds)
+        if i >= self._gap:
+            size = len(self.source)
+            return size - self.starts[i], size - self.ends[i]
+        return self.starts[i], self.ends[i]
+
+    def __iter__(self):
+        self.flush()
+        return super().__iter__()
+
+    def flush(self):
+        """Store every offset exactly, e.g. before handing the columns out."""
+        self._move_gap(len(self.kinds))
+
+    def _move_gap(self, k):
+        gap, size = self._gap, len(self.source)
+        lo, hi = min(gap, k), max(gap, k)
+        if lo < hi:
+            self.starts[lo:hi] = array('I', [size - s for s in self.starts[lo:hi]])
+            self.ends[lo:hi] = array('I', [size - e for e in self.ends[lo:hi]])
+        self._gap = k
+
+    def index_at(self, offset):
+        """Index of the first token ending after offset."""
+        lo, hi = 0, len(self.kinds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.span(mid)[1] <= offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def update(self, source):
+        """Bring the tokens in line with a new version of the whole text."""
+        old = self.source
+        start = _common_prefix(old, source)
+        tail = _common_suffix(old, source, min(len(old), len(source)) - start)
+        return self.edit(start, len(old) - tail, source[start:len(source) - tail], source)
+
+    def edit(self, start, end, text, source=None):
+        """Replace source[start:end] with text.
+
+        Returns (i, j, count): old tokens i..j-1 were replaced by `count`
+        new ones starting at index i; later tokens are unchanged.
+        """
+        old = self.source
+        if source is None:
+            source = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        new_end = start + len(text)
+        n = len(self.kinds)
+
+        # Tokens ending well before the edit cannot see it, unless they are
+        # open constructs waiting for a terminator.
+        i = self.index_at(start - LOOKAHEAD)
+        before = [p for p in self._open if p < start]
+        if before:
+            i = min(i, self.index_at(before[0]))
+        pos = min(self.span(i)[0], start) if i < n else min(self.span(i - 1)[1] if i else 0, start)
+
+        kinds, starts, ends = array('B'), array('I'), array('I')
+        codes = KIND_CODES
+        j = i
+        for kind, s, e in self._spans(source, pos):
+            if s > new_end:
+                # Converged once the old stream has a token at the same place.
+                target = s - delta
+                while j < n and self.span(j)[0] < target:
+                    j += 1
+                if j < n and self.span(j)[0] == target:
+                    break
+            kinds.append(codes[kind])
+            starts.append(s)
+            ends.append(e)
+        else:
+            j = n
+        old_tail = self.span(j)[0] if j < n else len(old)
+
+        # Tokens from j on keep their distance from the end of the text.
+        self._move_gap(j)
+        self.kinds[i:j] = kinds
+        self.starts[i:j] = starts
+        self.ends[i:j] = ends
+        self._gap = i + len(kinds)
+        self.source = source
+        self._line_starts = None
+
+        if self._is_open:
+            self._open = ([p for p in self._open if p < pos]
+                          + [s for kind, s in zip(kinds, starts) if self._is_open(KIND_NAMES[kind], source, s)]
+                          + [p + delta for p in self._open if p >= old_tail])
+        return i, j, len(kinds)
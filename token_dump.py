@@ -0,0 +1,156 @@
+"""Compact binary token files that can be memory-mapped and read without parsing.
+
+Layout (all integers little-endian):
+
+    header    magic b'MCTK', u16 version, u16 record size, u32 kind count,
+              u32 token count, u32 string count, u64 string table offset,
+              u64 record offset
+    strings   u32 offsets[string count + 1], then the UTF-8 bytes of every
+              distinct string; the first `kind count` strings are the kind
+              names, so the file describes itself
+    records   one 5 x u32 record per token: kind, string id, character
+              offset, line, column
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from tokenizer import KIND_NAMES
+
+MAGIC = b'MCTK'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIQQ')
+FIELDS = 5
+RECORD_SIZE = FIELDS * 4
+
+
+def _little_endian(column):
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column
+
+
+def write_dump(path, tokens):
+    """Write a TokenBuffer (or IncrementalLexer) to path."""
+    tokens.flush()
+    source, starts, ends, kinds = tokens.source, tokens.starts, tokens.ends, tokens.kinds
+    strings = {name: i for i, name in enumerate(KIND_NAMES)}
+    records = array('I')
+    add = records.extend
+    line, line_start, counted = 1, 0, 0
+    for kind, start, end in zip(kinds, starts, ends):
+        n = source.count('\n', counted, start)
+        if n:
+            line += n
+            line_start = source.rfind('\n', counted, start) + 1
+        counted = start
+        value = source[start:end]
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        add((kind, sid, start, line, start - line_start + 1))
+
+    blobs = [s.encode('utf-8') for s in strings]
+    offsets = array('I', [0])
+    total = 0
+    for blob in blobs:
+        total += len(blob)
+        offsets.append(total)
+    string_offset = HEADER.size
+    record_offset = string_offset + len(offsets) * 4 + total
+    record_offset += -record_offset % 8
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, len(KIND_NAMES), len(kinds), len(blobs),
+                            string_offset, record_offset))
+        _little_endian(offsets).tofile(f)
+        f.write(b''.join(blobs))
+        f.write(b'\0' * (record_offset - f.tell()))
+        _little_endian(records).tofile(f)
+
+
+class TokenDump:
+    """Zero-copy reader for files written by write_dump.
+
+    Opening only maps the file and reads the header; records and strings
+    are read straight out of the mapping when they are asked for.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, kind_count, count, string_count, string_offset, record_offset = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path}: not a version {VERSION} token dump")
+        self._count = count
+        view = memoryview(self._map)
+        offsets_end = string_offset + (string_count + 1) * 4
+        self._views = [view]
+        self.string_offsets = self._column(view[string_offset:offsets_end])
+        self.blob = view[offsets_end:offsets_end + self.string_offsets[string_count]]
+        self.records = self._column(view[record_offset:record_offset + count * RECORD_SIZE])
+        self._views += [self.blob]
+        self._cache = {}
+        self.kind_names = tuple(self.string(k) for k in range(kind_count))
+
+    def _column(self, view):
+        if sys.byteorder == 'little':
+            column = view.cast('I')
+            self._views.append(column)
+            return column
+        column = array('I', view)
+        column.byteswap()
+        return column
+
+    def close(self):
+        for view in reversed(getattr(self, '_views', ())):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def string(self, sid):
+        value = self._cache.get(sid)
+        if value is None:
+            value = self._cache[sid] = str(self.raw(sid), 'utf-8')
+        return value
+
+    def raw(self, sid):
+        """The UTF-8 bytes of a string, as a view into the mapped file."""
+        return self.blob[self.string_offsets[sid]:self.string_offsets[sid + 1]]
+
+    def kind(self, i):
+        return self.kind_names[self.records[i * FIELDS]]
+
+    def text(self, i):
+        return self.string(self.records[i * FIELDS + 1])
+
+    def offset(self, i):
+        return self.records[i * FIELDS + 2]
+
+    def position(self, i):
+        """Return the 1-based (line, column) where token i starts."""
+        return self.records[i * FIELDS + 3], self.records[i * FIELDS + 4]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("token index out of range")
+        return self.kind(i), self.text(i)
+
+    def __iter__(self):
+        names, string, records = self.kind_names, self.string, self.records
+        for i in range(0, self._count * FIELDS, FIELDS):
+            yield names[records[i]], string(records[i + 1])
@@ -0,0 +1,297 @@
+import codecs
+import io
+import locale
+import mmap
+import os
+import re
+from collections import namedtuple
+
+# Token specification
+KEYWORDS = {
+    "auto", "break", "case", "char", "const", "continue", "default", "do", "double",
+    "else", "enum", "extern", "float", "for", "goto", "if", "int", "long", "register",
+    "return", "short", "signed", "sizeof", "static", "struct", "switch", "typedef",
+    "union", "unsigned", "void", "volatile", "while"
+}
+
+TOKEN_SPEC = [
+    ('COMMENT', r'//.*?$|/\*.*?\*/'),
+    ('STRING', r'"(?:\\.|[^"\\])*"'),
+    ('CHAR', r"'(?:\\.|[^'\\])'"),
+    ('NUMBER', r'\b\d+(\.\d+)?\b'),
+    ('IDENTIFIER', r'\b[A-Za-z_]\w*\b'),
+    ('OPERATOR', r'[+\-*/%=!<>]=?|&&|\|\|'),
+    ('DELIMITER', r'[;,\[\](){}]'),
+    ('SKIP', r'[ \t\n]+'),
+    ('MISMATCH', r'.'),
+]
+
+TOK_REGEX = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPEC)
+TOKEN_RE = re.compile(TOK_REGEX, re.DOTALL | re.MULTILINE)
+
+Token = namedtuple('Token', ['kind', 'value', 'line', 'column', 'offset'])
+
+# Compact kind codes, used wherever tokens are stored in bulk
+KIND_NAMES = ('COMMENT', 'STRING', 'CHAR', 'NUMBER', 'IDENTIFIER', 'KEYWORD',
+              'OPERATOR', 'DELIMITER', 'UNKNOWN', 'DIRECTIVE')
+KIND_CODES = {name: code for code, name in enumerate(KIND_NAMES)}
+
+CHUNK_SIZE = 1 << 20
+
+# A match is only trusted once this many characters follow it: NUMBER,
+# OPERATOR and CHAR can all change with up to four characters of lookahead.
+LOOKAHEAD = 4
+
+
+def regex_open(kind, text, pos):
+    """True if a regex-engine token at pos is a failed comment or string.
+
+    Such a token depends on the whole rest of the input: it only exists
+    because no terminator follows, so adding one anywhere changes it.
+    """
+    return ((kind != 'COMMENT' and text.startswith('/*', pos))
+            or (kind != 'STRING' and text[pos] == '"'))
+
+
+def regex_spans(text, pos=0, final=True):
+    """Yield (kind, start, end) for each token in text from pos onwards.
+
+    With final=False the text is treated as a prefix of a longer input and
+    scanning stops at the first token that more input could still change.
+    """
+    match = TOKEN_RE.match
+    limit = len(text) - LOOKAHEAD
+    while pos < len(text):
+        m = match(text, pos)
+        kind = m.lastgroup
+        end = m.end()
+        if not final and (end > limit or regex_open(kind, text, pos)):
+            return
+        if kind != 'SKIP':
+            if kind == 'IDENTIFIER' and m.group() in KEYWORDS:
+                kind = 'KEYWORD'
+            elif kind == 'MISMATCH':
+                kind = 'UNKNOWN'
+            yield kind, pos, end
+        pos = end
+
+
+# Hand-written scanner: one dispatch on the first character of each token,
+# then a single anchored match for the rest of it.
+_SPACE, _NAME, _DIGIT, _DOT, _SLASH, _QUOTE, _HASH, _DELIM, _OP = range(9)
+_CHAR_CLASS = {}
+for _c in ' \t\n\r\f\v':
+    _CHAR_CLASS[_c] = _SPACE
+for _c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    _CHAR_CLASS[_c] = _NAME
+for _c in '0123456789':
+    _CHAR_CLASS[_c] = _DIGIT
+for _c in ';,[](){}':
+    _CHAR_CLASS[_c] = _DELIM
+for _c in '+-*%=!<>&|^~?:':
+    _CHAR_CLASS[_c] = _OP
+_CHAR_CLASS.update({'.': _DOT, '/': _SLASH, '"': _QUOTE, "'": _QUOTE, '#': _HASH})
+del _c
+
+# Candidates for each leading character, longest first
+_OPERATORS = {}
+for _op in sorted(['<<=', '>>=', '->', '++', '--', '<<', '>>', '<=', '>=', '==', '!=', '&&', '||',
+                   '+=', '-=', '*=', '%=', '&=', '^=', '|=',
+                   '+', '-', '*', '%', '=', '!', '<', '>', '&', '|', '^', '~', '?', ':'],
+                  key=len, reverse=True):
+    _OPERATORS.setdefault(_op[0], []).append(_op)
+del _op
+
+_SPACE_RE = re.compile(r'[ \t\n\r\f\v]+')
+_NAME_RE = re.compile(r'[A-Za-z_0-9]+')
+_NUMBER_RE = re.compile(r'\.?[0-9](?:[eEpP][+-]|[A-Za-z_0-9.])*')   # C pp-number
+_QUOTED_RE = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"?', re.DOTALL),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'?", re.DOTALL),
+}
+_DIRECTIVE_RE = re.compile(r'#(?:[^\\\n]|\\.)*', re.DOTALL)
+
+
+def scanner_spans(text, pos=0, final=True):
+    """Yield (kind, start, end) like regex_spans, using the hand-written scanner.
+
+    Unlike the regex engine it knows the full C operator set (++, --, ->,
+    <<=, &, |, ^, ~, ...), hex/exponent numbers and preprocessor lines
+    (DIRECTIVE). Unterminated comments run to the end of the input and
+    unterminated string/char literals to the end of their line.
+    """
+    n = len(text)
+    limit = n if final else n - LOOKAHEAD
+    classes = _CHAR_CLASS
+    space, name, number = _SPACE_RE.match, _NAME_RE.match, _NUMBER_RE.match
+    keywords = KEYWORDS
+    while pos < n:
+        cls = classes.get(text[pos])
+        if cls == _SPACE:
+            pos = space(text, pos).end()
+            continue
+        if cls == _NAME:
+            end = name(text, pos).end()
+            kind = 'KEYWORD' if text[pos:end] in keywords else 'IDENTIFIER'
+        elif cls == _DELIM:
+            end = pos + 1
+            kind = 'DELIMITER'
+        elif cls == _OP:
+            for op in _OPERATORS[text[pos]]:
+                if text.startswith(op, pos):
+                    end = pos + len(op)
+                    break
+            kind = 'OPERATOR'
+        elif cls == _DIGIT:
+            end = number(text, pos).end()
+            kind = 'NUMBER'
+        elif cls == _SLASH:
+            if text.startswith('//', pos):
+                end = text.find('\n', pos)
+                if end < 0:
+                    end = n
+                kind = 'COMMENT'
+            elif text.startswith('/*', pos):
+                end = text.find('*/', pos + 2)
+                end = n if end < 0 else end + 2
+                kind = 'COMMENT'
+            else:
+                end = pos + 2 if text.startswith('/=', pos) else pos + 1
+                kind = 'OPERATOR'
+        elif cls == _QUOTE:
+            end = _QUOTED_RE[text[pos]].match(text, pos).end()
+            kind = 'STRING' if text[pos] == '"' else 'CHAR'
+        elif cls == _DOT:
+            m = number(text, pos)
+            if m:
+                end = m.end()
+                kind = 'NUMBER'
+            else:
+                end = pos + 3 if text.startswith('...', pos) else pos + 1
+                kind = 'OPERATOR'
+        elif cls == _HASH:
+            end = _DIRECTIVE_RE.match(text, pos).end()
+            kind = 'DIRECTIVE'
+        else:
+            end = pos + 1
+            kind = 'UNKNOWN'
+        if end > limit:
+            return
+        yield kind, pos, end
+        pos = end
+
+
+ENGINES = {'regex': regex_spans, 'scanner': scanner_spans}
+
+# Per engine: does a token depend on input beyond its LOOKAHEAD window?
+OPEN_TOKEN_CHECKS = {'regex': regex_open, 'scanner': None}
+
+
+def buffered_spans(chunks, spans=regex_spans):
+    """Run a span engine over text arriving as a sequence of string chunks.
+
+    Yields (kind, buf, start, end, base): the token is buf[start:end] and
+    base is the offset of buf[0] in the whole input. Only the unconsumed
+    tail of the input is kept in memory, so tokens may freely cross chunk
+    boundaries.
+    """
+    chunks = iter(chunks)
+    buf = ''
+    base = 0          # offset of buf[0] in the whole input
+    pos = 0           # where scanning resumes in buf
+    pending = []
+    pending_len = 0
+    stalled = 0
+
+    nxt = next(chunks, None)
+    while nxt is not None:
+        chunk, nxt = nxt, next(chunks, None)
+        final = nxt is None
+        pending.append(chunk)
+        pending_len += len(chunk)
+        # A token longer than the buffer (a huge comment, say) is only
+        # re-scanned once the buffer has doubled, keeping this linear.
+        if pending_len < stalled and not final:
+            continue
+
+        # Keep one character before the resume point so \b sees real context.
+        keep = max(pos - 1, 0)
+        buf = buf[keep:] + ''.join(pending)
+        base += keep
+        pos -= keep
+        pending = []
+        pending_len = 0
+
+        start_pos = pos
+        for kind, start, end in spans(buf, pos, final):
+            yield kind, buf, start, end, base
+            pos = end
+        stalled = len(buf) - pos if pos == start_pos else 0
+
+
+def tokenize_chunks(chunks, spans=regex_spans):
+    """Yield Token tuples for text arriving as a sequence of string chunks."""
+    line = 1
+    line_start = 0
+    last_end = 0      # end of the previous token in the whole input
+    for kind, buf, start, end, base in buffered_spans(chunks, spans):
+        # Everything from the previous token's end onwards is still in buf.
+        gap = last_end - base
+        n = buf.count('\n', gap, start)
+        if n:
+            line += n
+            line_start = base + buf.rfind('\n', gap, start) + 1
+        value = buf[start:end]
+        yield Token(kind, value, line, base + start - line_start + 1, base + start)
+        n = value.count('\n')
+        if n:
+            line += n
+            line_start = base + start + value.rfind('\n') + 1
+        last_end = base + end
+
+
+def iter_tokens(code, spans=regex_spans):
+    """Yield Token tuples for an in-memory string."""
+    return tokenize_chunks((code,), spans)
+
+
+def newline_decoder(encoding=None):
+    """Incremental decoder that translates newlines like text-mode open()."""
+    decoder = codecs.getincrementaldecoder(encoding or locale.getpreferredencoding(False))()
+    return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, encoding=None, use_mmap=False, offset=0):
+    """Yield the decoded text of a file in pieces of about chunk_size.
+
+    Newlines are translated exactly as open(path, 'r') would, so offsets
+    agree with lexing the whole file read in text mode. offset is a byte
+    position to start reading from; it must not fall inside a character.
+    """
+    if not use_mmap:
+        with open(path, 'rb') as raw:
+            raw.seek(offset)
+            with io.TextIOWrapper(raw, encoding=encoding) as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+    decoder = newline_decoder(encoding)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(offset, len(mm), chunk_size):
+                chunk = decoder.decode(mm[i:i + chunk_size])
+                if chunk:
+                    yield chunk
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+
+def tokenize_file(path, chunk_size=CHUNK_SIZE, encoding=None, use_mmap=False, spans=regex_spans):
+    """Yield Token tuples for a file without reading it into memory at once."""
+    return tokenize_chunks(read_chunks(path, chunk_size, encoding, use_mmap), spans)
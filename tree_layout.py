@@ -0,0 +1,206 @@
+"""Tidy tree layout and streaming DOT/SVG export for parse trees.
+
+layout() is Buchheim, Jünger and Leipert's linear-time version of the
+Reingold-Tilford/Walker algorithm: parents centred over their children,
+subtrees packed as close as their contours allow, identical subtrees drawn
+identically. Both passes run on explicit stacks, so deep trees are fine.
+
+Trees are given by a root and a `children` function; for ast_nodes trees
+the defaults just work.
+"""
+from ast_nodes import label as node_label
+
+NODE_WIDTH = 150      # SVG pixels per layout unit
+LEVEL_HEIGHT = 70
+MAX_LABEL = 22        # characters shown in an SVG box; the full label is its tooltip
+
+
+class _Box:
+    __slots__ = ('node', 'parent', 'children', 'number', 'depth', 'x', 'mod', 'thread', 'ancestor',
+                 'change', 'shift', 'default')
+
+    def __init__(self, node, parent, number):
+        self.node = node
+        self.parent = parent
+        self.children = []
+        self.number = number          # 1-based position among its siblings
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.x = self.mod = self.change = self.shift = 0.0
+        self.thread = None
+        self.ancestor = self
+        self.default = None
+
+    def left(self):
+        return self.thread or (self.children[0] if self.children else None)
+
+    def right(self):
+        return self.thread or (self.children[-1] if self.children else None)
+
+    def left_sibling(self):
+        return self.parent.children[self.number - 2] if self.number > 1 else None
+
+
+def _move_subtree(wl, wr, shift):
+    subtrees = wr.number - wl.number
+    wr.change -= shift / subtrees
+    wr.shift += shift
+    wl.change += shift / subtrees
+    wr.x += shift
+    wr.mod += shift
+
+
+def _apportion(v, default, distance):
+    w = v.left_sibling()
+    if w is None:
+        return default
+    vir = vor = v
+    vil = w
+    vol = v.parent.children[0]
+    sir = sor = v.mod
+    sil = vil.mod
+    sol = vol.mod
+    while vil.right() and vir.left():
+        vil = vil.right()
+        vir = vir.left()
+        vol = vol.left()
+        vor = vor.right()
+        vor.ancestor = v
+        shift = (vil.x + sil) - (vir.x + sir) + distance
+        if shift > 0:
+            _move_subtree(vil.ancestor if vil.ancestor.parent is v.parent else default, v, shift)
+            sir += shift
+            sor += shift
+        sil += vil.mod
+        sir += vir.mod
+        sol += vol.mod
+        sor += vor.mod
+    if vil.right() and not vor.right():
+        vor.thread = vil.right()
+        vor.mod += sil - sor
+    else:
+        if vir.left() and not vol.left():
+            vol.thread = vir.left()
+            vol.mod += sir - sol
+        default = v
+    return default
+
+
+def _first_walk(v, distance):
+    w = v.left_sibling()
+    if not v.children:
+        v.x = w.x + distance if w else 0.0
+        return
+    shift = change = 0.0
+    for child in reversed(v.children):
+        child.x += shift
+        child.mod += shift
+        change += child.change
+        shift += child.shift + change
+    midpoint = (v.children[0].x + v.children[-1].x) / 2
+    if w:
+        v.x = w.x + distance
+        v.mod = v.x - midpoint
+    else:
+        v.x = midpoint
+
+
+def layout(root, children=list, collapsed=frozenset(), max_depth=None, distance=1.0):
+    """Place every shown node of a tree; returns {node: (x, depth)}.
+
+    x is in units of the minimum sibling distance, starting at 0; depth is
+    the level, 0 for the root. Nodes in `collapsed` and nodes at max_depth
+    are laid out as leaves and their descendants left out.
+    """
+    top = _Box(root, None, 1)
+    boxes = [top]
+    # Build the box tree breadth-first.
+    for box in boxes:
+        if box.node in collapsed or (max_depth is not None and box.depth >= max_depth):
+            continue
+        box.children = [_Box(child, box, i) for i, child in enumerate(children(box.node), 1)]
+        boxes.extend(box.children)
+
+    # First walk, post-order.
+    stack = [(top, 0)]
+    while stack:
+        v, i = stack[-1]
+        if i == 0 and v.children:
+            v.default = v.children[0]
+        if i < len(v.children):
+            stack[-1] = (v, i + 1)
+            stack.append((v.children[i], 0))
+            continue
+        stack.pop()
+        _first_walk(v, distance)
+        if v.parent is not None:
+            v.parent.default = _apportion(v, v.parent.default, distance)
+
+    # Second walk, pre-order: sum the modifiers down each path.
+    positions = {}
+    stack = [(top, -top.x)]
+    while stack:
+        v, m = stack.pop()
+        positions[v.node] = (v.x + m, v.depth)
+        stack.extend((child, m + v.mod) for child in v.children)
+    left = min(x for x, _ in positions.values())
+    return {node: (x - left, depth) for node, (x, depth) in positions.items()}
+
+
+def _quote(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def write_dot(f, root, children=list, label=node_label, title="Parse Tree"):
+    """Write the tree as a Graphviz digraph, node by node, without building it first."""
+    f.write(f"// {title}\ndigraph {{\n")
+    f.write(f'\tN0 [label="{_quote(label(root))}"]\n')
+    count = 1
+    stack = [(root, 0)]
+    while stack:
+        node, ident = stack.pop()
+        kids = []
+        for child in children(node):
+            f.write(f'\tN{count} [label="{_quote(label(child))}"]\n\tN{ident} -> N{count}\n')
+            kids.append((child, count))
+            count += 1
+        stack.extend(reversed(kids))
+    f.write("}\n")
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+def write_svg(f, root, children=list, label=node_label, collapsed=frozenset(), max_depth=None):
+    """Write the laid-out tree as SVG, one element at a time."""
+    positions = layout(root, children, collapsed, max_depth)
+    width = (max(x for x, _ in positions.values()) + 1) * NODE_WIDTH
+    height = (max(depth for _, depth in positions.values()) + 1) * LEVEL_HEIGHT
+    box_width, box_height = NODE_WIDTH - 16, LEVEL_HEIGHT // 2
+
+    def centre(node):
+        x, depth = positions[node]
+        return x * NODE_WIDTH + NODE_WIDTH / 2, depth * LEVEL_HEIGHT + LEVEL_HEIGHT / 2
+
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+            f'font-family="monospace" font-size="11">\n')
+    f.write('<g stroke="gray">\n')
+    for node in positions:
+        x, y = centre(node)
+        for child in children(node):
+            if child in positions:
+                cx, cy = centre(child)
+                f.write(f'<line x1="{x:.1f}" y1="{y + box_height / 2:.1f}" '
+                        f'x2="{cx:.1f}" y2="{cy - box_height / 2:.1f}"/>\n')
+    f.write('</g>\n')
+    for node in positions:
+        x, y = centre(node)
+        text = label(node)
+        shown = text if len(text) <= MAX_LABEL else text[:MAX_LABEL - 1] + '…'
+        folded = node in collapsed or (max_depth is not None and positions[node][1] == max_depth)
+        fill = "lightgray" if folded and any(True for _ in children(node)) else "lightyellow"
+        f.write(f'<g><title>{_escape(text)}</title>'
+                f'<rect x="{x - box_width / 2:.1f}" y="{y - box_height / 2:.1f}" '
+                f'width="{box_width}" height="{box_height}" rx="4" fill="{fill}" stroke="gray"/>'
+                f'<text x="{x:.1f}" y="{y + 4:.1f}" text-anchor="middle">{_escape(shown)}</text></g>\n')
+    f.write('</svg>\n')
@@ -0,0 +1,136 @@
+"""Tk window showing a parse tree with the tidy layout from tree_layout.
+
+Big trees open folded below the deepest level that keeps MAX_SHOWN nodes
+on screen; click a grey node to unfold it one level, or any other inner
+node to fold it. Drag with the middle button or use the scrollbars to pan.
+"""
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+from ast_nodes import label
+from tree_layout import MAX_LABEL, layout, write_dot, write_svg
+
+MAX_SHOWN = 1500
+NODE_WIDTH = 130
+LEVEL_HEIGHT = 60
+
+
+def initial_folds(root, limit=MAX_SHOWN):
+    """Nodes to fold so that at most about `limit` nodes are shown (level of detail)."""
+    level, shown = [root], 1
+    while level:
+        below = [child for node in level for child in node]
+        if shown + len(below) > limit:
+            return {node for node in level if any(True for _ in node)}
+        shown += len(below)
+        level = below
+    return set()
+
+
+class TreeView(tk.Toplevel):
+    def __init__(self, master, root, title="C Code Parse Tree"):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("1100x700")
+        self.root_node = root
+        self.collapsed = initial_folds(root)
+        self.nodes = {}
+
+        toolbar = ttk.Frame(self, padding=4)
+        toolbar.pack(fill=tk.X)
+        ttk.Button(toolbar, text="Fold All", command=self.fold_all).pack(side=tk.LEFT, padx=4)
+        ttk.Button(toolbar, text="Default View", command=self.default_view).pack(side=tk.LEFT, padx=4)
+        ttk.Button(toolbar, text="Export DOT", command=self.export_dot).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(toolbar, text="Export SVG", command=self.export_svg).pack(side=tk.RIGHT, padx=4)
+        self.status = ttk.Label(toolbar)
+        self.status.pack(side=tk.LEFT, padx=10)
+
+        frame = ttk.Frame(self)
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(frame, background="white")
+        xbar = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        ybar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(xscrollcommand=xbar.set, yscrollcommand=ybar.set)
+        xbar.pack(side=tk.BOTTOM, fill=tk.X)
+        ybar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas.tag_bind("node", "<Button-1>", self.on_click)
+        self.canvas.bind("<ButtonPress-2>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B2-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1))
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.draw()
+
+    def draw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        positions = layout(self.root_node, collapsed=self.collapsed)
+        self.nodes = {}
+
+        def centre(node):
+            x, depth = positions[node]
+            return x * NODE_WIDTH + NODE_WIDTH / 2, depth * LEVEL_HEIGHT + LEVEL_HEIGHT / 2
+
+        half_width, half_height = NODE_WIDTH / 2 - 8, LEVEL_HEIGHT / 4
+        for node in positions:
+            x, y = centre(node)
+            if node not in self.collapsed:
+                for child in node:
+                    cx, cy = centre(child)
+                    canvas.create_line(x, y + half_height, cx, cy - half_height, fill="gray")
+        for i, node in enumerate(positions):
+            x, y = centre(node)
+            text = label(node)
+            if len(text) > MAX_LABEL:
+                text = text[:MAX_LABEL - 1] + "…"
+            folded = node in self.collapsed
+            tags = ("node", f"n{i}")
+            canvas.create_rectangle(x - half_width, y - half_height, x + half_width, y + half_height,
+                                    fill="lightgray" if folded else "lightyellow", outline="gray", tags=tags)
+            canvas.create_text(x, y, text=text + (" +" if folded else ""), font=("Consolas", 9), tags=tags)
+            self.nodes[f"n{i}"] = node
+        canvas.configure(scrollregion=canvas.bbox("all"))
+        self.status.config(text=f"{len(positions)} nodes shown, {len(self.collapsed)} folded")
+        return positions
+
+    def on_click(self, event):
+        item = self.canvas.find_withtag("current")
+        node = next((self.nodes[t] for t in self.canvas.gettags(item) if t in self.nodes), None)
+        if node is None:
+            return
+        if node in self.collapsed:
+            # Unfold one level at a time so a huge subtree cannot swamp the canvas.
+            self.collapsed.discard(node)
+            self.collapsed.update(child for child in node if any(True for _ in child))
+        elif any(True for _ in node):
+            self.collapsed.add(node)
+        else:
+            return
+        positions = self.draw()
+        # Keep the clicked node under the pointer.
+        x, depth = positions[node]
+        left, top, right, bottom = self.canvas.bbox("all")
+        self.canvas.xview_moveto((x * NODE_WIDTH + NODE_WIDTH / 2 - event.x - left) / max(right - left, 1))
+        self.canvas.yview_moveto((depth * LEVEL_HEIGHT + LEVEL_HEIGHT / 2 - event.y - top) / max(bottom - top, 1))
+
+    def fold_all(self):
+        self.collapsed = {self.root_node}
+        self.draw()
+
+    def default_view(self):
+        self.collapsed = initial_folds(self.root_node)
+        self.draw()
+
+    def export_dot(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".dot",
+                                            filetypes=[("Graphviz files", "*.dot"), ("All Files", "*.*")])
+        if path:
+            with open(path, "w") as f:
+                write_dot(f, self.root_node)
+
+    def export_svg(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".svg",
+                                            filetypes=[("SVG files", "*.svg"), ("All Files", "*.*")])
+        if path:
+            with open(path, "w") as f:
+                write_svg(f, self.root_node)